@@ -0,0 +1,469 @@
+"""
+Arena: beliebig viele Schlangen (bis MAX_SNAKES Bots) auf einem großen Feld.
+
+Anders als im Zwei-Spieler-Modus bewegen sich alle Schlangen gleichzeitig:
+Erst werden alle neuen Köpfe berechnet und die Schwänze geräumt, dann wird
+jeder Kopf gegen denselben Zwischenstand geprüft. Kollisionen:
+
+    Kopf gegen Kopf    zwei oder mehr Köpfe wollen in dieselbe Zelle: alle sterben
+    Kopf gegen Körper  Zelle gehört (nach dem Räumen der Schwänze) einer Schlange
+    Tausch             zwei Köpfe tauschen die Zellen: beide sterben
+
+Alle Körper teilen sich ein Bit im Board, wem eine Zelle gehört, steht in
+einem zweiten Puffer (`owners`, ein Byte Spielernummer pro Zelle, 0 = frei;
+auf sehr großen Feldern wie das Board ein Dict); jede Abfrage ist O(1), ein Takt kostet damit O(Anzahl Schlangen), unabhängig von
+der Gesamtlänge der Körper. Tote Schlangen verschwinden vom
+Feld, das Spiel endet, wenn höchstens eine übrig ist.
+
+    python arena.py --snakes 64 --size 200
+    python arena.py --snakes 16 --size 60 --bot autopilot --games 5
+"""
+import argparse
+import math
+import random
+import struct
+import sys
+import time
+
+from autopilot import Autopilot, OPPOSITE
+from engine import (SnakeEngine, SparseCells, Direction, ItemType, DIRECTION_VECTORS,
+                    CONTENT_MASK, ITEM_TYPES, OBSTACLE, SNAKE_BIT, DEATH_CAUSES)
+from profiling import percentile
+
+# Obergrenze für die Anzahl der Schlangen
+MAX_SNAKES = 64
+
+# Standard-Spielfeld der Arena
+ARENA_ROWS = 120
+ARENA_COLS = 120
+
+# Wahrscheinlichkeit, mit der der Wanderer ohne Not abbiegt
+TURN_CHANCE = 0.1
+
+# Anhang des kompakten Zustands: pro Schlange Todesursache (Index in
+# DEATH_CAUSES, 0 = lebt) und Verursacher (0 = keiner), danach der Sieger
+ARENA_ENTRY = struct.Struct("<BB")
+
+
+class Arena(SnakeEngine):
+    """
+    Engine für `players` Schlangen mit gleichzeitiger Zugauflösung.
+
+    Die Startpositionen liegen gleichmäßig in einem Raster; Hindernisse
+    eines Levels werden dabei übersprungen. Pro Schlange liegen `food`
+    Futter-Items (halb rot, halb golden) auf dem Feld; gefressenes Futter
+    wird sofort einzeln ersetzt, `food_cells` enthält alle Futterzellen.
+
+    Gift und Wände töten nur die betroffene Schlange (`alive`, `causes`,
+    `killers` pro Spieler). `snapshot()` hängt an den Zustand der Engine
+    pro Schlange Todesursache und Verursacher und den Sieger an; `alive`,
+    `living` und `owners` ergeben sich daraus und aus den Körpern.
+    """
+    def __init__(self, players=8, rows=ARENA_ROWS, cols=ARENA_COLS, seed=None, level=None,
+                 item_rates=None, food=1):
+        if not 1 <= players <= MAX_SNAKES:
+            raise ValueError(f"Arena braucht 1 bis {MAX_SNAKES} Schlangen, nicht {players}")
+        self.players = players
+        self.food = food
+        super().__init__("Arena", rows, cols, seed, level=level, item_rates=item_rates)
+
+    @property
+    def num_players(self):
+        return self.players
+
+    def start_positions(self):
+        """Rasterpunkte über das ganze Feld, ohne Hindernisse und Doppelte."""
+        players = self.players
+        columns = math.ceil(math.sqrt(players * self.cols / self.rows))
+        lines = math.ceil(players / columns)
+        num_cells = self.rows * self.cols
+        taken = set()
+        positions = []
+        for i in range(players):
+            line, column = divmod(i, columns)
+            x = (2 * column + 1) * self.cols // (2 * columns)
+            y = (2 * line + 1) * self.rows // (2 * lines)
+            cell = y * self.cols + x
+            # Belegte Rasterpunkte: nächste freie Zelle in Zellreihenfolge
+            for _ in range(num_cells):
+                if not self.is_obstacle(cell) and cell not in taken:
+                    break
+                cell = (cell + 1) % num_cells
+            else:
+                raise ValueError("kein Platz für alle Schlangen")
+            taken.add(cell)
+            positions.append(self.position(cell))
+        return positions
+
+    def snake_bit(self, player):
+        """Alle Schlangen teilen sich ein Bit; sie belegen nie dieselbe Zelle."""
+        return SNAKE_BIT
+
+    def in_body(self, snake, cell):
+        owner = self.owners[cell]
+        return bool(owner) and self.snakes[owner - 1] is snake
+
+    def reset(self, seed=None):
+        super().reset(seed)
+        # Besitzer jeder Körperzelle (Spielernummer, 0 = keiner)
+        self.owners = SparseCells() if self.sparse else bytearray(self.rows * self.cols)
+        for player, snake in enumerate(self.snakes, 1):
+            self.owners[snake.body[0]] = player
+        self.living = list(range(1, self.players + 1))
+        self.alive = [True] * self.players
+        self.causes = [None] * self.players
+        self.killers = [None] * self.players
+        self.winner = None
+
+    def start(self):
+        """Legt `food` Futter-Items pro Schlange aus."""
+        cells = []
+        for i in range(self.players * self.food):
+            cell = self.spawn_item(ItemType.GOLD_FOOD if i % 2 else ItemType.RED_FOOD)
+            if cell is not None:
+                cells.append(cell)
+        self.food_cells = tuple(cells)
+
+    # -------------------------------------------------------------------------
+    # SPIEL-LOGIK
+    # -------------------------------------------------------------------------
+    def move(self):
+        """Bewegt alle lebenden Schlangen gleichzeitig und löst Kollisionen auf."""
+        if self.game_over:
+            return
+        self.tick += 1
+
+        queue = self.effect_queue
+        if queue and queue[0][0] <= self.tick:
+            self.expire_effects()
+
+        cols = self.cols
+        rows = self.rows
+        snakes = self.snakes
+        cells = self.board.cells
+        owners = self.owners
+        sparse = self.sparse
+
+        # 1. Neue Köpfe berechnen, Schwänze räumen
+        moves = []
+        heads = {}       # Zelle -> Anzahl Köpfe, die hinein wollen
+        old_heads = {}   # alter Kopf -> Spieler (für Tausch-Kollisionen)
+        new_heads = {}   # Spieler -> neuer Kopf
+        for player in self.living:
+            snake = snakes[player - 1]
+            old_head = snake.body[0]
+            old_heads[old_head] = player
+            snake.x += snake.velocity_x
+            snake.y += snake.velocity_y
+            x = snake.x
+            y = snake.y
+            if 0 <= x < cols and 0 <= y < rows:
+                cell = y * cols + x
+                heads[cell] = heads.get(cell, 0) + 1
+                new_heads[player] = cell
+            else:
+                cell = None
+            if snake.growth:
+                snake.growth -= 1
+            elif sparse:
+                # In den Dicts bleiben nur belegte Zellen
+                tail = snake.body.pop()
+                value = cells[tail] & ~SNAKE_BIT
+                if value:
+                    cells[tail] = value
+                else:
+                    del cells[tail]
+                del owners[tail]
+            else:
+                tail = snake.body.pop()
+                cells[tail] &= ~SNAKE_BIT
+                owners[tail] = 0
+            moves.append((player, snake, old_head, cell))
+
+        # 2. Jeden Kopf gegen denselben Zwischenstand prüfen
+        survivors = []
+        dead = []
+        for player, snake, old_head, cell in moves:
+            killer = None
+            if cell is None:
+                cause = "wall_collision"
+            elif (cells.get(cell, 0) if sparse else cells[cell]) & CONTENT_MASK == OBSTACLE:
+                cause = "obstacle_collision"
+            elif heads[cell] > 1:
+                cause = "head_collision"
+            elif cell in owners if sparse else owners[cell]:
+                killer = owners[cell]
+                cause = "game_over" if killer == player else "body_collision"
+            else:
+                other = old_heads.get(cell)
+                if other is not None and other != player and new_heads.get(other) == old_head:
+                    # Schlangen der Länge 1 tauschen die Zellen
+                    killer = other
+                    cause = "swap_collision"
+                else:
+                    survivors.append((player, snake, cell))
+                    continue
+            dead.append((player, cause, killer))
+
+        # 3. Köpfe setzen, Tote abräumen, danach Items (neues Futter landet
+        #    so weder auf einem neuen Kopf noch auf einem Toten)
+        for player, snake, cell in survivors:
+            snake.body.insert(0, cell)
+            cells[cell] |= SNAKE_BIT
+            owners[cell] = player
+        for player, cause, killer in dead:
+            self.kill(player, cause, killer)
+        for player, snake, cell in survivors:
+            content = cells[cell] & CONTENT_MASK
+            if content and self.alive[player - 1]:
+                self.handle_item_collision(cell, ITEM_TYPES[content], snake, player)
+
+        if self.spawn_rates:
+            self.spawn_random_items()
+
+        if len(self.living) <= (1 if self.players > 1 else 0):
+            self.finish()
+
+    def kill(self, player, cause, killer=None):
+        """Entfernt eine Schlange vom Feld und merkt sich Ursache und Verursacher."""
+        snake = self.snakes[player - 1]
+        board = self.board
+        owners = self.owners
+        for cell in snake.body:
+            board.remove(cell, SNAKE_BIT)
+            if self.sparse:
+                del owners[cell]
+            else:
+                owners[cell] = 0
+        del snake.body[:]
+        snake.growth = 0
+        self.living.remove(player)
+        self.alive[player - 1] = False
+        self.causes[player - 1] = cause
+        self.killers[player - 1] = killer
+        self.death_cause = cause
+        self.loser = player
+        self.events.append((cause, player))
+
+    def end_game(self, cause, player):
+        """Gift trifft nur die eine Schlange; ohne Spieler endet die Runde."""
+        if player is None:
+            super().end_game(cause, player)
+        elif self.alive[player - 1]:
+            self.kill(player, cause)
+
+    def finish(self):
+        """Beendet die Runde; der letzte Überlebende (falls einer) gewinnt."""
+        self.game_over = True
+        self.winner = self.living[0] if self.living else None
+        self.events.append(("arena_over", self.winner))
+
+    def replace_food(self, cell):
+        """Ersetzt gefressenes Futter durch ein neues derselben Sorte."""
+        item_type = self.item_at(cell)
+        self.remove_item(cell)
+        cells = [food for food in self.food_cells if food != cell]
+        new_cell = self.spawn_item(item_type)
+        if new_cell is not None:
+            cells.append(new_cell)
+        self.food_cells = tuple(cells)
+
+    # -------------------------------------------------------------------------
+    # ZUSTAND SICHERN / WIEDERHERSTELLEN
+    # -------------------------------------------------------------------------
+    def snapshot(self):
+        """Zustand der Engine plus Todesursachen, Verursacher und Sieger."""
+        parts = [super().snapshot()]
+        parts.extend(ARENA_ENTRY.pack(DEATH_CAUSES.index(cause), killer or 0)
+                     for cause, killer in zip(self.causes, self.killers))
+        parts.append(bytes((self.winner or 0,)))
+        return b"".join(parts)
+
+    def restore(self, data):
+        """Stellt einen mit `snapshot()` gesicherten Arena-Zustand wieder her."""
+        super().restore(data)
+        self.players = players = len(self.snakes)
+        # Der Anhang steht am Ende: fest ARENA_ENTRY pro Schlange plus Sieger
+        entries = data[len(data) - players * ARENA_ENTRY.size - 1:-1]
+        self.causes = []
+        self.killers = []
+        for cause, killer in ARENA_ENTRY.iter_unpack(entries):
+            self.causes.append(DEATH_CAUSES[cause])
+            self.killers.append(killer or None)
+        self.winner = data[-1] or None
+        self.alive = [cause is None for cause in self.causes]
+        self.living = [player for player in range(1, players + 1) if self.alive[player - 1]]
+        self.owners = SparseCells() if self.sparse else bytearray(self.rows * self.cols)
+        for player, snake in enumerate(self.snakes, 1):
+            for cell in snake.body:
+                self.owners[cell] = player
+
+    def clone(self):
+        """Wie `SnakeEngine.clone`, dazu eigene Kopien von `owners` und den Listen pro Spieler."""
+        engine = super().clone()
+        engine.owners = SparseCells(self.owners) if self.sparse else self.owners[:]
+        engine.living = self.living[:]
+        engine.alive = self.alive[:]
+        engine.causes = self.causes[:]
+        engine.killers = self.killers[:]
+        return engine
+
+
+# -----------------------------------------------------------------------------
+# BOTS
+# -----------------------------------------------------------------------------
+class ArenaPilot(Autopilot):
+    """Autopilot, der fremde Körper als dauerhaft blockiert behandelt."""
+    def passable(self, cell, depth):
+        owner = self.engine.owners[cell]
+        if owner and owner != self.player:
+            return False
+        return super().passable(cell, depth)
+
+    def decide(self):
+        if not self.engine.alive[self.player - 1]:
+            return None
+        return super().decide()
+
+
+class Wanderer:
+    """
+    Billiger Bot für große Arenen: fährt geradeaus, biegt mit TURN_CHANCE
+    oder vor einem Hindernis in eine zufällige sichere Richtung ab.
+    Sicher heißt: im Feld, kein Hindernis, kein Körper, kein Gift; Zellen
+    neben fremden Köpfen werden nach Möglichkeit gemieden.
+    """
+    def __init__(self, engine, player, seed=0):
+        self.engine = engine
+        self.player = player
+        self.rng = random.Random(seed * MAX_SNAKES + player)
+
+    def safe(self, snake, direction):
+        engine = self.engine
+        dx, dy = DIRECTION_VECTORS[direction]
+        x = snake.x + dx
+        y = snake.y + dy
+        if not (0 <= x < engine.cols and 0 <= y < engine.rows):
+            return False
+        cell = y * engine.cols + x
+        if engine.owners[cell] or engine.is_obstacle(cell):
+            return False
+        return engine.item_at(cell) is not ItemType.POISON
+
+    def contested(self, snake, direction):
+        """Grenzt die Zielzelle an einen fremden Kopf (mögliche Kopf-Kollision)?"""
+        engine = self.engine
+        dx, dy = DIRECTION_VECTORS[direction]
+        x = snake.x + dx
+        y = snake.y + dy
+        for nx, ny in DIRECTION_VECTORS.values():
+            nx += x
+            ny += y
+            if not (0 <= nx < engine.cols and 0 <= ny < engine.rows):
+                continue
+            cell = ny * engine.cols + nx
+            owner = engine.owners[cell]
+            if owner and owner != self.player and engine.snakes[owner - 1].body[0] == cell:
+                return True
+        return False
+
+    def decide(self):
+        engine = self.engine
+        if engine.game_over or not engine.alive[self.player - 1]:
+            return None
+        snake = engine.snakes[self.player - 1]
+        current = None
+        for direction, vector in DIRECTION_VECTORS.items():
+            if vector == (snake.velocity_x, snake.velocity_y):
+                current = direction
+        rng = self.rng
+        if (current is not None and rng.random() >= TURN_CHANCE
+                and self.safe(snake, current) and not self.contested(snake, current)):
+            return None
+        options = [direction for direction in Direction
+                   if direction is not OPPOSITE.get(current) and self.safe(snake, direction)]
+        calm = [direction for direction in options if not self.contested(snake, direction)]
+        options = calm or options
+        return rng.choice(options) if options else None
+
+
+BOTS = ("wander", "autopilot")
+
+
+def make_bots(engine, bot, seed=0, budget_nodes=500):
+    """Ein Bot pro Schlange; der Autopilot plant mit festem Knotenbudget."""
+    if bot == "autopilot":
+        return [ArenaPilot(engine, player, budget_nodes=budget_nodes)
+                for player in range(1, engine.num_players + 1)]
+    return [Wanderer(engine, player, seed) for player in range(1, engine.num_players + 1)]
+
+
+# -----------------------------------------------------------------------------
+# KOMMANDOZEILE
+# -----------------------------------------------------------------------------
+def play(engine, bots, max_ticks):
+    """Spielt eine Runde; gibt die Dauer jedes Takts (ohne Bots) in Sekunden zurück."""
+    clock = time.perf_counter
+    timings = []
+    while not engine.game_over and engine.tick < max_ticks:
+        actions = [bot.decide() for bot in bots]
+        start = clock()
+        engine.step(actions)
+        timings.append(clock() - start)
+    return timings
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Arena: viele Bots, gleichzeitige Züge.")
+    parser.add_argument("--snakes", type=int, default=MAX_SNAKES)
+    parser.add_argument("--size", type=int, default=ARENA_COLS, help="Kantenlänge des Spielfelds")
+    parser.add_argument("--level", help="kompiliertes Level (.snkl) statt des leeren Felds")
+    parser.add_argument("--bot", choices=BOTS, default="wander")
+    parser.add_argument("--food", type=int, default=1, help="Futter-Items pro Schlange")
+    parser.add_argument("--games", type=int, default=1)
+    parser.add_argument("--seed", type=int, default=0, help="erster Seed")
+    parser.add_argument("--max-ticks", type=int, default=10_000)
+    args = parser.parse_args(argv)
+
+    level = None
+    if args.level:
+        from levels import LevelError, load_level
+        try:
+            level = load_level(args.level)
+        except (OSError, LevelError) as error:
+            print(error, file=sys.stderr)
+            return 2
+    try:
+        engine = Arena(args.snakes, args.size, args.size, seed=args.seed, level=level,
+                       food=args.food)
+    except ValueError as error:
+        print(error, file=sys.stderr)
+        return 2
+
+    for game in range(args.games):
+        seed = args.seed + game
+        engine.reset(seed)
+        engine.start()
+        bots = make_bots(engine, args.bot, seed)
+        start = time.perf_counter()
+        timings = play(engine, bots, args.max_ticks)
+        seconds = time.perf_counter() - start
+        causes = {}
+        for cause in engine.causes:
+            if cause is not None:
+                causes[cause] = causes.get(cause, 0) + 1
+        timings.sort()
+        winner = engine.winner
+        score = engine.snakes[winner - 1].score if winner else 0
+        print(f"seed {seed}: Takt {engine.tick}, Sieger {winner or '-'} ({score} Punkte), "
+              f"Tode {causes}")
+        print(f"  Auflösung pro Takt: p50 {percentile(timings, 50) * 1e6:.0f} µs, "
+              f"p99 {percentile(timings, 99) * 1e6:.0f} µs; "
+              f"{engine.tick / seconds:.0f} Takte/s inkl. Bots")
+    if level is not None:
+        level.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
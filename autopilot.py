@@ -0,0 +1,362 @@
+"""
+Autopilot: steuert eine Schlange per Wegsuche (A*) zum Futter.
+
+Der geplante Weg wird zwischengespeichert und Takt für Takt abgelaufen.
+Neu geplant wird nur, wenn das Ziel verschwindet, ein neues Item oder
+Hindernis erscheint bzw. der Weg blockiert ist (dann wird nur das
+blockierte Stück umgangen) oder wenn es noch keinen Weg gab und der
+Schwanz eine Zelle freigibt. Jede Planung hat ein festes Zeitbudget;
+wird es überschritten, gibt es einen Überlebenszug.
+
+Körperzellen gelten nicht dauerhaft als blockiert: Eine Zelle, die der
+Schwanz nach k Takten freigibt, darf nach k Takten wieder betreten werden.
+
+    python autopilot.py --games 100 --difficulty hard --players 2
+"""
+import argparse
+import heapq
+import sys
+import time
+
+from engine import SnakeEngine, Difficulty, Direction, ItemType, DIRECTION_VECTORS
+
+# Zeitbudget pro Planung in Mikrosekunden
+PLAN_BUDGET_US = 1000
+
+# So viele Knoten werden zwischen zwei Blicken auf die Uhr expandiert
+CLOCK_STRIDE = 32
+
+OPPOSITE = {
+    Direction.UP: Direction.DOWN,
+    Direction.DOWN: Direction.UP,
+    Direction.LEFT: Direction.RIGHT,
+    Direction.RIGHT: Direction.LEFT,
+}
+
+
+class Autopilot:
+    """
+    Steuert Spieler `player` einer Engine. `decide()` wird vor jedem Takt
+    aufgerufen und liefert die gewünschte Richtung (oder None = beibehalten),
+    z.B. für `engine.step([...])`.
+
+    Mit `budget_nodes` wird statt der Zeit die Zahl der expandierten Knoten
+    pro Suche begrenzt; das Verhalten hängt dann nicht mehr von der
+    Rechnerlast ab (reproduzierbare Turniere).
+
+    Zähler: `plans` (volle Planungen), `repairs` (Umgehungen), `fallbacks`
+    (Überlebenszüge), `over_budget` (abgebrochene Suchen), `max_plan_us`.
+    """
+    def __init__(self, engine, player=1, budget_us=PLAN_BUDGET_US, clock=time.perf_counter_ns,
+                 budget_nodes=None):
+        self.engine = engine
+        self.player = player
+        self.budget_ns = budget_us * 1000
+        self.budget_nodes = budget_nodes
+        self.clock = clock
+
+        self.path = []           # geplante Zellen, nächste Zelle am Ende
+        self.target = None
+        self.no_path = False
+        self.head = None
+        self.tick = -1
+        self.moves = 0           # Anzahl Kopfbewegungen seit dem Neuaufbau
+        self.entered = {}        # Zelle -> Bewegungsnummer, mit der der Kopf sie betrat
+        self.num_obstacles = 0
+        self.item_cells = frozenset()
+
+        self.plans = 0
+        self.repairs = 0
+        self.fallbacks = 0
+        self.over_budget = 0
+        self.max_plan_us = 0.0
+
+    # -------------------------------------------------------------------------
+    # ZUSTAND MITVERFOLGEN
+    # -------------------------------------------------------------------------
+    @property
+    def snake(self):
+        return self.engine.snakes[self.player - 1]
+
+    def rebuild(self):
+        """Baut die Eintrittszeiten aller Körperzellen neu auf (Start, Reset)."""
+        body = self.snake.body
+        self.moves = len(body)
+        self.entered = {cell: self.moves - i for i, cell in enumerate(body)}
+        self.path = []
+        self.target = None
+        self.no_path = False
+
+    def sync(self):
+        """
+        Übernimmt die Bewegung seit dem letzten Aufruf in O(1): neuer Kopf,
+        abgelaufene Wegzelle. Bei Sprüngen (Reset, Replay) wird neu aufgebaut.
+        """
+        engine = self.engine
+        head = self.snake.body[0]
+        if engine.tick < self.tick or engine.tick > self.tick + 1 or self.head is None:
+            self.rebuild()
+        elif head != self.head:
+            self.moves += 1
+            self.entered[head] = self.moves
+            if self.path and self.path[-1] == head:
+                self.path.pop()
+            else:
+                self.path = []
+        self.head = head
+        self.tick = engine.tick
+
+    def free_after(self, cell):
+        """
+        Nach wie vielen Takten die Zelle frei ist: 0 für freie Zellen, sonst
+        die Zeit, bis der Schwanz sie räumt.
+        """
+        snake = self.snake
+        if not self.engine.in_body(snake, cell):
+            return 0
+        index = self.moves - self.entered[cell]
+        return len(snake.body) - index + snake.growth
+
+    def passable(self, cell, depth):
+        """Darf die Zelle im `depth`-ten Zug betreten werden?"""
+        engine = self.engine
+        if engine.is_obstacle(cell) or engine.item_at(cell) is ItemType.POISON:
+            return False
+        return depth >= self.free_after(cell)
+
+    # -------------------------------------------------------------------------
+    # ENTSCHEIDUNG
+    # -------------------------------------------------------------------------
+    def decide(self):
+        """Richtung für den nächsten Takt (None, wenn das Spiel vorbei ist)."""
+        engine = self.engine
+        if engine.game_over or self.player > len(engine.snakes):
+            return None
+        self.sync()
+
+        start = self.clock()
+        deadline = start + self.budget_ns
+        targets = [cell for cell in engine.food_cells if engine.item_at(cell) is not None]
+
+        # Auslöser für eine neue Planung bzw. Reparatur
+        item_cells = frozenset(engine.item_cells)
+        changed = (item_cells != self.item_cells
+                   or len(engine.obstacles) != self.num_obstacles)
+        self.item_cells = item_cells
+        self.num_obstacles = len(engine.obstacles)
+
+        if self.target not in targets:
+            self.path = []
+        if not self.path and targets and (not self.no_path or self.snake.growth == 0):
+            self.plan(targets, deadline)
+        elif self.path:
+            blocked = self.first_blocked(check_all=changed)
+            if blocked is not None:
+                self.repair(blocked, targets, deadline)
+
+        elapsed_us = (self.clock() - start) / 1000
+        self.max_plan_us = max(self.max_plan_us, elapsed_us)
+        if self.path:
+            return self.direction_to(self.path[-1])
+        self.fallbacks += 1
+        return self.survival_move()
+
+    def direction_to(self, cell):
+        """Richtung vom Kopf zu einer Nachbarzelle."""
+        engine = self.engine
+        hx, hy = engine.position(self.head)
+        x, y = engine.position(cell)
+        for direction, (dx, dy) in DIRECTION_VECTORS.items():
+            if hx + dx == x and hy + dy == y:
+                return direction
+        return None
+
+    def current_direction(self):
+        snake = self.snake
+        for direction, vector in DIRECTION_VECTORS.items():
+            if vector == (snake.velocity_x, snake.velocity_y):
+                return direction
+        return None
+
+    def neighbours(self, cell, first_move=False):
+        """Nachbarzellen im Spielfeld (im ersten Zug ohne direkte Umkehr)."""
+        engine = self.engine
+        cols = engine.cols
+        y, x = divmod(cell, cols)
+        blocked = OPPOSITE.get(self.current_direction()) if first_move else None
+        for direction, (dx, dy) in DIRECTION_VECTORS.items():
+            if direction is blocked:
+                continue
+            nx = x + dx
+            ny = y + dy
+            if 0 <= nx < cols and 0 <= ny < engine.rows:
+                yield ny * cols + nx
+
+    def first_blocked(self, check_all):
+        """
+        Index (in `self.path`) der ersten nicht mehr begehbaren Wegzelle.
+        Ohne neue Items/Hindernisse genügt es, die nächste Zelle zu prüfen.
+        """
+        path = self.path
+        last = len(path) - 1
+        stop = -1 if check_all else last - 1
+        for i in range(last, stop, -1):
+            if not self.passable(path[i], last - i + 1):
+                return i
+        return None
+
+    # -------------------------------------------------------------------------
+    # SUCHE
+    # -------------------------------------------------------------------------
+    def search(self, goals, deadline, start_depth=0):
+        """
+        A* vom Kopf zu einer der Zellen in `goals` (Heuristik: Manhattan-
+        Abstand zum nächsten Ziel). Gibt den Weg (nächste Zelle am Ende) und
+        das erreichte Ziel zurück, None bei keinem Weg, oder False, wenn das
+        Zeitbudget aufgebraucht ist.
+        """
+        engine = self.engine
+        cols = engine.cols
+        goal_xy = [divmod(goal, cols) for goal in goals]
+        clock = self.clock
+        budget_nodes = self.budget_nodes
+
+        def heuristic(cell):
+            y, x = divmod(cell, cols)
+            return min(abs(y - gy) + abs(x - gx) for gy, gx in goal_xy)
+
+        start = self.head
+        parents = {start: None}
+        depth = {start: start_depth}
+        queue = [(heuristic(start), 0, start)]
+        expanded = 0
+        while queue:
+            _f, _tie, cell = heapq.heappop(queue)
+            if cell in goals and cell != start:
+                path = []
+                while cell != start:
+                    path.append(cell)
+                    cell = parents[cell]
+                return path
+            expanded += 1
+            if budget_nodes is not None:
+                if expanded > budget_nodes:
+                    self.over_budget += 1
+                    return False
+            elif expanded % CLOCK_STRIDE == 0 and clock() > deadline:
+                self.over_budget += 1
+                return False
+            next_depth = depth[cell] + 1
+            for neighbour in self.neighbours(cell, cell == start):
+                if neighbour in parents or not self.passable(neighbour, next_depth):
+                    continue
+                parents[neighbour] = cell
+                depth[neighbour] = next_depth
+                heapq.heappush(queue, (next_depth + heuristic(neighbour), expanded, neighbour))
+        return None
+
+    def plan(self, targets, deadline):
+        """Volle Planung zum nächsten Futter."""
+        self.plans += 1
+        path = self.search(set(targets), deadline)
+        if path:
+            self.path = path
+            self.target = path[0]
+            self.no_path = False
+        else:
+            self.path = []
+            self.target = None
+            # Ohne Weg erst wieder planen, wenn der Schwanz Platz macht
+            self.no_path = path is None
+
+    def repair(self, blocked, targets, deadline):
+        """
+        Umgeht eine blockierte Stelle: sucht vom Kopf zur nächsten noch
+        begehbaren Wegzelle dahinter und setzt den Rest des Wegs wieder an.
+        Gelingt das nicht, wird komplett neu geplant.
+        """
+        self.repairs += 1
+        rest = self.path[:blocked]
+        goals = {cell: i for i, cell in enumerate(rest) if self.passable(cell, len(self.path) - i)}
+        detour = self.search(goals, deadline) if goals else None
+        if detour:
+            # Zellen des Reststücks, die schon im Umweg liegen, nicht doppelt
+            self.path = rest[:goals[detour[0]]] + detour
+            if len(set(self.path)) == len(self.path):
+                return
+        if detour is False:
+            self.path = []
+            return
+        self.plan(targets, deadline)
+
+    def survival_move(self):
+        """Sicherer Zug mit den meisten freien Nachbarn (oder None)."""
+        best = None
+        best_score = -1
+        for cell in self.neighbours(self.head, first_move=True):
+            if not self.passable(cell, 1):
+                continue
+            score = sum(1 for n in self.neighbours(cell) if self.passable(n, 2))
+            if score > best_score:
+                best = cell
+                best_score = score
+        return self.direction_to(best) if best is not None else None
+
+
+# -----------------------------------------------------------------------------
+# DAUERTEST
+# -----------------------------------------------------------------------------
+def soak(games, difficulty, players, seed=0, max_ticks=100_000):
+    """
+    Spielt Bot-gegen-Bot-Partien ohne Fenster; gibt eine Statistik zurück.
+    Die Bots planen mit festem Knotenbudget, ein Fehler bei Seed N lässt
+    sich also mit Seed N nachspielen.
+    """
+    from tournament import BOT_BUDGET_NODES
+    mode = "Multiplayer" if players == 2 else "Singleplayer"
+    engine = SnakeEngine(mode, seed=seed)
+    stats = {"games": 0, "ticks": 0, "scores": [], "causes": {},
+             "fallbacks": 0, "over_budget": 0, "max_plan_us": 0.0, "seconds": 0.0}
+    start = time.perf_counter()
+    for game in range(games):
+        engine.reset(seed + game)
+        engine.start()
+        pilots = [Autopilot(engine, player, budget_nodes=BOT_BUDGET_NODES)
+                  for player in range(1, players + 1)]
+        while not engine.game_over and engine.tick < max_ticks:
+            engine.step([pilot.decide() for pilot in pilots])
+        stats["games"] += 1
+        stats["ticks"] += engine.tick
+        stats["scores"].append(engine.max_score)
+        stats["causes"][engine.death_cause] = stats["causes"].get(engine.death_cause, 0) + 1
+        for pilot in pilots:
+            stats["fallbacks"] += pilot.fallbacks
+            stats["over_budget"] += pilot.over_budget
+            stats["max_plan_us"] = max(stats["max_plan_us"], pilot.max_plan_us)
+    stats["seconds"] = time.perf_counter() - start
+    # Spielzeit, wenn alle Takte im Tempo der Schwierigkeit liefen
+    stats["game_seconds"] = stats["ticks"] * difficulty.value / 1000
+    return stats
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Autopilot-Dauertest ohne Fenster.")
+    parser.add_argument("--games", type=int, default=20)
+    parser.add_argument("--players", type=int, choices=(1, 2), default=1)
+    parser.add_argument("--difficulty", choices=[d.name.lower() for d in Difficulty], default="hard")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    stats = soak(args.games, Difficulty[args.difficulty.upper()], args.players, args.seed)
+    scores = sorted(stats["scores"])
+    print(f"{stats['games']} Spiele, {stats['ticks']} Takte in {stats['seconds']:.1f} s "
+          f"(Spielzeit {stats['game_seconds']:.0f} s)")
+    print(f"Punkte: min {scores[0]}, Median {scores[len(scores) // 2]}, max {scores[-1]}")
+    print(f"Spielende: {stats['causes']}")
+    print(f"Überlebenszüge {stats['fallbacks']}, Budget überschritten {stats['over_budget']}, "
+          f"längste Planung {stats['max_plan_us']:.0f} µs")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
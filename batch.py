@@ -0,0 +1,311 @@
+"""
+Vektorisierte Batch-Umgebung: N unabhängige Singleplayer-Spiele in NumPy-Arrays.
+
+Die Regeln entsprechen `SnakeEngine.move`/`handle_snake_logic`, werden aber
+für alle Spielfelder gleichzeitig als Array-Operationen berechnet.
+Benötigt NumPy (`pip install numpy`).
+
+Unterstützt wird nur ein Ausschnitt der Regeln: Singleplayer, das rote und
+goldene Futter, zufällige Hindernisse (vor dem ersten Futter gelegt) und
+Spielfelder unter SPARSE_CELLS Zellen. Mehrspieler, Levels und Item-Raten
+(Gift, Speed-Boost, Slowdown, Extra-Futter) lehnt der Konstruktor ab.
+
+Gezogen wird wie in der Engine: jedes Spielfeld hat einen eigenen
+SplitMix64-Zustand und dieselbe Stichprobe (SAMPLE_TRIES blinde Versuche,
+dann die k-te freie Zelle). Spielfeld i mit Seed s verläuft damit Takt für
+Takt wie `SnakeEngine(seed=s)` mit `num_obstacles` Aufrufen von
+`spawn_obstacle()` vor `start()`.
+"""
+import random
+
+import numpy as np
+
+from engine import ROWS, COLS, START_POSITIONS, SPARSE_CELLS, SAMPLE_TRIES, MASK64
+
+# Aktionscodes für `BatchSnakeEnv.step`
+NOOP, UP, DOWN, LEFT, RIGHT = range(5)
+
+# Bewegungsvektoren je Aktionscode (NOOP = Richtung beibehalten)
+ACTION_DX = np.array([0, 0, 0, -1, 1], dtype=np.int32)
+ACTION_DY = np.array([0, -1, 1, 0, 0], dtype=np.int32)
+
+# Todesursachen (Index 0 = lebt noch), gleiche Namen wie in der Engine
+DEATH_CAUSES = (None, "wall_collision", "game_over", "obstacle_collision", "board_full")
+WALL, SELF, OBSTACLE, BOARD_FULL = 1, 2, 3, 4
+
+# Zellcodes für `observe()`
+EMPTY_CELL, BODY_CELL, HEAD_CELL, OBSTACLE_CELL, RED_CELL, GOLD_CELL = range(6)
+
+GOLD_GLOW_TICKS = 30
+
+# SplitMix64-Konstanten (wie `engine.SplitMix64`)
+GOLDEN_GAMMA = np.uint64(0x9E3779B97F4A7C15)
+MIX1 = np.uint64(0xBF58476D1CE4E5B9)
+MIX2 = np.uint64(0x94D049BB133111EB)
+U64_MAX = np.uint64(MASK64)
+
+
+def unsupported(mode="Singleplayer", rows=ROWS, cols=COLS, item_rates=None, level=None):
+    """Grund, warum die Batch-Umgebung eine Einstellung nicht spielt, oder None."""
+    if mode != "Singleplayer":
+        return f"nur Singleplayer, nicht {mode}"
+    if level is not None:
+        return "keine Levels"
+    if item_rates and any(rate > 0 for rate in item_rates.values()):
+        return "keine Item-Raten (nur das Futterpaar)"
+    if rows * cols >= SPARSE_CELLS:
+        return f"höchstens {SPARSE_CELLS - 1} Zellen"
+    return None
+
+
+class BatchSnakeEnv:
+    """
+    Hält N Spielfelder gleichzeitig und berechnet einen Takt für alle mit
+    einem einzigen Aufruf von `step(actions)`.
+
+    Jede Schlange liegt als Ringpuffer von Zellindizes (y * cols + x) in
+    `bodies`; `occupancy` zählt die Körpersegmente pro Zelle, damit die
+    Selbstkollision ohne Schleife über den Körper geprüft werden kann.
+
+    Spielfeld i startet mit Seed `seed + i`; nach jedem automatischen
+    Neustart kommt `num_envs` hinzu (`seeds`). `mode`, `item_rates` und
+    `level` gibt es nur, damit Einstellungen außerhalb des unterstützten
+    Ausschnitts mit ValueError abgelehnt werden statt still anders zu laufen.
+    """
+    def __init__(self, num_envs, rows=ROWS, cols=COLS, num_obstacles=0,
+                 seed=None, auto_reset=True, mode="Singleplayer", item_rates=None, level=None):
+        reason = unsupported(mode, rows, cols, item_rates, level)
+        if reason is not None:
+            raise ValueError(f"BatchSnakeEnv: {reason}")
+        self.num_envs = num_envs
+        self.rows = rows
+        self.cols = cols
+        self.num_cells = rows * cols
+        self.num_obstacles = num_obstacles
+        self.auto_reset = auto_reset
+        if seed is None:
+            seed = random.randrange(2 ** 32)
+
+        n = num_envs
+        self.seeds = (np.arange(n, dtype=np.uint64) + np.uint64(seed & MASK64))
+        self.rng_state = np.zeros(n, dtype=np.uint64)
+        # Ringpuffer: Platz für eine Schlange über das ganze Feld (+ Wachstum)
+        self.capacity = self.num_cells + 1
+        self.bodies = np.zeros((n, self.capacity), dtype=np.int32)
+        self.head_ptr = np.zeros(n, dtype=np.int32)
+        self.length = np.zeros(n, dtype=np.int32)
+        self.growth = np.zeros(n, dtype=np.int32)   # noch ausstehendes Wachstum
+        self.occupancy = np.zeros((n, self.num_cells), dtype=np.int8)
+        self.obstacles = np.zeros((n, self.num_cells), dtype=bool)
+
+        self.velocity_x = np.zeros(n, dtype=np.int32)
+        self.velocity_y = np.zeros(n, dtype=np.int32)
+        self.red_food = np.zeros(n, dtype=np.int32)
+        self.gold_food = np.zeros(n, dtype=np.int32)
+        self.score = np.zeros(n, dtype=np.int32)
+        self.gold_glow_timer = np.zeros(n, dtype=np.int32)
+        self.ticks = np.zeros(n, dtype=np.int32)
+        self.done = np.zeros(n, dtype=bool)
+        self.death_cause = np.zeros(n, dtype=np.int8)
+
+        self._index = np.arange(n)
+        start_x = min(START_POSITIONS[0][0], cols - 1)
+        start_y = min(START_POSITIONS[0][1], rows - 1)
+        self._start_cell = start_y * cols + start_x
+        self.reset()
+
+    def reset(self, mask=None):
+        """
+        Setzt alle (oder die per Maske gewählten) Spielfelder zurück; jedes
+        beginnt mit seinem Seed aus `seeds` von vorn.
+        """
+        if mask is None:
+            mask = np.ones(self.num_envs, dtype=bool)
+        envs = np.flatnonzero(mask)
+        if envs.size == 0:
+            return
+        start = self._start_cell
+        self.rng_state[envs] = self.seeds[envs]
+
+        self.occupancy[envs] = 0
+        self.occupancy[envs, start] = 1
+        self.bodies[envs, 0] = start
+        self.head_ptr[envs] = 0
+        self.length[envs] = 1
+        self.growth[envs] = 0
+        self.velocity_x[envs] = 0
+        self.velocity_y[envs] = 0
+        self.score[envs] = 0
+        self.gold_glow_timer[envs] = 0
+        self.ticks[envs] = 0
+        self.done[envs] = False
+        self.death_cause[envs] = 0
+
+        self.obstacles[envs] = False
+        for _ in range(self.num_obstacles):
+            cells = self.sample_free(envs, self.free_mask(envs))
+            placed = cells >= 0
+            self.obstacles[envs[placed], cells[placed]] = True
+        self.spawn_food_pair(envs)
+
+    def free_mask(self, envs):
+        """Freie Zellen (kein Körper, kein Hindernis) der angegebenen Spielfelder."""
+        return (self.occupancy[envs] == 0) & ~self.obstacles[envs]
+
+    def next64(self, envs):
+        """Nächste SplitMix64-Zahl der angegebenen Spielfelder (uint64, läuft über wie in C)."""
+        state = self.rng_state[envs] + GOLDEN_GAMMA
+        self.rng_state[envs] = state
+        z = (state ^ (state >> np.uint64(30))) * MIX1
+        z = (z ^ (z >> np.uint64(27))) * MIX2
+        return z ^ (z >> np.uint64(31))
+
+    def randrange(self, envs, n):
+        """Gleichverteilt 0..n-1 pro Spielfeld, mit derselben Verwerfung wie die Engine."""
+        n = np.broadcast_to(np.asarray(n, dtype=np.uint64), envs.shape)
+        # Letzte Zahl vor dem unvollständigen Rest: MASK64 - 2**64 % n
+        limit = U64_MAX - (U64_MAX % n + np.uint64(1)) % n
+        z = self.next64(envs)
+        redo = np.flatnonzero(z > limit)
+        while redo.size:
+            z[redo] = self.next64(envs[redo])
+            redo = redo[z[redo] > limit[redo]]
+        return (z % n).astype(np.int64)
+
+    def sample_free(self, envs, free):
+        """
+        Zieht pro Spielfeld (Zeile von `free`) eine freie Zelle wie
+        `Board.sample` (-1, wenn keine frei ist): bis zu
+        SAMPLE_TRIES blinde Versuche, danach die k-te freie Zelle.
+        """
+        count = free.sum(axis=1)
+        cells = np.full(len(envs), -1, dtype=np.int32)
+        pending = np.flatnonzero(count > 0)
+        for _ in range(SAMPLE_TRIES):
+            if not pending.size:
+                return cells
+            drawn = self.randrange(envs[pending], self.num_cells)
+            hit = free[pending, drawn]
+            cells[pending[hit]] = drawn[hit]
+            pending = pending[~hit]
+        if pending.size:
+            k = self.randrange(envs[pending], count[pending])
+            rows = free[pending]
+            ranks = np.cumsum(rows, axis=1) - 1
+            cells[pending] = np.argmax(rows & (ranks == k[:, None]), axis=1)
+        return cells
+
+    def spawn_food_pair(self, envs):
+        """
+        Erzeugt für die angegebenen Spielfelder je ein rotes und goldenes
+        Futter auf verschiedenen freien Zellen (-1 = kein Platz mehr).
+        """
+        free = self.free_mask(envs)
+        red = self.sample_free(envs, free)
+        placed = red >= 0
+        free[np.flatnonzero(placed), red[placed]] = False
+        self.red_food[envs] = red
+        # Ohne rotes Futter (Feld voll) wird auch kein goldenes gezogen
+        gold = np.full(len(envs), -1, dtype=np.int32)
+        gold[placed] = self.sample_free(envs[placed], free[placed])
+        self.gold_food[envs] = gold
+
+    def step(self, actions=None):
+        """
+        Berechnet einen Takt für alle Spielfelder.
+
+        `actions` ist ein Array mit einem Aktionscode (NOOP, UP, DOWN, LEFT,
+        RIGHT) pro Spielfeld; direkte Umkehr wird wie in der Engine ignoriert.
+        Gibt (rewards, dones, death_causes) zurück. Mit `auto_reset` werden
+        beendete Spielfelder danach sofort neu gestartet.
+        """
+        idx = self._index
+        alive = ~self.done
+
+        # Richtungswechsel (Umkehr ignorieren)
+        if actions is not None:
+            actions = np.asarray(actions)
+            dx = ACTION_DX[actions]
+            dy = ACTION_DY[actions]
+            turn = (actions != NOOP) & alive
+            turn &= ~((dx != 0) & (self.velocity_x == -dx))
+            turn &= ~((dy != 0) & (self.velocity_y == -dy))
+            self.velocity_x = np.where(turn, dx, self.velocity_x)
+            self.velocity_y = np.where(turn, dy, self.velocity_y)
+
+        self.ticks += alive
+        glowing = alive & (self.gold_glow_timer > 0)
+        self.gold_glow_timer -= glowing
+
+        # Neue Kopfposition
+        head = self.bodies[idx, self.head_ptr]
+        hx = head % self.cols + self.velocity_x
+        hy = head // self.cols + self.velocity_y
+        wall = alive & ((hx < 0) | (hx >= self.cols) | (hy < 0) | (hy >= self.rows))
+        moving = alive & ~wall
+        new_head = np.where(moving, hy * self.cols + hx, 0)
+
+        # Schwanz rückt nach (außer bei ausstehendem Wachstum)
+        pop = moving & (self.growth == 0)
+        tail_ptr = (self.head_ptr - self.length + 1) % self.capacity
+        tail = self.bodies[idx, tail_ptr]
+        np.subtract.at(self.occupancy, (idx[pop], tail[pop]), 1)
+        self.length -= pop
+        self.growth -= moving & ~pop
+
+        # Kollisionen: eigener Körper, dann Hindernisse
+        self_hit = moving & (self.occupancy[idx, new_head] > 0)
+        obstacle_hit = moving & ~self_hit & self.obstacles[idx, new_head]
+        survived = moving & ~self_hit & ~obstacle_hit
+
+        # Kopf einfügen
+        self.head_ptr = np.where(survived, (self.head_ptr + 1) % self.capacity, self.head_ptr)
+        self.bodies[idx[survived], self.head_ptr[survived]] = new_head[survived]
+        np.add.at(self.occupancy, (idx[survived], new_head[survived]), 1)
+        self.length += survived
+
+        # Futter
+        ate_red = survived & (new_head == self.red_food)
+        ate_gold = survived & (new_head == self.gold_food)
+        rewards = ate_red.astype(np.int32) + 3 * ate_gold
+        self.score += rewards
+        self.growth += ate_red.astype(np.int32) + ate_gold
+        self.gold_glow_timer[ate_gold] = GOLD_GLOW_TICKS
+        eaten = np.flatnonzero(ate_red | ate_gold)
+        if eaten.size:
+            self.spawn_food_pair(eaten)
+
+        # Spielende
+        cause = np.zeros(self.num_envs, dtype=np.int8)
+        cause[wall] = WALL
+        cause[self_hit] = SELF
+        cause[obstacle_hit] = OBSTACLE
+        cause[eaten[self.red_food[eaten] < 0]] = BOARD_FULL
+        dones = cause != 0
+        self.death_cause[dones] = cause[dones]
+        self.done |= dones
+
+        if self.auto_reset and dones.any():
+            self.seeds[dones] += np.uint64(self.num_envs)
+            self.reset(dones)
+        return rewards, dones, cause
+
+    def observe(self, out=None):
+        """
+        Liefert das Spielfeld aller Umgebungen als int8-Array (N, rows, cols)
+        mit den Zellcodes EMPTY_CELL, BODY_CELL, HEAD_CELL, ... .
+        """
+        if out is None:
+            out = np.empty((self.num_envs, self.num_cells), dtype=np.int8)
+        else:
+            out = out.reshape(self.num_envs, self.num_cells)
+        out[...] = EMPTY_CELL
+        out[self.obstacles] = OBSTACLE_CELL
+        out[self.occupancy > 0] = BODY_CELL
+        idx = self._index
+        red = self.red_food >= 0
+        gold = self.gold_food >= 0
+        out[idx[red], self.red_food[red]] = RED_CELL
+        out[idx[gold], self.gold_food[gold]] = GOLD_CELL
+        out[idx, self.bodies[idx, self.head_ptr]] = HEAD_CELL
+        return out.reshape(self.num_envs, self.rows, self.cols)
@@ -0,0 +1,399 @@
+"""
+Benchmarks für die heißen Pfade des Spiels.
+
+Gemessen werden Spiellogik (`move`/`handle_snake_logic`), Item-Kollision
+(`handle_item_collision`/`remove_both_food_items`), Spawnen
+(`spawn_food_pair`/`spawn_obstacle`), Arena-Takte mit vielen Schlangen,
+Zustandskopien (`snapshot`/`restore`, `clone`) und das Zeichnen gegen ein
+Null-Canvas, jeweils für verschiedene
+Schlangenlängen, Spielfeldgrößen und Belegungen.
+
+    python bench.py --out bench.json
+    python bench.py --compare bench.json          # Regressionen markieren
+
+Die Ergebnisse werden als JSON geschrieben; im Vergleichsmodus endet das
+Skript mit Exit-Code 1, sobald ein Benchmark um mehr als den Schwellwert
+langsamer ist als in der Baseline.
+"""
+import argparse
+import json
+import platform
+import random
+import sys
+import time
+import types
+from datetime import datetime, timezone
+
+from array import array
+
+from engine import SnakeEngine, SNAKE_BIT
+from render import CanvasRenderer, ViewportRenderer
+
+SNAKE_LENGTHS = (1, 10, 100, 300, 600)
+BOARD_SIZES = (25, 100, 1000)
+OBSTACLE_FILLS = (0.0, 0.5, 0.9)
+
+# Standard-Schwellwert für Regressionen (10% weniger Durchsatz)
+REGRESSION_THRESHOLD = 0.10
+
+
+class NullCanvas:
+    """Canvas-Ersatz ohne Display: vergibt IDs und ignoriert alles andere."""
+    def __init__(self):
+        self.next_id = 0
+
+    def _create(self, *args, **kwargs):
+        self.next_id += 1
+        return self.next_id
+
+    create_rectangle = create_line = create_text = _create
+
+    def __getattr__(self, name):
+        return lambda *args, **kwargs: None
+
+
+# -----------------------------------------------------------------------------
+# HILFSFUNKTIONEN
+# -----------------------------------------------------------------------------
+def serpentine(rows, cols):
+    """Zellen einer Schlangenlinie über das ganze Feld (Zeile für Zeile)."""
+    cells = []
+    for y in range(rows):
+        xs = range(cols) if y % 2 == 0 else range(cols - 1, -1, -1)
+        cells.extend(y * cols + x for x in xs)
+    return cells
+
+
+def place_snake(engine, cells):
+    """Legt Schlange 1 auf die gegebenen Zellen (letzte Zelle = Kopf)."""
+    snake = engine.snakes[0]
+    for cell in snake.body:
+        engine.board.remove(cell, snake.bit)
+    snake.body = array(snake.body.typecode, reversed(cells))
+    for cell in cells:
+        engine.board.add(cell, snake.bit)
+    snake.x, snake.y = engine.position(cells[-1])
+
+
+def velocities(path, cols):
+    """Bewegungsvektor zwischen aufeinanderfolgenden Zellen eines Pfads."""
+    moves = []
+    for a, b in zip(path, path[1:]):
+        ay, ax = divmod(a, cols)
+        by, bx = divmod(b, cols)
+        moves.append((bx - ax, by - ay))
+    return moves
+
+
+def measure(func, iterations, repeat=1):
+    """
+    Ruft `func()` `iterations`-mal auf und misst jeden Aufruf einzeln.
+    Gibt Durchsatz und Latenz-Perzentile (in µs) zurück.
+    """
+    clock = time.perf_counter_ns
+    samples = []
+    start_total = clock()
+    for _ in range(iterations):
+        start = clock()
+        func()
+        samples.append(clock() - start)
+    total = clock() - start_total
+    samples.sort()
+    n = len(samples)
+    return {
+        "ops_per_sec": n * repeat / (total / 1e9),
+        "p50_us": samples[n // 2] / 1000 / repeat,
+        "p99_us": samples[min(n - 1, int(n * 0.99))] / 1000 / repeat,
+    }
+
+
+# -----------------------------------------------------------------------------
+# BENCHMARKS
+# -----------------------------------------------------------------------------
+def bench_snake_logic(length, size, iterations):
+    """Ein Takt (`move` -> `handle_snake_logic`) entlang einer Schlangenlinie."""
+    engine = SnakeEngine(rows=size, cols=size, seed=1)
+    path = serpentine(size, size)
+    ticks = min(iterations, len(path) - length)
+    if ticks <= 0:
+        return None
+    place_snake(engine, path[:length])
+    snake = engine.snakes[0]
+    moves = iter(velocities(path, size)[length - 1:])
+
+    def tick():
+        snake.velocity_x, snake.velocity_y = next(moves)
+        engine.move()
+
+    return measure(tick, ticks)
+
+
+def bench_effects(active, iterations):
+    """Ein Takt wie `bench_snake_logic` (Länge 100), während `active` Effekte laufen."""
+    engine = SnakeEngine(seed=1)
+    path = serpentine(engine.rows, engine.cols)
+    ticks = min(iterations, len(path) - 100)
+    place_snake(engine, path[:100])
+    for i in range(active):
+        engine.add_effect(1, "gold_glow", ticks + 1 + i)
+    snake = engine.snakes[0]
+    moves = iter(velocities(path, engine.cols)[99:])
+
+    def tick():
+        snake.velocity_x, snake.velocity_y = next(moves)
+        engine.move()
+
+    return measure(tick, ticks)
+
+
+def bench_arena(snakes, length, iterations):
+    """Ein Arena-Takt mit `snakes` Schlangen der Länge `length`, alle nach unten."""
+    from arena import Arena
+    cols = 2 * snakes
+    engine = Arena(snakes, rows=length + iterations + 1, cols=cols, seed=1)
+    for player, snake in enumerate(engine.snakes, 1):
+        for cell in snake.body:
+            engine.board.remove(cell, SNAKE_BIT)
+            engine.owners[cell] = 0
+        x = 2 * (player - 1)
+        cells = [y * cols + x for y in range(length)]
+        snake.body = array(snake.body.typecode, reversed(cells))
+        for cell in cells:
+            engine.board.add(cell, SNAKE_BIT)
+            engine.owners[cell] = player
+        snake.x, snake.y = x, length - 1
+        snake.velocity_y = 1
+    return measure(engine.move, iterations)
+
+
+def bench_item_collision(length, obstacles, iterations):
+    """Fressen: Wachstum, beide Futter entfernen, neues Paar spawnen."""
+    engine = SnakeEngine(rows=50, cols=50, seed=1)
+    place_snake(engine, serpentine(engine.rows, engine.cols)[:length])
+    for _ in range(obstacles):
+        engine.spawn_obstacle()
+    engine.spawn_food_pair()
+    snake = engine.snakes[0]
+
+    def eat():
+        cell = engine.food_cells[0]
+        engine.handle_item_collision(cell, engine.item_at(cell), snake, 1)
+        snake.growth = 0
+
+    return measure(eat, iterations)
+
+
+def bench_spawn(size, fill, iterations):
+    """`spawn_food_pair` (plus Aufräumen) bei gegebenem Hindernis-Anteil."""
+    engine = SnakeEngine(rows=size, cols=size, seed=1)
+    num_cells = size * size
+    target = int(num_cells * fill)
+    if engine.sparse:
+        cells = random.Random(1).sample(range(num_cells), target)
+        for cell in cells:
+            if engine.board.is_free(cell):
+                engine.add_obstacle(cell)
+    else:
+        for _ in range(target):
+            engine.spawn_obstacle()
+
+    def spawn():
+        engine.spawn_food_pair()
+        engine.remove_both_food_items()
+
+    return measure(spawn, iterations)
+
+
+def bench_spawn_obstacle(size, iterations):
+    """`spawn_obstacle` auf einem anfangs leeren Spielfeld."""
+    engine = SnakeEngine(rows=size, cols=size, seed=1)
+    iterations = min(iterations, size * size // 2)
+    return measure(engine.spawn_obstacle, iterations)
+
+
+def bench_snapshot(length, iterations):
+    """`snapshot` und `restore` (eine Vorausschau-Kopie) bei gegebener Länge."""
+    engine = SnakeEngine(seed=1)
+    place_snake(engine, serpentine(engine.rows, engine.cols)[:length])
+    engine.spawn_food_pair()
+    copy = SnakeEngine(seed=1)
+
+    def roundtrip():
+        copy.restore(engine.snapshot())
+
+    return measure(roundtrip, iterations)
+
+
+def bench_clone(length, size, iterations):
+    """`clone` (Kopie der Zustandspuffer) bei gegebener Länge und Feldgröße."""
+    engine = SnakeEngine(rows=size, cols=size, seed=1)
+    place_snake(engine, serpentine(size, size)[:length])
+    engine.spawn_food_pair()
+    return measure(engine.clone, iterations)
+
+
+def bench_render(length, size, iterations):
+    """Ein Frame (Takt + Zeichnen) gegen ein Null-Canvas."""
+    engine = SnakeEngine(rows=size, cols=size, seed=1)
+    path = serpentine(size, size)
+    ticks = min(iterations, len(path) - length)
+    if ticks <= 0:
+        return None
+    place_snake(engine, path[:length])
+    engine.spawn_food_pair()
+    snake = engine.snakes[0]
+    moves = iter(velocities(path, size)[length - 1:])
+
+    view = 25
+    width = height = min(size, view) * 25
+    renderer_class = ViewportRenderer if size > view else CanvasRenderer
+    renderer = renderer_class(NullCanvas(), 25, width, height)
+    game = types.SimpleNamespace(
+        engine=engine, mode="Singleplayer", highscore=0,
+        is_paused=False, grid_enabled=True, perf_overlay=False
+    )
+    renderer.render(game)
+
+    def frame():
+        snake.velocity_x, snake.velocity_y = next(moves)
+        engine.move()
+        renderer.render(game)
+
+    return measure(frame, ticks)
+
+
+def bench_batch(num_envs, iterations):
+    """`BatchSnakeEnv.step` (nur mit NumPy); Durchsatz in Spieltakten."""
+    try:
+        import numpy as np
+        from batch import BatchSnakeEnv
+    except ImportError:
+        return None
+    env = BatchSnakeEnv(num_envs, seed=1)
+    rng = np.random.default_rng(1)
+    actions = rng.integers(0, 5, size=(iterations, num_envs))
+    steps = iter(actions)
+    return measure(lambda: env.step(next(steps)), iterations, repeat=num_envs)
+
+
+def benchmarks(quick=False):
+    """Alle Benchmarks als (Name, Parameter, Funktion)."""
+    n = 300 if quick else 3000
+    cases = []
+    for size in BOARD_SIZES:
+        for length in SNAKE_LENGTHS:
+            cases.append((f"snake_logic/len={length}/board={size}",
+                          {"length": length, "board": size},
+                          lambda l=length, s=size: bench_snake_logic(l, s, n)))
+    for active in (0, 10000):
+        cases.append((f"effects/active={active}",
+                      {"active": active},
+                      lambda a=active: bench_effects(a, n)))
+    for snakes in (8, 64):
+        for length in (10, 1000):
+            cases.append((f"arena/snakes={snakes}/len={length}",
+                          {"snakes": snakes, "length": length},
+                          lambda k=snakes, l=length: bench_arena(k, l, n)))
+    for length in (1, 100, 600):
+        for obstacles in (0, 50):
+            cases.append((f"item_collision/len={length}/obstacles={obstacles}",
+                          {"length": length, "obstacles": obstacles},
+                          lambda l=length, o=obstacles: bench_item_collision(l, o, n)))
+    for size in BOARD_SIZES:
+        for fill in OBSTACLE_FILLS:
+            cases.append((f"spawn_food_pair/board={size}/fill={fill}",
+                          {"board": size, "fill": fill},
+                          lambda s=size, f=fill: bench_spawn(s, f, n)))
+        cases.append((f"spawn_obstacle/board={size}",
+                      {"board": size},
+                      lambda s=size: bench_spawn_obstacle(s, n)))
+    for length in (1, 100, 600):
+        cases.append((f"snapshot_restore/len={length}",
+                      {"length": length},
+                      lambda l=length: bench_snapshot(l, n)))
+    for size in (25, 200):
+        for length in (1, 600):
+            cases.append((f"clone/len={length}/board={size}",
+                          {"length": length, "board": size},
+                          lambda l=length, s=size: bench_clone(l, s, n)))
+    for size in (25, 1000):
+        for length in SNAKE_LENGTHS:
+            cases.append((f"render/len={length}/board={size}",
+                          {"length": length, "board": size},
+                          lambda l=length, s=size: bench_render(l, s, n // 3)))
+    cases.append(("batch_step/envs=4096", {"envs": 4096},
+                  lambda: bench_batch(4096, 20 if quick else 100)))
+    return cases
+
+
+# -----------------------------------------------------------------------------
+# AUSGABE / VERGLEICH
+# -----------------------------------------------------------------------------
+def run(pattern=None, quick=False, stream=sys.stdout):
+    """Führt alle (bzw. die passenden) Benchmarks aus und gibt die Ergebnisse zurück."""
+    results = {}
+    for name, params, func in benchmarks(quick):
+        if pattern and pattern not in name:
+            continue
+        stats = func()
+        if stats is None:
+            continue
+        stats.update(params)
+        results[name] = stats
+        print(f"{name:<45} {stats['ops_per_sec']:>14,.0f} ops/s "
+              f"p50 {stats['p50_us']:>9.2f} µs  p99 {stats['p99_us']:>9.2f} µs", file=stream)
+    return {
+        "meta": {
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "date": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "quick": quick,
+        },
+        "results": results,
+    }
+
+
+def compare(current, baseline, threshold=REGRESSION_THRESHOLD, stream=sys.stdout):
+    """
+    Vergleicht zwei Ergebnis-Dicts und gibt die Namen der Regressionen zurück
+    (Durchsatz um mehr als `threshold` gesunken).
+    """
+    regressions = []
+    base_results = baseline["results"]
+    for name, stats in current["results"].items():
+        base = base_results.get(name)
+        if base is None:
+            continue
+        ratio = stats["ops_per_sec"] / base["ops_per_sec"]
+        flag = ""
+        if ratio < 1 - threshold:
+            flag = "REGRESSION"
+            regressions.append(name)
+        print(f"{name:<45} {ratio:>7.2f}x  {flag}", file=stream)
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmarks für Snake.")
+    parser.add_argument("--out", help="Ergebnisse als JSON hierhin schreiben")
+    parser.add_argument("--compare", metavar="BASELINE", help="mit gespeicherter Baseline vergleichen")
+    parser.add_argument("--threshold", type=float, default=REGRESSION_THRESHOLD,
+                        help="erlaubter Durchsatzverlust (Anteil, Standard 0.10)")
+    parser.add_argument("--filter", help="nur Benchmarks, deren Name dies enthält")
+    parser.add_argument("--quick", action="store_true", help="weniger Iterationen")
+    args = parser.parse_args(argv)
+
+    current = run(args.filter, args.quick)
+    if args.out:
+        with open(args.out, "w") as file:
+            json.dump(current, file, indent=2)
+    if args.compare:
+        with open(args.compare) as file:
+            baseline = json.load(file)
+        if compare(current, baseline, args.threshold):
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,715 @@
+"""
+Differenztest: prüft schnellere Implementierungen gegen die Referenzregeln.
+
+Jeder Testfall entsteht aus einem Seed: Spielfeldgröße, Modus, Hindernisse,
+Item-Raten und eine zufällige Eingabefolge. Referenz (`reference.py`) und
+Kandidat spielen ihn nebeneinander; nach jedem Takt werden Ereignisse und
+der komplette Zustand verglichen (Takt, Zufallsgenerator, Körper, Wachstum,
+Richtung, Punkte, Effekte, Items, Futter, Hindernisse, Spielende).
+
+Beim ersten Unterschied wird der Fall verkleinert: Eingaben hinter dem
+Fehler fallen weg, dann ganze Taktblöcke und einzelne Richtungswechsel,
+zuletzt Raten, Hindernisse, der zweite Spieler und Spielfeldzeilen, solange
+der Unterschied bleibt. Der kleinste Fall landet als JSON (für `--case`)
+und auf Wunsch als Replay (`replay.py`).
+
+Kandidaten:
+
+    engine  `SnakeEngine`
+    clone   `SnakeEngine`, nach jedem Takt über `clone()` kopiert
+    snapshot  `SnakeEngine`, nach jedem Takt über `snapshot()`/`restore()` neu aufgebaut
+    batch   `BatchSnakeEnv` mit einer Umgebung (nur Singleplayer ohne Raten;
+            benötigt NumPy)
+    baseline  das ursprüngliche `SnakeGame` aus dem ersten Commit (ohne
+            Raten; liest `Snake.py` per git)
+    modul:Klasse  eigene Engine mit der Schnittstelle von `SnakeEngine`
+
+    python difftest.py --cases 1000000
+    python difftest.py --candidate clone --out minimal.json --replay minimal.snkr
+    python difftest.py --case minimal.json
+"""
+import argparse
+import importlib
+import json
+import os
+import random
+import subprocess
+import sys
+import time
+import types
+from multiprocessing import Pool
+
+from engine import SnakeEngine, DIRECTIONS, ItemType
+from reference import ReferenceEngine, Random, START_POSITIONS, sample_free
+
+# Standardlänge der Eingabefolgen (Takte)
+MAX_TICKS = 500
+
+# So viele Fälle prüft eine Aufgabe eines Workers
+CHUNK_SIZE = 200
+
+# Höchstzahl an Testläufen beim Verkleinern
+SHRINK_RUNS = 5000
+
+# Raten, aus denen zufällige Fälle wählen (pro Takt)
+RATES = (0.01, 0.05, 0.2, 1.0)
+
+CANDIDATES = ("engine", "clone", "snapshot", "batch", "baseline")
+
+# Tasten des ursprünglichen Spiels für Spieler 2 (Spieler 1: Pfeiltasten)
+BASELINE_WASD = {"Up": "w", "Down": "s", "Left": "a", "Right": "d"}
+
+
+# -----------------------------------------------------------------------------
+# TESTFÄLLE
+# -----------------------------------------------------------------------------
+def generate_case(seed, max_ticks=MAX_TICKS):
+    """
+    Zufälliger Testfall aus einem Seed. Kleine Spielfelder, damit Wände,
+    volle Felder und Selbstkollisionen oft vorkommen. Aktionen: pro Takt und
+    Spieler 0 (Richtung beibehalten) oder 1..4 (Index in DIRECTIONS + 1).
+    """
+    rng = random.Random(seed)
+    rows = rng.randint(3, 20)
+    cols = rng.randint(3, 20)
+    players = rng.choice((1, 2))
+    item_rates = {}
+    if rng.random() < 0.5:
+        for item_type in ItemType:
+            if rng.random() < 0.5:
+                item_rates[item_type.name] = rng.choice(RATES)
+    turn = rng.choice((0.1, 0.3, 0.8))
+    actions = [[rng.randint(1, 4) if rng.random() < turn else 0 for _ in range(players)]
+               for _ in range(rng.randint(1, max_ticks))]
+    return {
+        "seed": seed,
+        "mode": "Multiplayer" if players == 2 else "Singleplayer",
+        "rows": rows,
+        "cols": cols,
+        "sparse": rng.random() < 0.2,
+        "obstacles": rng.randint(0, rows * cols // 8),
+        "item_rates": item_rates,
+        "actions": actions,
+    }
+
+
+def engine_options(case):
+    """Konstruktor-Argumente für Referenz und Kandidat."""
+    return {
+        "mode": case["mode"],
+        "rows": case["rows"],
+        "cols": case["cols"],
+        "seed": case["seed"],
+        "sparse": case["sparse"],
+        "item_rates": {ItemType[name]: rate for name, rate in case["item_rates"].items()},
+    }
+
+
+def directions(codes):
+    return [DIRECTIONS[code - 1] if code else None for code in codes]
+
+
+def setup(engine, case):
+    """Hindernisse legen und die Runde starten (wie vor dem ersten Takt im Spiel)."""
+    for _ in range(case["obstacles"]):
+        engine.spawn_obstacle()
+    engine.start()
+
+
+def state(engine):
+    """Kompletter Zustand als flaches Dict (gleiche Schlüssel für alle Engines)."""
+    fields = {
+        "tick": engine.tick,
+        "game_over": engine.game_over,
+        "death_cause": engine.death_cause,
+        "loser": engine.loser,
+        "rng": engine.rng.getstate(),
+        "items": sorted((cell, item_type.name) for cell, item_type in engine.items.items()),
+        "food_cells": list(engine.food_cells),
+        "obstacles": sorted(engine.obstacles),
+    }
+    for player, snake in enumerate(engine.snakes, 1):
+        prefix = f"snake{player}."
+        fields[prefix + "body"] = list(snake.body)
+        fields[prefix + "growth"] = snake.growth
+        fields[prefix + "velocity"] = [snake.velocity_x, snake.velocity_y]
+        fields[prefix + "position"] = [snake.x, snake.y]
+        fields[prefix + "score"] = snake.score
+        fields[prefix + "effects"] = sorted([name, count, end]
+                                            for name, (count, end) in snake.effects.items())
+    return fields
+
+
+# -----------------------------------------------------------------------------
+# KANDIDATEN
+# -----------------------------------------------------------------------------
+class EngineCandidate:
+    """Engine mit der Schnittstelle von `SnakeEngine`; alle Felder werden verglichen."""
+    fields = None
+    events = True
+
+    def __init__(self, case, engine_class=SnakeEngine):
+        self.engine = engine_class(**engine_options(case))
+        setup(self.engine, case)
+
+    @staticmethod
+    def supports(case):
+        return True
+
+    def step(self, actions, reference):
+        return self.engine.step(actions)
+
+    def state(self):
+        return state(self.engine)
+
+
+class CloneCandidate(EngineCandidate):
+    """Spielt jeden Takt auf einer frischen Kopie aus `clone()`."""
+    def __init__(self, case):
+        super().__init__(case)
+        self.engine = self.engine.clone()
+
+    def step(self, actions, reference):
+        events = self.engine.step(actions)
+        self.engine = self.engine.clone()
+        return events
+
+
+class SnapshotCandidate(EngineCandidate):
+    """Spielt jeden Takt auf einer neuen Engine, die `restore(snapshot())` aufbaut."""
+    def __init__(self, case):
+        super().__init__(case)
+        self.case = case
+        self.engine = self.copy()
+
+    def copy(self):
+        engine = SnakeEngine(**engine_options(self.case))
+        engine.restore(self.engine.snapshot())
+        return engine
+
+    def step(self, actions, reference):
+        events = self.engine.step(actions)
+        self.engine = self.copy()
+        return events
+
+
+class BatchCandidate:
+    """
+    `BatchSnakeEnv` mit einer Umgebung. Sie legt Hindernisse und Futter mit
+    derselben Stichprobe wie die Engine und läuft unabhängig von der
+    Referenz; verglichen wird alles außer Effekten und Schlangenposition.
+    """
+    fields = ("tick", "game_over", "death_cause", "rng", "items", "food_cells", "obstacles",
+              "snake1.body", "snake1.growth", "snake1.velocity", "snake1.score")
+    events = False
+
+    def __init__(self, case):
+        from batch import BatchSnakeEnv, DEATH_CAUSES
+        self.causes = DEATH_CAUSES
+        self.env = BatchSnakeEnv(1, case["rows"], case["cols"], num_obstacles=case["obstacles"],
+                                 seed=case["seed"], auto_reset=False)
+
+    @staticmethod
+    def supports(case):
+        # Dünn besetzte Felder ziehen anders; die Batch-Umgebung kennt nur dichte
+        return case["mode"] == "Singleplayer" and not case["item_rates"] and not case["sparse"]
+
+    def step(self, actions, reference):
+        direction = actions[0]
+        self.env.step([DIRECTIONS.index(direction) + 1 if direction is not None else 0])
+        return None
+
+    def state(self):
+        env = self.env
+        head = int(env.head_ptr[0])
+        body = [int(env.bodies[0, (head - i) % env.capacity]) for i in range(int(env.length[0]))]
+        food = [(int(env.red_food[0]), "RED_FOOD"), (int(env.gold_food[0]), "GOLD_FOOD")]
+        return {
+            "tick": int(env.ticks[0]),
+            "game_over": bool(env.done[0]),
+            "death_cause": self.causes[env.death_cause[0]],
+            "rng": int(env.rng_state[0]),
+            "items": sorted((cell, name) for cell, name in food if cell >= 0),
+            "food_cells": [cell for cell, _ in food if cell >= 0],
+            "obstacles": [int(cell) for cell in env.obstacles[0].nonzero()[0]],
+            "snake1.body": body,
+            "snake1.growth": int(env.growth[0]),
+            "snake1.velocity": [int(env.velocity_x[0]), int(env.velocity_y[0])],
+            "snake1.score": int(env.score[0]),
+        }
+
+
+class FakeTk:
+    """Ersatz für `tkinter.Tk` und `tkinter.Canvas`: jede Methode tut nichts und liefert 0."""
+    def __init__(self, *args, **kwargs):
+        pass
+
+    def __getattr__(self, name):
+        return lambda *args, **kwargs: 0
+
+
+baseline_module = None
+
+
+def load_baseline():
+    """
+    Das ursprüngliche Spiel (`Snake.py` im ersten Commit) als Modul; tkinter
+    wird dabei durch `FakeTk` ersetzt. Ohne git oder Historie ImportError.
+    """
+    global baseline_module
+    if baseline_module is None:
+        def git(*args):
+            result = subprocess.run(("git",) + args, capture_output=True, text=True,
+                                    cwd=os.path.dirname(os.path.abspath(__file__)))
+            if result.returncode:
+                raise OSError(result.stderr.strip() or f"git {args[0]} fehlgeschlagen")
+            return result.stdout
+
+        try:
+            roots = git("rev-list", "--max-parents=0", "HEAD").split()
+            if not roots:
+                raise OSError("keine Commits")
+            root = roots[-1]
+            source = git("show", f"{root}:Snake.py")
+        except OSError as error:
+            raise ImportError(
+                "braucht git und die Historie des Repositorys "
+                f"(Snake.py aus dem ersten Commit), etwa nicht in einem Quell-Archiv: {error}"
+            ) from None
+        tkinter = types.ModuleType("tkinter")
+        tkinter.Tk = tkinter.Canvas = FakeTk
+        saved = sys.modules.get("tkinter")
+        sys.modules["tkinter"] = tkinter
+        try:
+            module = types.ModuleType("snake_baseline")
+            exec(compile(source, f"{root[:7]}:Snake.py", "exec"), module.__dict__)
+        finally:
+            if saved is None:
+                del sys.modules["tkinter"]
+            else:
+                sys.modules["tkinter"] = saved
+        baseline_module = module
+    return baseline_module
+
+
+class BaselineCandidate:
+    """
+    Das ursprüngliche `SnakeGame` (erster Commit, ohne Fenster), gesteuert
+    über `on_key_press` und `move()`.
+
+    Es kennt nur das Futterpaar und legt Futter und Hindernisse per `random`
+    irgendwohin, auch auf Schlangen. Beides wird ersetzt: gespawnt wird mit
+    der Stichprobe der Referenz auf dem Zustand des Originals, ein volles
+    Feld beendet das Spiel ("board_full"). Die Startpositionen werden auf
+    kleinen Feldern wie in der Referenz an den Rand gezogen. Alles andere
+    (Bewegung, Wachstum, Punkte, Goldglanz, Kollisionen) sind die alten
+    Regeln. Nach dem Spielende zählen nur noch Ursache, Punkte und
+    Position: tote Körper und danach gezogenes Futter hält das Original
+    anders fest.
+    """
+    fields = None
+    events = False
+
+    def __init__(self, case):
+        module = load_baseline()
+        self.module = module
+        self.case = case
+        self.rows = case["rows"]
+        self.cols = case["cols"]
+        self.rng = Random(case["seed"])
+        self.resize()
+        self.game = game = module.SnakeGame()
+        game.mode = case["mode"]
+        game.spawn_food_pair = self.spawn_food_pair
+        game.spawn_obstacle = self.spawn_obstacle
+        game.save_highscore = lambda: None
+        self.sounds = []    # Ereignisnamen über play_sound
+        game.play_sound = self.sounds.append
+        tile = module.TILE_SIZE
+        for player, (x, y) in enumerate(START_POSITIONS, 1):
+            x = min(x, self.cols - 1) * tile
+            y = min(y, self.rows - 1) * tile
+            setattr(game, f"snake{player}", module.Tile(x, y))
+            setattr(game, f"snake_body{player}", [module.Tile(x, y)])
+        for _ in range(case["obstacles"]):
+            game.spawn_obstacle()
+        game.spawn_food_pair()
+
+    @staticmethod
+    def supports(case):
+        return not case["item_rates"]
+
+    def resize(self):
+        """Spielfeldgröße des Falls in die Modulkonstanten des Originals schreiben."""
+        module = self.module
+        module.ROWS = self.rows
+        module.COLS = self.cols
+        module.WINDOW_WIDTH = self.cols * module.TILE_SIZE
+        module.WINDOW_HEIGHT = self.rows * module.TILE_SIZE
+
+    def bodies(self):
+        bodies = [self.game.snake_body1]
+        if self.case["mode"] == "Multiplayer":
+            bodies.append(self.game.snake_body2)
+        return bodies
+
+    def cell(self, tile):
+        size = self.module.TILE_SIZE
+        x = tile.x // size
+        y = tile.y // size
+        return y * self.cols + x if 0 <= x < self.cols and 0 <= y < self.rows else None
+
+    def sample(self):
+        occupied = {self.cell(tile) for tile in self.game.items + self.game.obstacles}
+        for body in self.bodies():
+            occupied.update(self.cell(tile) for tile in body)
+        occupied.discard(None)
+        cell = sample_free(self.rng, occupied, self.rows * self.cols, self.case["sparse"])
+        if cell is None:
+            return None
+        size = self.module.TILE_SIZE
+        return cell % self.cols * size, cell // self.cols * size
+
+    def spawn_food_pair(self):
+        for item_type in (self.module.ItemType.RED_FOOD, self.module.ItemType.GOLD_FOOD):
+            position = self.sample()
+            if position is None:
+                if item_type is self.module.ItemType.RED_FOOD:
+                    self.game.game_over = True
+                    self.sounds.append("board_full")
+                return
+            self.game.items.append(self.module.Item(*position, item_type))
+
+    def spawn_obstacle(self):
+        position = self.sample()
+        if position is not None:
+            self.game.obstacles.append(self.module.Tile(*position))
+
+    def step(self, actions, reference):
+        self.resize()
+        del self.sounds[:]
+        for player, direction in enumerate(actions, 1):
+            if direction is not None:
+                keysym = direction.value if player == 1 else BASELINE_WASD[direction.value]
+                self.game.on_key_press(types.SimpleNamespace(keysym=keysym))
+        self.game.move()
+        return None
+
+    def expected_state(self, reference):
+        """Die Felder der Referenz, die das Original auch kennt."""
+        fields = {
+            "game_over": reference.game_over,
+            "death_cause": reference.death_cause,
+            "events": [name for name, _ in reference.events],
+        }
+        for player, snake in enumerate(reference.snakes, 1):
+            prefix = f"snake{player}."
+            fields[prefix + "position"] = [snake.x, snake.y]
+            fields[prefix + "velocity"] = [snake.velocity_x, snake.velocity_y]
+            fields[prefix + "score"] = snake.score
+            fields[prefix + "gold_glow"] = "gold_glow" in snake.effects
+            if not reference.game_over:
+                fields[prefix + "body"] = list(snake.body)
+                fields[prefix + "growth"] = snake.growth
+        if not reference.game_over:
+            fields["rng"] = reference.rng.getstate()
+            fields["items"] = sorted((cell, item_type.name)
+                                     for cell, item_type in reference.items.items())
+            fields["obstacles"] = sorted(reference.obstacles)
+        return fields
+
+    def state(self):
+        game = self.game
+        causes = [name for name in self.sounds if name != "item_eaten"]
+        fields = {
+            "game_over": game.game_over,
+            "death_cause": causes[-1] if causes else None,
+            "events": list(self.sounds),
+        }
+        size = self.module.TILE_SIZE
+        for player, body in enumerate(self.bodies(), 1):
+            prefix = f"snake{player}."
+            head = getattr(game, f"snake{player}")
+            fields[prefix + "position"] = [head.x // size, head.y // size]
+            fields[prefix + "velocity"] = [getattr(game, f"velocity_x{player}"),
+                                           getattr(game, f"velocity_y{player}")]
+            fields[prefix + "score"] = getattr(game, f"score{player}")
+            fields[prefix + "gold_glow"] = getattr(game, f"gold_glow_timer{player}") > 0
+            if not game.game_over:
+                # Wachstum hängt das Original als Kopie des letzten Glieds an
+                cells = [self.cell(tile) for tile in body]
+                growth = 0
+                while len(cells) > 1 and cells[-1] == cells[-2]:
+                    cells.pop()
+                    growth += 1
+                fields[prefix + "body"] = cells
+                fields[prefix + "growth"] = growth
+        if not game.game_over:
+            fields["rng"] = self.rng.getstate()
+            fields["items"] = sorted((self.cell(item), item.item_type.name) for item in game.items)
+            fields["obstacles"] = sorted(self.cell(tile) for tile in game.obstacles)
+        return fields
+
+
+def candidate_factory(name):
+    """Kandidat zu einem Namen aus CANDIDATES oder "modul:Klasse"."""
+    if name == "engine":
+        return EngineCandidate
+    if name == "clone":
+        return CloneCandidate
+    if name == "snapshot":
+        return SnapshotCandidate
+    if name == "batch":
+        return BatchCandidate
+    if name == "baseline":
+        load_baseline()
+        return BaselineCandidate
+    module_name, _, attr = name.partition(":")
+    engine_class = getattr(importlib.import_module(module_name), attr)
+    return lambda case: EngineCandidate(case, engine_class)
+
+
+# -----------------------------------------------------------------------------
+# VERGLEICH
+# -----------------------------------------------------------------------------
+def compare(expected, actual, fields):
+    """Erstes abweichendes Feld als (Name, erwartet, tatsächlich) oder None."""
+    names = fields if fields is not None else sorted(set(expected) | set(actual))
+    for name in names:
+        if expected.get(name) != actual.get(name):
+            return name, expected.get(name), actual.get(name)
+    return None
+
+
+def run_case(case, factory):
+    """
+    Spielt einen Fall mit Referenz und Kandidat. Gibt None zurück oder die
+    erste Abweichung als Dict (Takt, Feld, erwartet, tatsächlich).
+    """
+    reference = ReferenceEngine(**engine_options(case))
+    setup(reference, case)
+    candidate = factory(case)
+    expected_state = getattr(candidate, "expected_state", state)
+
+    tick = 0
+    while True:
+        diff = compare(expected_state(reference), candidate.state(), candidate.fields)
+        if diff is not None:
+            name, expected, actual = diff
+            return {"tick": tick, "field": name, "expected": expected, "actual": actual}
+        if reference.game_over or tick == len(case["actions"]):
+            return None
+        actions = directions(case["actions"][tick])
+        tick += 1
+        expected = reference.step(actions)
+        actual = candidate.step(actions, reference)
+        if candidate.events and expected != actual:
+            return {"tick": tick, "field": "events", "expected": expected, "actual": actual}
+
+
+def run_case_safe(case, factory):
+    """Wie `run_case`; ein Absturz des Kandidaten zählt als Abweichung."""
+    try:
+        return run_case(case, factory)
+    except Exception as error:
+        return {"tick": None, "field": "exception", "expected": None, "actual": repr(error)}
+
+
+# -----------------------------------------------------------------------------
+# VERKLEINERN
+# -----------------------------------------------------------------------------
+def simplifications(case):
+    """Einfachere Varianten eines Falls (weniger Raten, Hindernisse, Spieler, Zeilen)."""
+    if case["item_rates"]:
+        yield dict(case, item_rates={})
+        for name in case["item_rates"]:
+            rates = dict(case["item_rates"])
+            del rates[name]
+            yield dict(case, item_rates=rates)
+    if case["obstacles"]:
+        yield dict(case, obstacles=0)
+        yield dict(case, obstacles=case["obstacles"] // 2)
+        yield dict(case, obstacles=case["obstacles"] - 1)
+    if case["mode"] == "Multiplayer":
+        yield dict(case, mode="Singleplayer", actions=[tick[:1] for tick in case["actions"]])
+    if case["sparse"]:
+        yield dict(case, sparse=False)
+    if case["rows"] > 1:
+        yield dict(case, rows=case["rows"] - 1)
+    if case["cols"] > 1:
+        yield dict(case, cols=case["cols"] - 1)
+
+
+def shrink(case, factory, max_runs=SHRINK_RUNS):
+    """
+    Verkleinert einen fehlschlagenden Fall, solange er weiter abweicht
+    (irgendeine Abweichung, nicht unbedingt dieselbe). Gibt den kleinsten
+    Fall und seine Abweichung zurück.
+    """
+    runs = 0
+
+    def diverges(trial):
+        nonlocal runs
+        if runs >= max_runs or not factory_supports(factory, trial):
+            return None
+        runs += 1
+        return run_case_safe(trial, factory)
+
+    divergence = diverges(case)
+    if divergence is None:
+        return case, None
+    changed = True
+    while changed and runs < max_runs:
+        changed = False
+        # Alles hinter der Abweichung weglassen
+        if divergence["tick"] is not None and divergence["tick"] < len(case["actions"]):
+            case = dict(case, actions=case["actions"][:divergence["tick"]])
+
+        # Taktblöcke entfernen, große zuerst
+        size = len(case["actions"]) // 2
+        while size >= 1:
+            i = 0
+            while i < len(case["actions"]):
+                trial = dict(case, actions=case["actions"][:i] + case["actions"][i + size:])
+                result = diverges(trial)
+                if result is not None:
+                    case, divergence, changed = trial, result, True
+                else:
+                    i += size
+            size //= 2
+
+        # Einzelne Richtungswechsel weglassen
+        for i, codes in enumerate(case["actions"]):
+            for player, code in enumerate(codes):
+                if code:
+                    actions = [list(tick) for tick in case["actions"]]
+                    actions[i][player] = 0
+                    trial = dict(case, actions=actions)
+                    result = diverges(trial)
+                    if result is not None:
+                        case, divergence, changed = trial, result, True
+
+        # Einstellungen vereinfachen
+        for trial in simplifications(case):
+            result = diverges(trial)
+            if result is not None:
+                case, divergence, changed = trial, result, True
+                break
+    return case, divergence
+
+
+def factory_supports(factory, case):
+    """Kann der Kandidat diesen Fall spielen (z.B. Batch nur Singleplayer)?"""
+    supports = getattr(factory, "supports", None)
+    return supports is None or supports(case)
+
+
+def write_replay(path, case):
+    """Schreibt die Eingaben eines Falls als Replay (`replay.py`), gespielt von `SnakeEngine`."""
+    from replay import ReplayWriter
+    engine = SnakeEngine(**engine_options(case))
+    setup(engine, case)
+    writer = ReplayWriter(path, engine)
+    for codes in case["actions"]:
+        if engine.game_over:
+            break
+        engine.step(directions(codes))
+    writer.close()
+
+
+# -----------------------------------------------------------------------------
+# KOMMANDOZEILE
+# -----------------------------------------------------------------------------
+def run_chunk(task):
+    """Worker: prüft einen Seed-Bereich; bricht beim ersten abweichenden Fall ab."""
+    candidate, first_seed, count, max_ticks = task
+    factory = candidate_factory(candidate)
+    checked = 0
+    ticks = 0
+    for seed in range(first_seed, first_seed + count):
+        case = generate_case(seed, max_ticks)
+        if not factory_supports(factory, case):
+            continue
+        divergence = run_case_safe(case, factory)
+        checked += 1
+        ticks += len(case["actions"])
+        if divergence is not None:
+            return checked, ticks, seed, divergence
+    return checked, ticks, None, None
+
+
+def report(case, divergence, stream=sys.stdout):
+    print(f"Fall: {case['mode']} {case['cols']}x{case['rows']}, Hindernisse {case['obstacles']}, "
+          f"Raten {case['item_rates'] or '-'}, {len(case['actions'])} Takte", file=stream)
+    print(f"Abweichung in Takt {divergence['tick']}, Feld {divergence['field']}:", file=stream)
+    print(f"  Referenz: {divergence['expected']}", file=stream)
+    print(f"  Kandidat: {divergence['actual']}", file=stream)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Differenztest gegen die Referenzregeln.")
+    parser.add_argument("--candidate", default="engine",
+                        help=f"{', '.join(CANDIDATES)} oder modul:Klasse")
+    parser.add_argument("--cases", type=int, default=10_000)
+    parser.add_argument("--seed", type=int, default=0, help="erster Seed")
+    parser.add_argument("--max-ticks", type=int, default=MAX_TICKS)
+    parser.add_argument("--workers", type=int, default=os.cpu_count())
+    parser.add_argument("--chunk", type=int, default=CHUNK_SIZE, help="Fälle pro Aufgabe")
+    parser.add_argument("--case", help="einen gespeicherten Fall (JSON) erneut prüfen")
+    parser.add_argument("--out", help="verkleinerten Fall als JSON hierhin schreiben")
+    parser.add_argument("--replay", help="verkleinerten Fall als Replay (.snkr) hierhin schreiben")
+    args = parser.parse_args(argv)
+
+    try:
+        factory = candidate_factory(args.candidate)
+    except (ImportError, AttributeError, ValueError) as error:
+        print(f"Kandidat {args.candidate} nicht verfügbar: {error}", file=sys.stderr)
+        return 2
+
+    if args.case:
+        with open(args.case) as file:
+            case = json.load(file)
+        divergence = run_case_safe(case, factory)
+        if divergence is None:
+            print("keine Abweichung")
+            return 0
+        report(case, divergence)
+        return 1
+
+    start = time.perf_counter()
+    tasks = [(args.candidate, first, min(args.chunk, args.seed + args.cases - first), args.max_ticks)
+             for first in range(args.seed, args.seed + args.cases, args.chunk)]
+    checked = 0
+    ticks = 0
+    failure = None
+    with Pool(args.workers) as pool:
+        for count, chunk_ticks, seed, divergence in pool.imap(run_chunk, tasks):
+            checked += count
+            ticks += chunk_ticks
+            print(f"\r{checked} Fälle, {ticks} Takte, {time.perf_counter() - start:.1f} s",
+                  end="", file=sys.stderr, flush=True)
+            if seed is not None:
+                failure = seed
+                break
+    print(file=sys.stderr)
+
+    if failure is None:
+        print(f"{checked} Fälle ({ticks} Takte) ohne Abweichung")
+        return 0
+
+    case = generate_case(failure, args.max_ticks)
+    print(f"Seed {failure} weicht ab:")
+    report(case, run_case_safe(case, factory))
+    case, divergence = shrink(case, factory)
+    print("Verkleinert:")
+    report(case, divergence)
+    if args.out:
+        with open(args.out, "w") as file:
+            json.dump(case, file)
+    if args.replay:
+        write_replay(args.replay, case)
+    return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,982 @@
+import heapq
+import random
+import struct
+import sys
+from array import array
+from enum import Enum
+
+# Konstanten für das Spielfeld (in Kacheln, nicht in Pixeln)
+ROWS = 25
+COLS = 25
+
+class Direction(Enum):
+    UP = "Up"
+    DOWN = "Down"
+    LEFT = "Left"
+    RIGHT = "Right"
+
+class Difficulty(Enum):
+    EASY = 150
+    MEDIUM = 100
+    HARD = 50
+
+class ItemType(Enum):
+    RED_FOOD = 1       # Rotes Futter
+    GOLD_FOOD = 2      # Goldenes Futter
+    POISON = 3
+    SPEED_BOOST = 4
+    SLOWDOWN = 5
+
+# Feste Reihenfolge der Richtungen (z.B. für Codes in Replay-Dateien)
+DIRECTIONS = (Direction.UP, Direction.DOWN, Direction.LEFT, Direction.RIGHT)
+
+# Bewegungsvektor je Richtung (in Kacheln)
+DIRECTION_VECTORS = {
+    Direction.UP: (0, -1),
+    Direction.DOWN: (0, 1),
+    Direction.LEFT: (-1, 0),
+    Direction.RIGHT: (1, 0),
+}
+
+# Startpositionen der Schlangen (in Kacheln)
+START_POSITIONS = ((5, 5), (15, 15))
+
+# Ab dieser Zellanzahl wird das Spielfeld dünn besetzt (sparse) gespeichert
+SPARSE_CELLS = 256 * 256
+
+# Fehlversuche beim Ziehen einer freien Zelle, bevor gezielt gesucht wird
+SAMPLE_TRIES = 64
+
+# Zeitlich begrenzte Effekte pro Spieler; im kompakten Zustand als Index gespeichert
+EFFECTS = ("gold_glow", "speed_boost", "slowdown")
+
+# Dauer der Effekte in Takten
+EFFECT_TICKS = {"gold_glow": 30, "speed_boost": 100, "slowdown": 100}
+
+# Höchstens so viele Items eines Typs liegen gleichzeitig (zufällig gespawnte)
+MAX_SPAWNED_ITEMS = 3
+
+# Todesursachen; im kompakten Zustand als Index gespeichert (0 = Spiel läuft).
+# Die letzten drei gibt es nur in der Arena (arena.py).
+DEATH_CAUSES = (None, "wall_collision", "game_over", "obstacle_collision", "board_full",
+                "head_collision", "body_collision", "swap_collision")
+
+# Inhalt einer Zelle (ein Byte, siehe Board): die unteren drei Bits sind der
+# Item-Typ (ItemType.value) oder OBSTACLE, darüber ein Bit pro Schlange
+CONTENT_MASK = 0x07
+OBSTACLE = 0x07
+SNAKE_BIT = 0x08
+
+# Item-Typ je Inhalts-Code (None = leer oder Hindernis)
+ITEM_TYPES = (None, *ItemType, None, None)
+
+# Level-Belegung (1 = Wand) -> Inhalts-Code
+WALL_CODES = bytes([0] + [OBSTACLE] * 255)
+
+# Kompakter Zustand (siehe SnakeEngine.snapshot)
+STATE_VERSION = 4
+# Version, Spieler, rows, cols, Flags, Ursache, Verlierer, Takt, Seed,
+# Zustand des Zufallsgenerators
+STATE_HEADER = struct.Struct("<BBHHBBBIQQ")
+# Länge, Wachstum, velocity_x, velocity_y, Punkte, Kopf x, Kopf y (auch
+# außerhalb des Felds, z.B. nach einer Wand-Kollision)
+SNAKE_STATE = struct.Struct("<IIbbIii")
+# Anzahl Hindernisse, Items, Futter-Zellen, laufende Effekte
+STATE_COUNTS = struct.Struct("<IHBH")
+# Ende (Takt), Spieler, Effekt
+EFFECT_ENTRY = struct.Struct("<IBB")
+# Item-Typ, Schwelle für `SplitMix64.next64()`
+RATE_ENTRY = struct.Struct("<BQ")
+FLAG_SPARSE, FLAG_GAME_OVER, FLAG_ITEM_RATES, FLAG_ARENA, FLAG_SPAWN_ZONE = 1, 2, 4, 8, 16
+
+
+def cell_code(num_cells):
+    """struct-/array-Code für Zellindizes: 16 Bit, auf sehr großen Feldern 32 Bit."""
+    return "H" if num_cells <= 0x10000 else "I"
+
+
+def pack_cells(cells):
+    """Zellindizes eines Arrays als Little-Endian-Bytes (wie im Snapshot)."""
+    if sys.byteorder == "big":
+        cells = array(cells.typecode, cells)
+        cells.byteswap()
+    return cells.tobytes()
+
+
+def unpack_cells(code, data):
+    """Gegenstück zu `pack_cells`: Bytes -> Array von Zellindizes."""
+    cells = array(code, data)
+    if sys.byteorder == "big":
+        cells.byteswap()
+    return cells
+
+
+def zone_cells(zone, num_cells):
+    """Zellindizes der gesetzten Bits einer Bitmap (Bit c von Byte c // 8), aufsteigend."""
+    cells = array(cell_code(num_cells))
+    for index, byte in enumerate(zone):
+        if byte:
+            base = index * 8
+            cells.extend(base + bit for bit in range(8) if byte >> bit & 1)
+    return cells
+
+
+def rate_threshold(rate):
+    """Wahrscheinlichkeit pro Takt als Schwelle für 64-Bit-Zufallszahlen (exakt reproduzierbar)."""
+    return min(int(rate * (1 << 64)), MASK64)
+
+MASK64 = (1 << 64) - 1
+
+class SplitMix64:
+    """
+    Kleiner Zufallsgenerator (SplitMix64) mit einem einzigen 64-Bit-Zustand.
+
+    Anders als `random.Random` ist die Zahlenfolge unabhängig von der
+    Python-Version festgelegt, und der Zustand passt in 8 Bytes. Damit lassen
+    sich Spiele aus Seed und Eingaben exakt reproduzieren.
+    """
+    def __init__(self, seed=0):
+        self.state = seed & MASK64
+
+    def next64(self):
+        """Nächste 64-Bit-Zufallszahl."""
+        self.state = z = (self.state + 0x9E3779B97F4A7C15) & MASK64
+        z = ((z ^ (z >> 30)) * 0xBF58476D1CE4E5B9) & MASK64
+        z = ((z ^ (z >> 27)) * 0x94D049BB133111EB) & MASK64
+        return z ^ (z >> 31)
+
+    def randrange(self, n):
+        """Gleichverteilte Zahl in 0..n-1 (ohne Modulo-Verzerrung)."""
+        limit = MASK64 - (MASK64 + 1) % n
+        z = self.next64()
+        while z > limit:
+            z = self.next64()
+        return z % n
+
+    def getstate(self):
+        return self.state
+
+    def setstate(self, state):
+        self.state = state
+
+class Snake:
+    """
+    Zustand einer Schlange: Kopf, Körper, Richtung, Punkte und Effekte.
+
+    Der Körper ist ein `array` von Zellindizes (y * cols + x) mit dem Kopf
+    an Position 0: Bewegen heißt vorne einfügen und hinten entfernen (ein
+    memmove, auch bei tausenden Zellen schneller als der Rest des Takts).
+    Welche Zellen zur Schlange gehören, steht im Board (Bit `bit`), nicht
+    in der Schlange selbst. Wachstum wird in `growth` vorgemerkt; solange
+    es aussteht, bleibt das Schwanzende beim nächsten Schritt liegen.
+
+    `effects` enthält nur die laufenden Effekte: Name -> [Anzahl, Ende],
+    d.h. wie viele Instanzen gerade wirken und wann die letzte abläuft.
+    """
+    __slots__ = ("x", "y", "body", "bit", "growth", "velocity_x", "velocity_y",
+                 "score", "effects")
+
+    def __init__(self, x, y, cols, bit=SNAKE_BIT, code="H"):
+        self.x = x
+        self.y = y
+        self.body = array(code, (y * cols + x,))
+        self.bit = bit
+        self.growth = 0
+        self.velocity_x = 0
+        self.velocity_y = 0
+        self.score = 0
+        self.effects = {}
+
+    def copy(self):
+        """Unabhängige Kopie (Körper als Array-Kopie)."""
+        snake = Snake.__new__(Snake)
+        snake.x = self.x
+        snake.y = self.y
+        snake.body = self.body[:]
+        snake.bit = self.bit
+        snake.growth = self.growth
+        snake.velocity_x = self.velocity_x
+        snake.velocity_y = self.velocity_y
+        snake.score = self.score
+        snake.effects = {name: state[:] for name, state in self.effects.items()}
+        return snake
+
+class Board:
+    """
+    Inhalt aller Zellen als bytearray (ein Byte je Zelle).
+
+    Die unteren drei Bits sind der Item-Typ oder OBSTACLE, darüber steht
+    ein Bit pro Schlange, deren Körper die Zelle belegt; 0 heißt frei.
+    Die Spiellogik liest und setzt `cells` direkt (`cells[c] |= bit`), eine
+    Kopie ist ein einziger memcpy. Freie Zellen werden nicht mitgezählt:
+    `find(0)`/`count(0)` laufen in C und werden nur beim Spawnen gebraucht.
+
+    Gezogen wird per Rejection-Sampling (bei einem freien Anteil p im
+    Mittel 1/p Versuche); erst nach SAMPLE_TRIES Fehlversuchen wird die
+    k-te freie Zelle gesucht. Welche Zelle gezogen wird, hängt damit nur
+    von der Belegung ab, nicht von der Reihenfolge früherer Züge.
+    """
+    __slots__ = ("num_cells", "cells")
+
+    def __init__(self, num_cells):
+        self.num_cells = num_cells
+        self.cells = bytearray(num_cells)
+
+    def __len__(self):
+        """Anzahl freier Zellen."""
+        return self.cells.count(0)
+
+    def is_free(self, cell):
+        return not self.cells[cell]
+
+    def add(self, cell, bits):
+        """Setzt Bits einer Zelle (Item-Typ, OBSTACLE oder Schlangen-Bit)."""
+        self.cells[cell] |= bits
+
+    def remove(self, cell, bits):
+        """Löscht Bits einer Zelle."""
+        self.cells[cell] &= ~bits
+
+    def load(self, occupancy):
+        """Übernimmt die Wände eines Levels (ein Byte pro Zelle, 1 = Wand)."""
+        self.cells = bytearray(occupancy).translate(WALL_CODES)
+
+    def copy(self):
+        board = Board.__new__(Board)
+        board.num_cells = self.num_cells
+        board.cells = self.cells[:]
+        return board
+
+    def sample(self, rng):
+        """Gleichverteilt gezogene freie Zelle oder None, wenn alles belegt ist."""
+        cells = self.cells
+        first = cells.find(0)
+        if first < 0:
+            return None
+        num_cells = self.num_cells
+        for _ in range(SAMPLE_TRIES):
+            cell = rng.randrange(num_cells)
+            if not cells[cell]:
+                return cell
+        # Fast alles belegt: k-te freie Zelle in Zellreihenfolge
+        cell = first
+        for _ in range(rng.randrange(cells.count(0))):
+            cell = cells.find(0, cell + 1)
+        return cell
+
+class SparseCells(dict):
+    """
+    Dict Zelle -> Inhalt für `SparseBoard`: fehlende Zellen lesen sich als
+    0. Es stehen nur belegte Zellen darin; wer eine Zelle leert, löscht sie
+    (`del`), statt 0 zu schreiben.
+    """
+    __slots__ = ()
+
+    def __missing__(self, cell):
+        return 0
+
+class SparseBoard(Board):
+    """
+    Board für sehr große Spielfelder: nur belegte Zellen stehen im Dict.
+
+    Gleiche Kodierung und Schnittstelle wie `Board` (`cells[cell]` ist auch
+    hier der Inhalt); der Speicherbedarf hängt aber von der Anzahl belegter
+    Zellen ab, nicht von der Spielfeldgröße. Freie Zellen werden per
+    Rejection-Sampling gezogen (bei dünner Belegung im Mittel ein Versuch);
+    erst nach SAMPLE_TRIES Fehlversuchen wird ab einer Zufallsposition
+    linear nach einer freien Zelle gesucht.
+    """
+    __slots__ = ()
+
+    def __init__(self, num_cells):
+        self.num_cells = num_cells
+        self.cells = SparseCells()
+
+    def __len__(self):
+        return self.num_cells - len(self.cells)
+
+    def is_free(self, cell):
+        return cell not in self.cells
+
+    def remove(self, cell, bits):
+        cells = self.cells
+        value = cells[cell] & ~bits
+        if value:
+            cells[cell] = value
+        else:
+            cells.pop(cell, None)
+
+    def copy(self):
+        board = SparseBoard.__new__(SparseBoard)
+        board.num_cells = self.num_cells
+        board.cells = SparseCells(self.cells)
+        return board
+
+    def sample(self, rng):
+        """Zufällige freie Zelle oder None, wenn alles belegt ist."""
+        cells = self.cells
+        num_cells = self.num_cells
+        if len(cells) >= num_cells:
+            return None
+        for _ in range(SAMPLE_TRIES):
+            cell = rng.randrange(num_cells)
+            if cell not in cells:
+                return cell
+        cell = rng.randrange(num_cells)
+        while cell in cells:
+            cell = (cell + 1) % num_cells
+        return cell
+
+class SnakeEngine:
+    """
+    Headless Spiel-Engine: enthält die komplette Spiellogik ohne Fenster.
+
+    Die Engine besitzt Spielfeld, Schlangen, Items, Punkte und den
+    Zufallsgenerator. Mit `step(actions)` wird genau ein Spieltakt berechnet;
+    die Tk-Oberfläche (`SnakeGame`) ist nur noch ein Frontend dafür.
+    Koordinaten sind Kachel-Koordinaten (0..cols-1, 0..rows-1).
+
+    Der Zustand liegt in wenigen Puffern: das Board (ein Byte pro Zelle für
+    Items, Hindernisse und Schlangen), pro Schlange der Körper als `array`,
+    die Item- und Hinderniszellen als `array`, dazu ein paar Zahlen. `clone()`
+    kopiert nur diese Puffer. Ab SPARSE_CELLS Zellen (oder mit `sparse=True`)
+    ist das Board ein Dict der belegten Zellen.
+
+    Mit einem Level (`levels.Level`) bestimmt dieses Spielfeldgröße, Wände,
+    Startpositionen, die Spawn-Zone und die Spawn-Raten für Items; `reset()`
+    stellt dann dessen Anfangszustand her. `item_rates` ({ItemType: Rate
+    pro Takt}) ersetzt die Raten des Levels; ohne Raten erscheint wie bisher
+    nur das Futterpaar.
+
+    Effekte (Gold-Glow, Speed-Boost, Slowdown) gehören dem Spieler, der das
+    Item gefressen hat. Ihr Ablauf steht in einem Heap nach Takt; ein Takt
+    tut nur dann etwas dafür, wenn ein Effekt wirklich endet.
+    """
+    def __init__(self, mode="Singleplayer", rows=ROWS, cols=COLS, seed=None, sparse=None,
+                 level=None, item_rates=None):
+        if level is not None:
+            rows, cols = level.rows, level.cols
+        self.rows = rows
+        self.cols = cols
+        self.mode = mode
+        if sparse is None:
+            sparse = rows * cols >= SPARSE_CELLS
+        self.sparse = sparse
+        self.level = level
+        self.item_rates = item_rates
+        # Optionales Eingabe-Protokoll (z.B. `replay.ReplayWriter`)
+        self.input_log = None
+        self.reset(seed)
+
+    def set_level(self, level, rows=None, cols=None, seed=None):
+        """
+        Wechselt das Level (None = leeres Feld, optional mit neuer Größe) und
+        setzt das Spiel zurück. Das Level liegt schon fertig im Speicher,
+        der Wechsel kostet daher kaum mehr als `reset()`.
+        """
+        if level is not None:
+            rows, cols = level.rows, level.cols
+        self.rows = rows or self.rows
+        self.cols = cols or self.cols
+        self.sparse = self.rows * self.cols >= SPARSE_CELLS
+        self.level = level
+        self.reset(seed)
+
+    def reset(self, seed=None):
+        """Setzt das Spiel zurück. Ohne Seed wird ein zufälliger gewählt."""
+        if seed is None:
+            seed = random.randrange(2 ** 32)
+        self.seed = seed
+        self.rng = SplitMix64(seed)
+
+        # Inhalt aller Zellen (Items, Hindernisse, Schlangen) und freie Zellen
+        num_cells = self.rows * self.cols
+        code = cell_code(num_cells)
+        board = self.board = (SparseBoard if self.sparse else Board)(num_cells)
+
+        # Hindernisse (Zellindizes) und Spawn-Zone für Items (None = überall)
+        level = self.level
+        if level is None:
+            self.obstacles = array(code)
+            self.spawn_zone = None
+            self.spawn_cells = None
+        else:
+            if self.sparse:
+                for cell in level.obstacle_cells:
+                    board.add(cell, OBSTACLE)
+            else:
+                board.load(level.occupancy)
+            self.obstacles = array(code, level.obstacle_cells)
+            self.spawn_zone = level.spawn_zone
+            self.spawn_cells = level.spawn_cells
+
+        # Nur die Schlangen des aktuellen Modus
+        self.snakes = [Snake(x, y, self.cols, self.snake_bit(player), code)
+                       for player, (x, y) in enumerate(self.start_positions(), 1)]
+        for snake in self.snakes:
+            board.add(snake.body[0], snake.bit)
+
+        # Items: Hier legen wir ALLE Items (Futter, Gift etc.) ab; der Typ
+        # steht im Board, `item_cells` zählt die Zellen in Spawn-Reihenfolge auf
+        self.item_cells = array(code)
+        self.food_cells = ()
+
+        self.tick = 0
+        self.game_over = False
+        self.death_cause = None
+        self.loser = None
+
+        # Laufende Effekte als Heap von (Ende, Spieler, Effekt-Code)
+        self.effect_queue = []
+
+        # Zufällig erscheinende Items: (ItemType, Schwelle) für alle Raten > 0
+        rates = self.item_rates
+        if rates is None:
+            rates = level.item_rates if level is not None else {}
+        self.spawn_rates = tuple((item_type, rate_threshold(rates[item_type]))
+                                 for item_type in ItemType if rates.get(item_type, 0) > 0)
+
+        # Ereignisse des letzten Takts: (name, player)
+        self.events = []
+
+    @property
+    def num_players(self):
+        """Anzahl der aktiven Schlangen im aktuellen Modus."""
+        return 2 if self.mode == "Multiplayer" else 1
+
+    def snake_bit(self, player):
+        """Bit der Schlange im Board (eines pro Spieler, Schlangen dürfen sich kreuzen)."""
+        return SNAKE_BIT << (player - 1)
+
+    def start_positions(self):
+        """Startpositionen (x, y) der Schlangen des aktuellen Modus."""
+        if self.level is not None:
+            positions = self.level.start_positions
+        else:
+            # Auf kleinen Spielfeldern an den Rand geschoben
+            positions = [(min(x, self.cols - 1), min(y, self.rows - 1))
+                         for x, y in START_POSITIONS]
+        return positions[:self.num_players]
+
+    def set_direction(self, player, direction):
+        """
+        Setzt die Richtung eines Spielers. Eine direkte Umkehr wird ignoriert.
+        Gibt True zurück, wenn die Richtung übernommen wurde.
+        """
+        if player > len(self.snakes):
+            return False
+        snake = self.snakes[player - 1]
+        dx, dy = DIRECTION_VECTORS[direction]
+        if dx and snake.velocity_x == -dx or dy and snake.velocity_y == -dy:
+            return False
+        snake.velocity_x = dx
+        snake.velocity_y = dy
+        if self.input_log is not None:
+            self.input_log.record(self.tick, player, direction)
+        return True
+
+    def start(self):
+        """Beginnt die Runde: legt das erste Futterpaar aus."""
+        self.spawn_food_pair()
+
+    def step(self, actions=None):
+        """
+        Berechnet einen Spieltakt.
+
+        `actions` enthält pro Spieler eine `Direction` oder None (Richtung
+        beibehalten). Gibt die Liste der Ereignisse dieses Takts zurück.
+        """
+        self.events = []
+        if self.game_over:
+            return self.events
+        if actions:
+            for player, direction in enumerate(actions, 1):
+                if direction is not None:
+                    self.set_direction(player, direction)
+        self.move()
+        if self.input_log is not None:
+            self.input_log.on_tick(self)
+        return self.events
+
+    # -------------------------------------------------------------------------
+    # SPIEL-LOGIK
+    # -------------------------------------------------------------------------
+    def move(self):
+        """Bewegt die Schlangen und prüft auf Kollisionen."""
+        if self.game_over:
+            return
+        self.tick += 1
+
+        # Abgelaufene Effekte (nur wenn einer fällig ist)
+        queue = self.effect_queue
+        if queue and queue[0][0] <= self.tick:
+            self.expire_effects()
+
+        # Player 1, Player 2 nur im Multiplayer
+        for player, snake in enumerate(self.snakes, 1):
+            snake.x += snake.velocity_x
+            snake.y += snake.velocity_y
+            self.handle_snake_logic(snake, player)
+
+        # Zufällig erscheinende Items (nur mit Raten)
+        if self.spawn_rates and not self.game_over:
+            self.spawn_random_items()
+
+    def end_game(self, cause, player):
+        """Beendet das Spiel und merkt sich Ursache und Verursacher."""
+        self.game_over = True
+        self.death_cause = cause
+        self.loser = player
+        self.events.append((cause, player))
+
+    def handle_snake_logic(self, snake, player):
+        """Kollisionsabfragen: Wände, eigener Körper, Items, Hindernisse."""
+        x = snake.x
+        y = snake.y
+
+        # Wand-Kollision
+        if x < 0 or x >= self.cols or y < 0 or y >= self.rows:
+            self.end_game("wall_collision", player)
+            return
+
+        # Körper-Ende rückt nach (bei ausstehendem Wachstum bleibt es liegen)
+        cell = y * self.cols + x
+        cells = self.board.cells
+        bit = snake.bit
+        if snake.growth:
+            snake.growth -= 1
+        elif self.sparse:
+            # Im Dict bleiben nur belegte Zellen
+            tail = snake.body.pop()
+            value = cells[tail] & ~bit
+            if value:
+                cells[tail] = value
+            else:
+                del cells[tail]
+        else:
+            cells[snake.body.pop()] &= ~bit
+
+        # Kollision mit eigenem Körper
+        value = cells.get(cell, 0) if self.sparse else cells[cell]
+        if value & bit:
+            self.end_game("game_over", player)
+            return
+
+        # Hindernisse
+        content = value & CONTENT_MASK
+        if content == OBSTACLE:
+            self.end_game("obstacle_collision", player)
+            return
+
+        # Kopf
+        snake.body.insert(0, cell)
+        cells[cell] = value | bit
+
+        # Items
+        if content:
+            self.handle_item_collision(cell, ITEM_TYPES[content], snake, player)
+
+    def handle_item_collision(self, cell, item_type, snake, player):
+        """Reagiert auf Kollision mit einem Item."""
+        if item_type == ItemType.RED_FOOD or item_type == ItemType.GOLD_FOOD:
+            # Schlange verlängern
+            snake.growth += 1
+            # Score
+            points = 1 if item_type == ItemType.RED_FOOD else 3
+
+            # Falls goldenes Futter: Farbglow an
+            if item_type == ItemType.GOLD_FOOD:
+                self.add_effect(player, "gold_glow")
+
+            snake.score += points
+
+            self.events.append(("item_eaten", player))
+            self.replace_food(cell)
+
+        elif item_type == ItemType.POISON:
+            # Gift = Game Over (oder man könnte Punkte abziehen)
+            self.end_game("game_over", player)
+            return
+
+        elif item_type == ItemType.SPEED_BOOST:
+            # Speed-Boost
+            self.add_effect(player, "speed_boost")
+            self.events.append(("item_eaten", player))
+            self.remove_item(cell)
+
+        elif item_type == ItemType.SLOWDOWN:
+            # Slowdown
+            self.add_effect(player, "slowdown")
+            self.events.append(("item_eaten", player))
+            self.remove_item(cell)
+
+    # -------------------------------------------------------------------------
+    # EFFEKTE
+    # -------------------------------------------------------------------------
+    def add_effect(self, player, name, ticks=None):
+        """
+        Startet einen Effekt für einen Spieler (Standarddauer EFFECT_TICKS).
+        Läuft derselbe Effekt schon, kommt eine weitere Instanz hinzu: der
+        Effekt wirkt, bis die letzte abläuft, Boosts wirken mehrfach.
+        """
+        end = self.tick + (ticks if ticks is not None else EFFECT_TICKS[name])
+        effects = self.snakes[player - 1].effects
+        state = effects.get(name)
+        if state is None:
+            effects[name] = [1, end]
+        else:
+            state[0] += 1
+            state[1] = max(state[1], end)
+        heapq.heappush(self.effect_queue, (end, player, EFFECTS.index(name)))
+
+    def expire_effects(self):
+        """Beendet alle Effekt-Instanzen, deren Ende erreicht ist."""
+        queue = self.effect_queue
+        snakes = self.snakes
+        while queue and queue[0][0] <= self.tick:
+            _end, player, code = heapq.heappop(queue)
+            effects = snakes[player - 1].effects
+            name = EFFECTS[code]
+            state = effects[name]
+            state[0] -= 1
+            if not state[0]:
+                del effects[name]
+
+    def effect_count(self, name):
+        """Anzahl der laufenden Instanzen eines Effekts über alle Spieler."""
+        count = 0
+        for snake in self.snakes:
+            state = snake.effects.get(name)
+            if state is not None:
+                count += state[0]
+        return count
+
+    def effect_ticks(self, snake, name):
+        """Verbleibende Takte eines Effekts einer Schlange (0 = läuft nicht)."""
+        state = snake.effects.get(name)
+        return state[1] - self.tick if state is not None else 0
+
+    def replace_food(self, cell):
+        """Entfernt gefressenes Futter; war es Teil des Paars, kommt ein neues Paar."""
+        if cell in self.food_cells:
+            # Beide Food-Items entfernen (rotes + goldenes)
+            self.remove_both_food_items()
+
+            # Danach erneut zwei Futteritems spawnen
+            self.spawn_food_pair()
+        else:
+            # Zusätzlich gespawntes Futter: das Paar bleibt liegen
+            self.remove_item(cell)
+
+    def remove_both_food_items(self):
+        """
+        Entfernt das rote und das goldene Futter (gemerkt in self.food_cells).
+        """
+        for cell in self.food_cells:
+            self.remove_item(cell)
+        self.food_cells = ()
+
+    def add_item(self, cell, item_type):
+        """Legt ein Item auf eine (freie) Zelle."""
+        self.board.add(cell, item_type.value)
+        self.item_cells.append(cell)
+
+    def remove_item(self, cell):
+        """Entfernt das Item einer Zelle und gibt die Zelle wieder frei."""
+        content = self.board.cells[cell] & CONTENT_MASK
+        if content and content != OBSTACLE:
+            self.board.remove(cell, content)
+            self.item_cells.remove(cell)
+
+    def item_at(self, cell):
+        """ItemType des Items auf einer Zelle oder None."""
+        return ITEM_TYPES[self.board.cells[cell] & CONTENT_MASK]
+
+    @property
+    def items(self):
+        """Alle Items als neues Dict Zelle -> ItemType (für Anzeige und Vergleiche)."""
+        cells = self.board.cells
+        return {cell: ITEM_TYPES[cells[cell] & CONTENT_MASK] for cell in self.item_cells}
+
+    def add_obstacle(self, cell):
+        """Setzt ein Hindernis auf eine (freie) Zelle."""
+        self.board.add(cell, OBSTACLE)
+        self.obstacles.append(cell)
+
+    def is_obstacle(self, cell):
+        return self.board.cells[cell] & CONTENT_MASK == OBSTACLE
+
+    def in_body(self, snake, cell):
+        """Gehört die Zelle zum Körper der Schlange?"""
+        return bool(self.board.cells[cell] & snake.bit)
+
+    # -------------------------------------------------------------------------
+    # SPAWN-FUNKTIONEN
+    # -------------------------------------------------------------------------
+    def spawn_food_pair(self):
+        """
+        Erzeugt gleichzeitig 1 rotes und 1 goldenes Futter auf freien Zellen.
+        Sobald eines gefressen wird, verschwindet auch das andere.
+        Ist keine Zelle mehr frei, endet das Spiel mit "board_full".
+        """
+        # Rotes Futter
+        red_cell = self.spawn_item(ItemType.RED_FOOD)
+        if red_cell is None:
+            self.end_game("board_full", None)
+            return
+        # Goldenes Futter (fehlt, wenn nur noch eine Zelle frei war)
+        gold_cell = self.spawn_item(ItemType.GOLD_FOOD)
+
+        self.food_cells = (red_cell,) if gold_cell is None else (red_cell, gold_cell)
+
+    def spawn_item(self, item_type):
+        """
+        Legt ein Item gleichverteilt auf eine freie Zelle (der Spawn-Zone).
+        Gibt die Zelle zurück oder None, wenn das Spielfeld voll ist.
+        """
+        if self.spawn_cells is None:
+            cell = self.board.sample(self.rng)
+        else:
+            cell = self.sample_spawn_zone()
+        if cell is None:
+            return None
+        self.add_item(cell, item_type)
+        return cell
+
+    def sample_spawn_zone(self):
+        """
+        Gleichverteilt gezogene freie Zelle der Spawn-Zone oder None.
+        Wie bei `Board.sample` erst per Rejection-Sampling, dann gezielt.
+        """
+        cells = self.spawn_cells
+        if not cells:
+            return None
+        is_free = self.board.is_free
+        rng = self.rng
+        for _ in range(SAMPLE_TRIES):
+            cell = cells[rng.randrange(len(cells))]
+            if is_free(cell):
+                return cell
+        free = [cell for cell in cells if is_free(cell)]
+        return free[rng.randrange(len(free))] if free else None
+
+    def spawn_random_items(self):
+        """
+        Würfelt für jeden Item-Typ mit Rate, ob in diesem Takt eines
+        erscheint (höchstens MAX_SPAWNED_ITEMS pro Typ auf dem Feld).
+        """
+        rng = self.rng
+        cells = self.board.cells
+        for item_type, threshold in self.spawn_rates:
+            if rng.next64() < threshold:
+                code = item_type.value
+                count = sum(1 for cell in self.item_cells if cells[cell] & CONTENT_MASK == code)
+                if count < MAX_SPAWNED_ITEMS:
+                    self.spawn_item(item_type)
+
+    def spawn_obstacle(self):
+        """
+        Erzeugt ein Hindernis auf einer zufälligen freien Zelle.
+        Gibt die Zelle zurück oder None, wenn das Spielfeld voll ist.
+        """
+        cell = self.board.sample(self.rng)
+        if cell is None:
+            return None
+        self.add_obstacle(cell)
+        return cell
+
+    # -------------------------------------------------------------------------
+    # ZUSTAND SICHERN / WIEDERHERSTELLEN
+    # -------------------------------------------------------------------------
+    def snapshot(self):
+        """
+        Kompletter Spielzustand als kompakte Bytes: fester Kopf (Modus,
+        Größe, Flags, Takt, Seed, Zufallsgenerator), dann pro Schlange
+        Länge, Wachstum, Richtung, Punkte, Kopfposition und die
+        Körperzellen, dann Hindernisse, Items, die Futter-Zellen, die
+        laufenden Effekte und ggf. die Spawn-Zone als Bitmap und die
+        Spawn-Raten (eine Arena hängt noch ihren Teil an, FLAG_ARENA). Zellen stehen als 16-Bit-Werte (32 Bit auf sehr großen
+        Feldern) hintereinander; auf einem 25x25-Feld sind das wenige
+        hundert Bytes.
+
+        Zusammen mit den folgenden Eingaben ergibt der Zustand exakt
+        denselben Spielverlauf; gleicher Zustand ergibt gleiche Bytes.
+        """
+        code = cell_code(self.rows * self.cols)
+        flags = ((FLAG_SPARSE if self.sparse else 0)
+                 | (FLAG_GAME_OVER if self.game_over else 0)
+                 | (FLAG_ITEM_RATES if self.spawn_rates else 0)
+                 | (FLAG_ARENA if self.mode == "Arena" else 0)
+                 | (FLAG_SPAWN_ZONE if self.spawn_zone is not None else 0))
+        parts = [STATE_HEADER.pack(
+            STATE_VERSION, len(self.snakes), self.rows, self.cols, flags,
+            DEATH_CAUSES.index(self.death_cause), self.loser or 0, self.tick,
+            self.seed & MASK64, self.rng.getstate(),
+        )]
+        for snake in self.snakes:
+            parts.append(SNAKE_STATE.pack(len(snake.body), snake.growth, snake.velocity_x,
+                                          snake.velocity_y, snake.score, snake.x, snake.y))
+            parts.append(pack_cells(snake.body))
+        item_cells = array(code, sorted(self.item_cells))
+        effects = sorted(self.effect_queue)
+        parts.append(STATE_COUNTS.pack(len(self.obstacles), len(item_cells), len(self.food_cells),
+                                       len(effects)))
+        parts.append(pack_cells(array(code, sorted(self.obstacles))))
+        parts.append(pack_cells(item_cells))
+        cells = self.board.cells
+        parts.append(bytes(cells[cell] & CONTENT_MASK for cell in item_cells))
+        parts.append(pack_cells(array(code, self.food_cells)))
+        parts.extend(EFFECT_ENTRY.pack(*entry) for entry in effects)
+        if self.spawn_zone is not None:
+            parts.append(self.spawn_zone)
+        if self.spawn_rates:
+            parts.append(bytes((len(self.spawn_rates),)))
+            parts.extend(RATE_ENTRY.pack(item_type.value, threshold)
+                         for item_type, threshold in self.spawn_rates)
+        return b"".join(parts)
+
+    def restore(self, data):
+        """Stellt einen mit `snapshot()` gesicherten Zustand wieder her."""
+        (version, players, rows, cols, flags, cause, loser, self.tick, self.seed,
+         rng_state) = STATE_HEADER.unpack_from(data)
+        if version != STATE_VERSION:
+            raise ValueError(f"Unbekannte Version des Spielzustands: {version}")
+        if bool(flags & FLAG_ARENA) != (self.mode == "Arena"):
+            raise ValueError("Arena-Zustände lassen sich nur in eine Arena laden (und umgekehrt)")
+        self.rows = rows
+        self.cols = cols
+        self.sparse = bool(flags & FLAG_SPARSE)
+        if self.mode != "Arena":
+            self.mode = "Multiplayer" if players == 2 else "Singleplayer"
+        self.game_over = bool(flags & FLAG_GAME_OVER)
+        self.death_cause = DEATH_CAUSES[cause]
+        self.loser = loser or None
+        self.rng = SplitMix64()
+        self.rng.setstate(rng_state)
+        self.events = []
+
+        num_cells = rows * cols
+        code = cell_code(num_cells)
+        size = struct.calcsize(code)
+        offset = STATE_HEADER.size
+        board = self.board = (SparseBoard if self.sparse else Board)(num_cells)
+
+        def cells(count):
+            nonlocal offset
+            values = unpack_cells(code, data[offset:offset + count * size])
+            offset += count * size
+            return values
+
+        self.snakes = []
+        for player in range(1, players + 1):
+            (length, growth, velocity_x, velocity_y, score,
+             x, y) = SNAKE_STATE.unpack_from(data, offset)
+            offset += SNAKE_STATE.size
+            snake = Snake.__new__(Snake)
+            # Der Kopf steht extra: nach einem tödlichen Zug liegt er außerhalb
+            # des Körpers (Wand), eine Schlange der Länge 1 hat dann keinen mehr
+            snake.x = x
+            snake.y = y
+            snake.body = cells(length)
+            snake.bit = self.snake_bit(player)
+            snake.growth = growth
+            snake.velocity_x = velocity_x
+            snake.velocity_y = velocity_y
+            snake.score = score
+            snake.effects = {}
+            for cell in snake.body:
+                board.add(cell, snake.bit)
+            self.snakes.append(snake)
+
+        num_obstacles, num_items, num_food, num_effects = STATE_COUNTS.unpack_from(data, offset)
+        offset += STATE_COUNTS.size
+        self.obstacles = cells(num_obstacles)
+        for cell in self.obstacles:
+            board.add(cell, OBSTACLE)
+        self.item_cells = cells(num_items)
+        for cell, content in zip(self.item_cells, data[offset:offset + num_items]):
+            board.add(cell, content)
+        offset += num_items
+        self.food_cells = tuple(cells(num_food))
+
+        # Effekte: sortiert gespeichert, eine sortierte Liste ist schon ein Heap
+        self.effect_queue = []
+        for _ in range(num_effects):
+            end, player, effect = entry = EFFECT_ENTRY.unpack_from(data, offset)
+            offset += EFFECT_ENTRY.size
+            self.effect_queue.append(entry)
+            effects = self.snakes[player - 1].effects
+            state = effects.get(EFFECTS[effect])
+            if state is None:
+                effects[EFFECTS[effect]] = [1, end]
+            else:
+                state[0] += 1
+                state[1] = end
+
+        # Spawn-Zone; meist dieselbe wie zuvor (gleiches Level), dann wiederverwendet
+        if flags & FLAG_SPAWN_ZONE:
+            zone = data[offset:offset + (num_cells + 7) // 8]
+            if zone != getattr(self, "spawn_zone", None):
+                self.spawn_zone = bytes(zone)
+                self.spawn_cells = zone_cells(zone, num_cells)
+            offset += len(zone)
+        else:
+            self.spawn_zone = None
+            self.spawn_cells = None
+
+        self.spawn_rates = ()
+        if flags & FLAG_ITEM_RATES:
+            count = data[offset]
+            offset += 1
+            rates = []
+            for _ in range(count):
+                item_type, threshold = RATE_ENTRY.unpack_from(data, offset)
+                offset += RATE_ENTRY.size
+                rates.append((ItemType(item_type), threshold))
+            self.spawn_rates = tuple(rates)
+
+    def clone(self):
+        """
+        Unabhängige Kopie des Spiels (z.B. für Vorausschau in Such-Bots).
+        Kopiert werden nur die Puffer (Board, Körper, Item- und
+        Hinderniszellen, Effekte) und die Zahlen; Level, Spawn-Zone und
+        Raten teilen sich Original und Kopie.
+        """
+        cls = type(self)
+        engine = cls.__new__(cls)
+        engine.__dict__.update(self.__dict__)
+        engine.input_log = None
+        engine.rng = SplitMix64(self.rng.state)
+        engine.board = self.board.copy()
+        engine.snakes = [snake.copy() for snake in self.snakes]
+        engine.item_cells = self.item_cells[:]
+        engine.obstacles = self.obstacles[:]
+        engine.effect_queue = self.effect_queue[:]
+        engine.events = []
+        return engine
+
+    # -------------------------------------------------------------------------
+    # HILFSFUNKTIONEN
+    # -------------------------------------------------------------------------
+    def position(self, cell):
+        """Wandelt einen Zellindex in (x, y) um."""
+        y, x = divmod(cell, self.cols)
+        return x, y
+
+    @property
+    def max_score(self):
+        """Höchste Punktzahl aller Spieler."""
+        return max(snake.score for snake in self.snakes)
+
+    def tick_interval(self, difficulty):
+        """Dauer des nächsten Takts in ms (Boosts und Punktestand eingerechnet)."""
+        base_speed = difficulty.value
+        # Speed-Boost => 40% schneller (pro laufender Instanz)
+        for _ in range(self.effect_count("speed_boost")):
+            base_speed = int(base_speed * 0.6)
+        # Slowdown => 40% langsamer (pro laufender Instanz)
+        for _ in range(self.effect_count("slowdown")):
+            base_speed = int(base_speed * 1.4)
+
+        # Dynamisch verkürzen, min. 50 ms
+        return max(base_speed - (self.max_score * 2), 50)
@@ -0,0 +1,120 @@
+"""
+Spielschleife mit festem Takt, unabhängig von der Renderzeit.
+
+Die Spiellogik läuft gegen eine monotone Uhr: jeder Takt hat einen festen
+Sollzeitpunkt, verpasste Takte werden nachgeholt (begrenzt), und gerendert
+wird höchstens mit der eingestellten Bildrate. Die Abweichung zwischen Soll-
+und Ist-Zeitpunkt der Takte (Jitter) wird gemessen.
+"""
+import math
+import time
+from collections import deque
+
+# Höchstens so viele Frames pro Sekunde werden gerendert
+MAX_FPS = 60
+
+# So viele verpasste Takte werden pro Aufruf höchstens nachgeholt
+MAX_CATCH_UP = 5
+
+# Anzahl der Takte, über die der Jitter gemessen wird
+JITTER_WINDOW = 256
+
+
+class FixedStepLoop:
+    """
+    Fester Spieltakt mit Aufholen verpasster Takte und getrennter Bildrate.
+
+    `schedule(delay_ms, callback)` und `cancel(id)` entsprechen
+    `window.after`/`window.after_cancel`. `tick()` berechnet einen
+    Spieltakt, `render()` zeichnet, `interval()` liefert die Dauer des
+    nächsten Takts in Sekunden.
+    """
+    def __init__(self, schedule, cancel, tick, render, interval,
+                 max_fps=MAX_FPS, max_catch_up=MAX_CATCH_UP, clock=time.perf_counter):
+        self.schedule = schedule
+        self.cancel = cancel
+        self.tick = tick
+        self.render = render
+        self.interval = interval
+        self.frame_time = 1.0 / max_fps
+        self.max_catch_up = max_catch_up
+        self.clock = clock
+
+        self.running = False
+        self.after_id = None
+        self.next_tick = 0.0
+        self.last_render = -math.inf
+        self.dirty = False
+
+        # Messwerte
+        self.lateness = deque(maxlen=JITTER_WINDOW)
+        self.ticks = 0
+        self.frames = 0
+        self.dropped_ticks = 0
+
+    def start(self):
+        """Startet die Schleife; der erste Takt wird sofort berechnet."""
+        self.stop()
+        self.running = True
+        self.next_tick = self.clock()
+        self.last_render = -math.inf
+        self.lateness.clear()
+        self.pump()
+
+    def stop(self):
+        """Hält die Schleife an (ein laufender Aufruf rendert noch zu Ende)."""
+        self.running = False
+        if self.after_id is not None:
+            self.cancel(self.after_id)
+            self.after_id = None
+
+    def pump(self):
+        """Berechnet alle fälligen Takte, rendert bei Bedarf und plant den nächsten Aufruf."""
+        self.after_id = None
+        if not self.running:
+            return
+        now = self.clock()
+
+        # Fällige Takte (begrenzt) nachholen
+        caught_up = 0
+        while self.running and now >= self.next_tick:
+            if caught_up == self.max_catch_up:
+                # Zu weit zurück: restliche Takte verwerfen statt ewig aufzuholen
+                missed = int((now - self.next_tick) / max(self.interval(), 1e-6)) + 1
+                self.dropped_ticks += missed
+                self.next_tick = now + self.interval()
+                break
+            self.lateness.append(now - self.next_tick)
+            self.tick()
+            self.ticks += 1
+            caught_up += 1
+            self.next_tick += self.interval()
+            self.dirty = True
+
+        # Rendern, höchstens mit MAX_FPS (das letzte Bild immer)
+        if self.dirty and (not self.running or now - self.last_render >= self.frame_time):
+            self.render()
+            self.frames += 1
+            self.last_render = now
+            self.dirty = False
+
+        if self.running:
+            wake = self.next_tick
+            if self.dirty:
+                wake = min(wake, self.last_render + self.frame_time)
+            delay_ms = max(0, math.ceil((wake - self.clock()) * 1000))
+            self.after_id = self.schedule(delay_ms, self.pump)
+
+    def jitter(self):
+        """
+        Verspätung der Takte gegenüber ihrem Sollzeitpunkt in ms:
+        Mittelwert, 95. Perzentil und Maximum über die letzten Takte.
+        """
+        if not self.lateness:
+            return {"mean": 0.0, "p95": 0.0, "max": 0.0}
+        values = sorted(self.lateness)
+        return {
+            "mean": sum(values) / len(values) * 1000,
+            "p95": values[min(len(values) - 1, int(len(values) * 0.95))] * 1000,
+            "max": values[-1] * 1000,
+        }
@@ -0,0 +1,97 @@
+"""
+Eingabe-Warteschlange pro Spieler, abgearbeitet an den Taktgrenzen.
+
+Tastendrücke setzen die Richtung nicht mehr sofort, sondern landen in einer
+kleinen Warteschlange; jeder Takt übernimmt pro Spieler genau eine
+Richtung. Zwei schnelle Tasten innerhalb eines Takts (z.B. Hoch, dann Links
+während die Schlange nach rechts fährt) werden so nacheinander ausgeführt,
+statt sich zu überschreiben, und eine Umkehr wird gegen die zuletzt
+eingereihte Richtung geprüft statt gegen eine, die nie gefahren wurde.
+
+Gemessen wird die Zeit vom Tastendruck bis zum Takt, der die Richtung
+übernimmt (p50/p99 über die letzten LATENCY_WINDOW Eingaben).
+"""
+import time
+from collections import deque
+
+from engine import DIRECTION_VECTORS
+from profiling import percentile
+
+# So viele Richtungen warten pro Spieler höchstens (weitere werden verworfen)
+INPUT_QUEUE_SIZE = 3
+
+# Anzahl der Eingaben, über die die Latenz gemessen wird
+LATENCY_WINDOW = 1000
+
+
+class InputQueue:
+    """
+    Begrenzte Richtungs-Warteschlangen für alle Spieler.
+
+    `push(engine, player, direction)` reiht ein (beim Tastendruck),
+    `apply(engine)` übernimmt vor jedem Takt eine Richtung pro Spieler.
+    Mit `profiler` landet jede Latenz zusätzlich als Phase "delay" im
+    `PhaseProfiler` (Overlay und Profil-Dateien).
+    """
+    def __init__(self, size=INPUT_QUEUE_SIZE, profiler=None, clock=time.perf_counter):
+        self.size = size
+        self.profiler = profiler
+        self.clock = clock
+        self.queues = {}
+        self.latencies = deque(maxlen=LATENCY_WINDOW)
+        self.dropped = 0
+
+    def push(self, engine, player, direction):
+        """
+        Reiht eine Richtung ein. Umkehr und Wiederholung der zuletzt
+        eingereihten (bzw. gefahrenen) Richtung werden ignoriert.
+        Gibt True zurück, wenn die Richtung eingereiht wurde.
+        """
+        if player > len(engine.snakes):
+            return False
+        queue = self.queues.get(player)
+        if queue is None:
+            queue = self.queues[player] = deque()
+        if queue:
+            last_x, last_y = DIRECTION_VECTORS[queue[-1][0]]
+        else:
+            snake = engine.snakes[player - 1]
+            last_x, last_y = snake.velocity_x, snake.velocity_y
+        dx, dy = DIRECTION_VECTORS[direction]
+        if (dx, dy) == (last_x, last_y) or (dx, dy) == (-last_x, -last_y):
+            return False
+        if len(queue) >= self.size:
+            self.dropped += 1
+            return False
+        queue.append((direction, self.clock()))
+        return True
+
+    def apply(self, engine):
+        """Übernimmt pro Spieler die nächste Richtung (vor `engine.step()` aufrufen)."""
+        if not self.queues:
+            return
+        now = None
+        for player, queue in self.queues.items():
+            if queue:
+                direction, stamp = queue.popleft()
+                engine.set_direction(player, direction)
+                if now is None:
+                    now = self.clock()
+                latency = now - stamp
+                self.latencies.append(latency)
+                if self.profiler is not None:
+                    self.profiler.record("delay", latency)
+
+    def clear(self):
+        """Verwirft alle wartenden Eingaben (z.B. beim Neustart)."""
+        self.queues.clear()
+
+    def latency(self):
+        """Latenz vom Tastendruck bis zum Takt in ms: count, p50, p99, max."""
+        values = sorted(self.latencies)
+        return {
+            "count": len(values),
+            "p50": percentile(values, 50) * 1000,
+            "p99": percentile(values, 99) * 1000,
+            "max": values[-1] * 1000 if values else 0.0,
+        }
@@ -0,0 +1,161 @@
+"""
+Bestenliste in einer lokalen SQLite-Datenbank.
+
+Ergebnisse werden pro Modus, Schwierigkeit, Spieler und Datum gespeichert.
+`record()` legt ein Ergebnis nur in eine Queue; ein Hintergrund-Thread
+schreibt gesammelt in einer Transaktion. Das Spiel wartet also nie auf die
+Platte, und mehrere laufende Instanzen fügen nur Zeilen hinzu (WAL-Modus,
+Sperren übernimmt SQLite), statt sich gegenseitig eine Datei zu
+überschreiben. Ein Index auf (mode, difficulty, score) hält Top-N-Abfragen
+auch bei Millionen Spielen schnell.
+"""
+import logging
+import queue
+import sqlite3
+import threading
+from datetime import datetime
+
+DEFAULT_PATH = "leaderboard.db"
+
+# So viele Ergebnisse schreibt der Hintergrund-Thread höchstens pro Transaktion
+BATCH_SIZE = 256
+
+# Wartezeit (s) auf gesperrte Datenbank (andere Instanz schreibt gerade)
+BUSY_TIMEOUT = 5.0
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS games (
+    id         INTEGER PRIMARY KEY,
+    mode       TEXT    NOT NULL,
+    difficulty TEXT    NOT NULL,
+    player     INTEGER NOT NULL,
+    name       TEXT,
+    score      INTEGER NOT NULL,
+    ticks      INTEGER NOT NULL DEFAULT 0,
+    seed       INTEGER,
+    played_at  TEXT    NOT NULL
+);
+CREATE INDEX IF NOT EXISTS games_top ON games (mode, difficulty, score DESC);
+CREATE INDEX IF NOT EXISTS games_score ON games (score DESC);
+"""
+
+INSERT = ("INSERT INTO games (mode, difficulty, player, name, score, ticks, seed, played_at) "
+          "VALUES (?, ?, ?, ?, ?, ?, ?, ?)")
+
+# Markiert das Ende der Queue
+_STOP = object()
+
+
+def connect(path):
+    """Öffnet die Datenbank (WAL, Wartezeit bei Sperren) und legt das Schema an."""
+    conn = sqlite3.connect(path, timeout=BUSY_TIMEOUT, check_same_thread=False)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    conn.executescript(SCHEMA)
+    return conn
+
+
+class Leaderboard:
+    """
+    Bestenliste mit Schreib-Thread.
+
+    `record(...)` kehrt sofort zurück; `flush()` wartet, bis alles
+    geschrieben ist, `close()` beendet den Thread. Abfragen (`top`, `best`)
+    lesen direkt aus der Datenbank.
+    """
+    def __init__(self, path=DEFAULT_PATH):
+        self.path = path
+        self.conn = connect(path)
+        self.lock = threading.Lock()     # für Abfragen aus mehreren Threads
+        self.queue = queue.Queue()
+        self.thread = threading.Thread(target=self._writer, name="leaderboard", daemon=True)
+        self.thread.start()
+
+    def record(self, mode, difficulty, player, score, ticks=0, seed=None, name=None,
+               played_at=None):
+        """Merkt ein Ergebnis zum Speichern vor (blockiert nicht)."""
+        if played_at is None:
+            played_at = datetime.now().isoformat(timespec="seconds")
+        difficulty = getattr(difficulty, "name", difficulty)
+        self.queue.put((mode, difficulty, player, name, score, ticks, seed, played_at))
+
+    def _writer(self):
+        """Hintergrund-Thread: sammelt Ergebnisse und schreibt sie gebündelt."""
+        conn = connect(self.path)
+        stop = False
+        while not stop:
+            rows = [self.queue.get()]
+            while len(rows) < BATCH_SIZE:
+                try:
+                    rows.append(self.queue.get_nowait())
+                except queue.Empty:
+                    break
+            if _STOP in rows:
+                stop = True
+            batch = [row for row in rows if row is not _STOP]
+            try:
+                if batch:
+                    with conn:
+                        conn.executemany(INSERT, batch)
+            except sqlite3.Error as error:
+                logging.error(f"Bestenliste: {len(batch)} Ergebnisse nicht gespeichert ({error})")
+            finally:
+                for _ in rows:
+                    self.queue.task_done()
+        conn.close()
+
+    def flush(self):
+        """Wartet, bis alle vorgemerkten Ergebnisse geschrieben sind."""
+        self.queue.join()
+
+    def close(self):
+        """Schreibt alles Ausstehende und beendet den Thread."""
+        if self.thread.is_alive():
+            self.queue.put(_STOP)
+            self.thread.join()
+        self.conn.close()
+
+    def top(self, mode=None, difficulty=None, limit=10):
+        """
+        Die besten `limit` Ergebnisse als Liste von Dicts, optional nur für
+        einen Modus und/oder eine Schwierigkeit.
+        """
+        where = []
+        args = []
+        if mode is not None:
+            where.append("mode = ?")
+            args.append(mode)
+        if difficulty is not None:
+            where.append("difficulty = ?")
+            args.append(getattr(difficulty, "name", difficulty))
+        sql = "SELECT mode, difficulty, player, name, score, ticks, seed, played_at FROM games"
+        if where:
+            sql += " WHERE " + " AND ".join(where)
+        sql += " ORDER BY score DESC LIMIT ?"
+        args.append(limit)
+        with self.lock:
+            cursor = self.conn.execute(sql, args)
+            columns = [column[0] for column in cursor.description]
+            return [dict(zip(columns, row)) for row in cursor.fetchall()]
+
+    def best(self, mode=None, difficulty=None):
+        """Höchste Punktzahl (0, wenn noch nichts gespeichert ist)."""
+        entries = self.top(mode, difficulty, limit=1)
+        return entries[0]["score"] if entries else 0
+
+    def import_highscore_file(self, path):
+        """
+        Übernimmt einen alten Highscore aus `highscore.txt` (einmalig, nur
+        wenn die Bestenliste noch leer ist).
+        """
+        try:
+            with open(path) as file:
+                score = int(file.read())
+        except (FileNotFoundError, ValueError):
+            return
+        with self.lock:
+            empty = self.conn.execute("SELECT 1 FROM games LIMIT 1").fetchone() is None
+            if empty and score > 0:
+                with self.conn:
+                    self.conn.execute(INSERT, ("", "", 1, None, score, 0, None,
+                                               datetime.now().isoformat(timespec="seconds")))
@@ -0,0 +1,342 @@
+"""
+Level: Hindernis-Layouts, Spawn-Zonen, Spielfeldgröße und Item-Raten.
+
+Levels werden als Text geschrieben und in ein kompaktes Binärformat
+übersetzt, das beim Laden nur per mmap eingeblendet wird:
+
+    # Kommentar
+    name: Tunnel
+    rate poison: 0.002        # Wahrscheinlichkeit pro Takt (je ItemType)
+    map:
+    #########################
+    #1......................#
+    #-----------------------#
+    ...
+
+Karte: `#` Wand, `.` frei (Items können erscheinen), `-` frei ohne Items,
+`1`/`2` Startposition eines Spielers. Ohne `-` ist das ganze Feld
+Spawn-Zone. Ohne Karte legt `size: 40x30` ein leeres Feld fest.
+
+Binärformat (`.snkl`, little-endian):
+
+    Header      magic "SNKL", Version, Spieler, rows, cols, Flags,
+                Anzahl Wände, Anzahl Spawn-Zellen, Länge des Namens
+    Name        UTF-8
+    Start       pro Spieler x, y (u16)
+    Raten       pro ItemType eine Wahrscheinlichkeit (f64)
+    Belegung    ein Byte pro Zelle (1 = Wand), lädt die Engine in einem Schritt
+    Zone        Bitmap der Spawn-Zone ohne Wände (nur mit FLAG_SPAWN_ZONE)
+    Wände       Zellindizes (u16, auf sehr großen Feldern u32)
+    Spawn       Zellen der Spawn-Zone als Liste (nur mit FLAG_SPAWN_ZONE)
+
+    python levels.py compile levels/*.level   # schreibt levels/*.snkl
+    python levels.py info levels/tunnel.snkl
+"""
+import argparse
+import mmap
+import os
+import struct
+import sys
+from array import array
+
+from engine import ItemType, START_POSITIONS, cell_code
+
+MAGIC = b"SNKL"
+VERSION = 1
+
+HEADER = struct.Struct("<4sBBHHHIIH")
+POSITION = struct.Struct("<HH")
+RATES = struct.Struct(f"<{len(ItemType)}d")
+
+# Flags im Header
+FLAG_SPAWN_ZONE = 1
+
+SOURCE_SUFFIX = ".level"
+COMPILED_SUFFIX = ".snkl"
+
+WALL, FREE, NO_SPAWN = "#", ".", "-"
+
+
+class LevelError(Exception):
+    """Level-Quelltext oder -Datei ist ungültig."""
+
+
+def _align(offset, size=4):
+    return (offset + size - 1) // size * size
+
+
+# -----------------------------------------------------------------------------
+# COMPILER
+# -----------------------------------------------------------------------------
+def parse(text, name="level"):
+    """
+    Liest einen Level-Quelltext. Gibt ein Dict mit name, rows, cols,
+    walls, no_spawn (Zellmengen), starts ({Spieler: (x, y)}) und rates
+    ({ItemType: Wahrscheinlichkeit}) zurück.
+    """
+    level = {"name": name, "rows": None, "cols": None, "rates": {}}
+    lines = text.splitlines()
+    map_lines = None
+    for number, raw in enumerate(lines, 1):
+        if map_lines is not None:
+            if raw.strip():
+                map_lines.append(raw.rstrip())
+            continue
+        line = raw.split("#", 1)[0].strip()
+        if not line:
+            continue
+        key, sep, value = line.partition(":")
+        if not sep:
+            raise LevelError(f"{name}:{number}: 'schlüssel: wert' erwartet")
+        key = key.strip().lower()
+        value = value.strip()
+        if key == "map":
+            map_lines = []
+        elif key == "name":
+            level["name"] = value
+        elif key == "size":
+            try:
+                cols, rows = (int(part) for part in value.lower().split("x"))
+            except ValueError:
+                raise LevelError(f"{name}:{number}: Größe als BREITExHÖHE angeben") from None
+            level["rows"], level["cols"] = rows, cols
+        elif key.startswith("rate "):
+            item_name = key[5:].strip().upper()
+            if item_name not in ItemType.__members__:
+                raise LevelError(f"{name}:{number}: unbekannter Item-Typ {item_name.lower()!r}")
+            rate = float(value)
+            if not 0 <= rate <= 1:
+                raise LevelError(f"{name}:{number}: Rate muss zwischen 0 und 1 liegen")
+            level["rates"][ItemType[item_name]] = rate
+        else:
+            raise LevelError(f"{name}:{number}: unbekannter Schlüssel {key!r}")
+
+    walls = set()
+    no_spawn = set()
+    starts = {}
+    if map_lines:
+        rows = len(map_lines)
+        cols = len(map_lines[0])
+        if any(len(row) != cols for row in map_lines):
+            raise LevelError(f"{name}: alle Zeilen der Karte müssen gleich lang sein")
+        if level["rows"] is not None and (level["rows"], level["cols"]) != (rows, cols):
+            raise LevelError(f"{name}: Karte ist {cols}x{rows}, size sagt "
+                             f"{level['cols']}x{level['rows']}")
+        level["rows"], level["cols"] = rows, cols
+        for y, row in enumerate(map_lines):
+            for x, char in enumerate(row):
+                cell = y * cols + x
+                if char == WALL:
+                    walls.add(cell)
+                elif char == NO_SPAWN:
+                    no_spawn.add(cell)
+                elif char.isdigit() and char != "0":
+                    starts[int(char)] = (x, y)
+                elif char != FREE:
+                    raise LevelError(f"{name}: unbekanntes Zeichen {char!r} in Zeile {y + 1}")
+    if level["rows"] is None:
+        raise LevelError(f"{name}: weder Karte noch size angegeben")
+    if not 0 < level["rows"] <= 0xFFFF or not 0 < level["cols"] <= 0xFFFF:
+        raise LevelError(f"{name}: Spielfeld zu groß")
+
+    # Fehlende Startpositionen wie ohne Level (auf kleinen Feldern an den Rand geschoben)
+    for player, (x, y) in enumerate(START_POSITIONS, 1):
+        if player not in starts:
+            starts[player] = (min(x, level["cols"] - 1), min(y, level["rows"] - 1))
+    for player, (x, y) in starts.items():
+        if y * level["cols"] + x in walls:
+            raise LevelError(f"{name}: Startposition von Spieler {player} liegt auf einer Wand")
+    if sorted(starts) != list(range(1, len(starts) + 1)):
+        raise LevelError(f"{name}: Startpositionen müssen lückenlos ab 1 nummeriert sein")
+
+    level.update(walls=walls, no_spawn=no_spawn, starts=starts)
+    return level
+
+
+def compile_level(text, name="level"):
+    """Übersetzt einen Level-Quelltext in das Binärformat (bytes)."""
+    level = parse(text, name)
+    rows, cols = level["rows"], level["cols"]
+    num_cells = rows * cols
+    code = cell_code(num_cells)
+    walls = sorted(level["walls"])
+    zone = None
+    spawn_cells = []
+    if level["no_spawn"]:
+        # Zone ohne Wände: gesetzte Bits und Spawn-Zellen sind dieselben Zellen
+        blocked = level["no_spawn"] | level["walls"]
+        zone = bytearray((num_cells + 7) // 8)
+        for cell in range(num_cells):
+            if cell not in blocked:
+                zone[cell >> 3] |= 1 << (cell & 7)
+                spawn_cells.append(cell)
+
+    name_bytes = level["name"].encode("utf-8")
+    starts = [level["starts"][player] for player in sorted(level["starts"])]
+    out = bytearray(HEADER.pack(MAGIC, VERSION, len(starts), rows, cols,
+                                FLAG_SPAWN_ZONE if zone is not None else 0,
+                                len(walls), len(spawn_cells), len(name_bytes)))
+    out += name_bytes
+    for x, y in starts:
+        out += POSITION.pack(x, y)
+    out += RATES.pack(*(level["rates"].get(item_type, 0.0) for item_type in ItemType))
+
+    occupancy = bytearray(num_cells)
+    for cell in walls:
+        occupancy[cell] = 1
+    out += occupancy
+    if zone is not None:
+        out += zone
+    out += bytes(_align(len(out)) - len(out))
+    out += struct.pack(f"<{len(walls)}{code}", *walls)
+    out += struct.pack(f"<{len(spawn_cells)}{code}", *spawn_cells)
+    return bytes(out)
+
+
+def compile_file(source, target=None):
+    """Übersetzt eine `.level`-Datei; gibt den Pfad der `.snkl`-Datei zurück."""
+    if target is None:
+        target = os.path.splitext(source)[0] + COMPILED_SUFFIX
+    with open(source, encoding="utf-8") as file:
+        data = compile_level(file.read(), os.path.splitext(os.path.basename(source))[0])
+    with open(target, "wb") as file:
+        file.write(data)
+    return target
+
+
+# -----------------------------------------------------------------------------
+# LADEN
+# -----------------------------------------------------------------------------
+class Level:
+    """
+    Ein übersetztes Level. Alle Zellfelder sind Views auf den Puffer (bei
+    `.snkl`-Dateien das mmap); beim Laden entsteht kein Objekt pro Zelle.
+
+    `occupancy` (ein Byte pro Zelle) übersetzt die Engine in einem Schritt
+    in ihr Board (Wand -> OBSTACLE), `obstacle_cells` sind die Hindernisse. `spawn_zone`
+    (Bitmap) und `spawn_cells` sind None, wenn Items überall erscheinen
+    dürfen. `item_rates` bildet jeden ItemType auf seine Rate pro Takt ab.
+    """
+    def __init__(self, data, path=None, file=None):
+        self.path = path
+        self.file = file
+        self.data = data
+        if len(data) < HEADER.size or data[:4] != MAGIC:
+            self.close()
+            raise LevelError(f"{path or 'Level'}: keine Level-Datei")
+        (_magic, version, players, self.rows, self.cols, flags,
+         num_walls, num_spawn, name_length) = HEADER.unpack_from(data)
+        if version != VERSION:
+            self.close()
+            raise LevelError(f"{path or 'Level'}: unbekannte Version {version}")
+        num_cells = self.rows * self.cols
+        code = cell_code(num_cells)
+        size = struct.calcsize(code)
+
+        offset = HEADER.size
+        self.name = bytes(data[offset:offset + name_length]).decode("utf-8")
+        offset += name_length
+        self.start_positions = tuple(POSITION.unpack_from(data, offset + i * POSITION.size)
+                                     for i in range(players))
+        offset += players * POSITION.size
+        self.item_rates = dict(zip(ItemType, RATES.unpack_from(data, offset)))
+        offset += RATES.size
+
+        view = memoryview(data)
+        self.views = [view]
+        self.occupancy = view[offset:offset + num_cells]
+        offset += num_cells
+        self.spawn_zone = None
+        if flags & FLAG_SPAWN_ZONE:
+            self.spawn_zone = view[offset:offset + (num_cells + 7) // 8]
+            offset += len(self.spawn_zone)
+        offset = _align(offset)
+        self.obstacle_cells = self.cells(view, offset, num_walls, code)
+        offset += num_walls * size
+        self.spawn_cells = None
+        if flags & FLAG_SPAWN_ZONE:
+            self.spawn_cells = self.cells(view, offset, num_spawn, code)
+        self.views += [self.occupancy, self.spawn_zone, self.obstacle_cells, self.spawn_cells]
+
+    def cells(self, view, offset, count, code):
+        """Zellindizes ab `offset` als View (auf Big-Endian-Rechnern als Kopie)."""
+        part = view[offset:offset + count * struct.calcsize(code)]
+        if sys.byteorder == "little":
+            return part.cast(code)
+        values = array(code, part)
+        values.byteswap()
+        return values
+
+    @classmethod
+    def open(cls, path):
+        """Lädt eine `.snkl`-Datei per mmap."""
+        file = open(path, "rb")
+        try:
+            data = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            file.close()
+            raise LevelError(f"{path}: leere Datei") from None
+        return cls(data, path, file)
+
+    def close(self):
+        for view in getattr(self, "views", ()):
+            if isinstance(view, memoryview):
+                view.release()
+        self.views = []
+        if isinstance(self.data, mmap.mmap):
+            self.data.close()
+        if self.file is not None:
+            self.file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def __repr__(self):
+        return f"Level({self.name!r}, {self.cols}x{self.rows}, {len(self.obstacle_cells)} Wände)"
+
+
+def load_level(path):
+    """
+    Lädt ein Level: `.snkl` per mmap, Quelltext (`.level`) wird im
+    Speicher übersetzt.
+    """
+    if path.endswith(COMPILED_SUFFIX):
+        return Level.open(path)
+    with open(path, encoding="utf-8") as file:
+        text = file.read()
+    return Level(compile_level(text, os.path.splitext(os.path.basename(path))[0]), path)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Snake-Levels übersetzen und anzeigen.")
+    commands = parser.add_subparsers(dest="command", required=True)
+    compile_parser = commands.add_parser("compile", help=".level-Dateien nach .snkl übersetzen")
+    compile_parser.add_argument("sources", nargs="+")
+    info_parser = commands.add_parser("info", help="Level-Datei beschreiben")
+    info_parser.add_argument("paths", nargs="+")
+    args = parser.parse_args(argv)
+
+    try:
+        if args.command == "compile":
+            for source in args.sources:
+                print(compile_file(source))
+        else:
+            for path in args.paths:
+                with load_level(path) as level:
+                    zone = len(level.spawn_cells) if level.spawn_cells is not None else "alle"
+                    rates = ", ".join(f"{item_type.name.lower()} {rate}"
+                                      for item_type, rate in level.item_rates.items() if rate)
+                    print(f"{path}: {level.name!r} {level.cols}x{level.rows}, "
+                          f"{len(level.obstacle_cells)} Wände, Spawn-Zellen {zone}, "
+                          f"Start {list(level.start_positions)}, Raten: {rates or '-'}")
+    except (OSError, LevelError) as error:
+        print(error, file=sys.stderr)
+        return 2
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
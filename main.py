@@ -0,0 +1,157 @@
+"""
+Einstiegspunkt für alle Betriebsarten.
+
+    python main.py                         # Spielfenster (wie `play`)
+    python levels.py compile levels/*.level    # einmalig: erzeugt levels/*.snkl
+    python main.py play --level levels/box.snkl --autopilot 2
+    python main.py run --games 100 --difficulty hard --replay-dir replays
+    python main.py bench --quick
+    python main.py replay replays/game.snkr --verify
+    python main.py bot --games 1000 --summary summary.json
+    python main.py term --mode multi
+    python main.py arena --snakes 64 --size 200
+    python main.py difftest --cases 1000000
+
+Schwere Module (tkinter, Sound, Bestenliste, Multiprocessing) lädt nur der
+Unterbefehl, der sie braucht. Die Headless-Befehle starten dadurch in
+wenigen Millisekunden und laufen auch ohne Display oder Tk-Installation.
+"""
+import argparse
+import importlib
+import sys
+
+from engine import Difficulty
+
+# Unterbefehle, die an das `main(argv)` eines Moduls weitergereicht werden
+DELEGATED = {
+    "bench": ("bench", "Benchmarks (Argumente wie bench.py)"),
+    "replay": ("replay", "Replays abspielen und prüfen (wie replay.py)"),
+    "bot": ("tournament", "Bot-Turnier auf allen CPU-Kernen (wie tournament.py)"),
+    "term": ("term", "im Terminal spielen (wie term.py)"),
+    "arena": ("arena", "viele Bots in einer Arena (wie arena.py)"),
+    "difftest": ("difftest", "Engines gegen die Referenzregeln prüfen (wie difftest.py)"),
+    "levels": ("levels", "Levels kompilieren und anzeigen (wie levels.py)"),
+}
+
+
+def play(args):
+    """Startet das Spielfenster (importiert erst hier tkinter)."""
+    import logging
+    try:
+        import tkinter
+        from Snake import SnakeGame
+    except ImportError as error:
+        print(f"Spielfenster nicht verfügbar: {error}", file=sys.stderr)
+        return 2
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+    options = {"level_paths": args.level, "autopilot_players": args.autopilot}
+    if args.replay_dir:
+        options["replay_dir"] = args.replay_dir
+    if args.profile_out:
+        options["profile_out"] = args.profile_out
+    if args.no_telemetry:
+        options["telemetry_path"] = None
+    try:
+        game = SnakeGame(**options)
+    except tkinter.TclError as error:
+        print(f"Spielfenster nicht verfügbar: {error}", file=sys.stderr)
+        return 2
+    game.run()
+    return 0
+
+
+def run(args):
+    """Spielt Partien ohne Fenster, gesteuert vom Autopiloten."""
+    import os
+    import time
+
+    from autopilot import Autopilot
+    from engine import SnakeEngine
+    from tournament import BOT_BUDGET_NODES
+
+    level = None
+    if args.level:
+        from levels import LevelError, load_level
+        try:
+            level = load_level(args.level)
+        except (OSError, LevelError) as error:
+            print(error, file=sys.stderr)
+            return 2
+    if args.replay_dir:
+        from replay import ReplayWriter
+        os.makedirs(args.replay_dir, exist_ok=True)
+
+    difficulty = Difficulty[args.difficulty.upper()]
+    mode = "Multiplayer" if args.players == 2 else "Singleplayer"
+    engine = SnakeEngine(mode, seed=args.seed, level=level)
+    start = time.perf_counter()
+    ticks = 0
+    for game in range(args.games):
+        seed = args.seed + game
+        engine.reset(seed)
+        engine.start()
+        recorder = None
+        if args.replay_dir:
+            path = os.path.join(args.replay_dir, f"run-{seed}.snkr")
+            recorder = ReplayWriter(path, engine, difficulty.value)
+        # Knoten- statt Zeitbudget: derselbe Seed ergibt auf jeder Maschine dieselbe Partie
+        pilots = [Autopilot(engine, player, budget_nodes=BOT_BUDGET_NODES)
+                  for player in range(1, engine.num_players + 1)]
+        while not engine.game_over and engine.tick < args.max_ticks:
+            engine.step([pilot.decide() for pilot in pilots])
+        if recorder:
+            recorder.close()
+        ticks += engine.tick
+        scores = " ".join(str(snake.score) for snake in engine.snakes)
+        print(f"seed {seed}: Takt {engine.tick}, Punkte {scores}, Ende: {engine.death_cause}")
+    seconds = time.perf_counter() - start
+    print(f"{args.games} Spiele, {ticks} Takte in {seconds:.2f} s")
+    if level is not None:
+        level.close()
+    return 0
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(description="Snake: Spiel, Headless-Läufe und Werkzeuge.")
+    commands = parser.add_subparsers(dest="command")
+
+    play_parser = commands.add_parser("play", help="im Fenster spielen (Standard)")
+    play_parser.add_argument("--level", action="append", default=[],
+                             help="kompiliertes Level (.snkl), im Menü mit L wählbar")
+    play_parser.add_argument("--autopilot", type=int, action="append", default=[], choices=(1, 2),
+                             help="Spieler, den der Autopilot steuert")
+    play_parser.add_argument("--replay-dir", help="jedes Spiel als Replay hierhin schreiben")
+    play_parser.add_argument("--profile-out", help="Phasen-Profil hierhin schreiben")
+    play_parser.add_argument("--no-telemetry", action="store_true", help="keine Telemetrie schreiben")
+
+    run_parser = commands.add_parser("run", help="Autopilot-Partien ohne Fenster")
+    run_parser.add_argument("--games", type=int, default=1)
+    run_parser.add_argument("--players", type=int, choices=(1, 2), default=1)
+    run_parser.add_argument("--difficulty", choices=[d.name.lower() for d in Difficulty], default="hard")
+    run_parser.add_argument("--level", help="kompiliertes Level (.snkl)")
+    run_parser.add_argument("--seed", type=int, default=0, help="erster Seed")
+    run_parser.add_argument("--max-ticks", type=int, default=100_000)
+    run_parser.add_argument("--replay-dir", help="jedes Spiel als Replay hierhin schreiben")
+
+    for name, (_module, help_text) in DELEGATED.items():
+        commands.add_parser(name, help=help_text, add_help=False)
+    return parser
+
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else list(argv)
+    if argv and argv[0] in DELEGATED:
+        module_name = DELEGATED[argv[0]][0]
+        return importlib.import_module(module_name).main(argv[1:])
+
+    args = build_parser().parse_args(argv)
+    if args.command == "run":
+        return run(args)
+    if args.command is None:
+        args = build_parser().parse_args(["play"])
+    return play(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
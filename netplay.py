@@ -0,0 +1,540 @@
+"""
+Netzwerk-Multiplayer über asyncio.
+
+Der Server berechnet jedes Match autoritativ in einer eigenen `SnakeEngine`;
+Clients schicken nur Richtungswechsel und bekommen pro Takt ein Delta
+(Kopf bewegt, Schwanz entfernt, Items erschienen/entfernt, Punkte). Ein
+kompletter Zustand (Snapshot) wird nur beim Beitreten oder zur
+Resynchronisation geschickt.
+
+Das Delta eines Takts wird pro Match nur einmal kodiert und an alle
+Clients verschickt. Ist der Sendepuffer eines Clients voll (langsame
+Verbindung), bekommt er keine Deltas mehr, sondern sobald der Puffer leer
+ist einen neuen Snapshot. So bleiben Latenz und Bandbreite pro Client
+begrenzt, und ein langsamer Client bremst sein Match nicht aus.
+
+Nachrichten: Länge (u32), Typ (u8), Inhalt.
+
+    python netplay.py serve --port 8765
+    python netplay.py bot --match test --players 2 & python netplay.py bot --match test
+"""
+import argparse
+import asyncio
+import logging
+import random
+import struct
+import sys
+from array import array
+
+from engine import (SnakeEngine, Board, SparseBoard, Difficulty, ItemType, Snake,
+                    DIRECTIONS, DIRECTION_VECTORS, DEATH_CAUSES, cell_code)
+from inputs import InputQueue
+
+DEFAULT_PORT = 8765
+
+# Nachrichtentypen Client -> Server
+JOIN, INPUT, RESYNC = 1, 2, 3
+# Nachrichtentypen Server -> Client
+WELCOME, SNAPSHOT, DELTA, END = 10, 11, 12, 13
+
+FRAME = struct.Struct("<IB")
+U8 = struct.Struct("<B")
+U16 = struct.Struct("<H")
+U32 = struct.Struct("<I")
+WELCOME_MSG = struct.Struct("<BBHHB")
+SNAKE_HEADER = struct.Struct("<IHiiI")      # score, glow, velocity_x, velocity_y, Länge
+ITEM = struct.Struct("<IB")
+END_MSG = struct.Struct("<BB")
+
+# Flags pro Schlange im Delta
+HEAD_MOVED, TAIL_DROPPED, SCORE_CHANGED = 1, 2, 4
+
+# Gemerkter Kopf einer Schlange ohne Körper (Länge 1, an Hindernis oder Gift gestorben)
+NO_HEAD = -1
+
+# Ab so vielen ungesendeten Bytes bekommt ein Client keine Deltas mehr
+MAX_CLIENT_BUFFER = 64 * 1024
+
+# Größte erlaubte Nachricht (Schutz vor kaputten oder böswilligen Clients)
+MAX_MESSAGE = 16 * 1024 * 1024
+
+DIRECTION_CODES = {direction: code for code, direction in enumerate(DIRECTIONS)}
+
+
+def frame(kind, payload=b""):
+    """Verpackt eine Nachricht (Länge, Typ, Inhalt)."""
+    return FRAME.pack(len(payload), kind) + payload
+
+
+async def read_frame(reader):
+    """Liest eine Nachricht; gibt (Typ, Inhalt) zurück."""
+    length, kind = FRAME.unpack(await reader.readexactly(FRAME.size))
+    if length > MAX_MESSAGE:
+        raise ConnectionError(f"Nachricht zu groß ({length} Bytes)")
+    payload = await reader.readexactly(length) if length else b""
+    return kind, payload
+
+
+# -----------------------------------------------------------------------------
+# SNAPSHOTS UND DELTAS
+# -----------------------------------------------------------------------------
+def encode_snapshot(engine):
+    """Kompletter sichtbarer Zustand: Takt, Schlangen, Hindernisse, Items."""
+    parts = [U32.pack(engine.tick), U8.pack(len(engine.snakes))]
+    for snake in engine.snakes:
+        parts.append(SNAKE_HEADER.pack(snake.score, engine.effect_ticks(snake, "gold_glow"),
+                                       snake.velocity_x, snake.velocity_y, len(snake.body)))
+        parts.append(struct.pack(f"<{len(snake.body)}I", *snake.body))
+    parts.append(U32.pack(len(engine.obstacles)))
+    parts.append(struct.pack(f"<{len(engine.obstacles)}I", *engine.obstacles))
+    items = engine.items
+    parts.append(U16.pack(len(items)))
+    for cell, item_type in items.items():
+        parts.append(ITEM.pack(cell, item_type.value))
+    return b"".join(parts)
+
+
+def set_glow(engine, snake, glow):
+    """Übernimmt die verbleibenden Glow-Takte einer Schlange in die Anzeige-Engine."""
+    if glow:
+        snake.effects["gold_glow"] = [1, engine.tick + glow]
+    else:
+        snake.effects.pop("gold_glow", None)
+
+
+def apply_snapshot(engine, data):
+    """Überträgt einen Snapshot in eine (nur zur Anzeige genutzte) Engine."""
+    engine.tick, num_snakes = struct.unpack_from("<IB", data)
+    offset = 5
+    num_cells = engine.rows * engine.cols
+    code = cell_code(num_cells)
+    board = engine.board = (SparseBoard if engine.sparse else Board)(num_cells)
+    engine.snakes = []
+    for player in range(1, num_snakes + 1):
+        score, glow, velocity_x, velocity_y, length = SNAKE_HEADER.unpack_from(data, offset)
+        offset += SNAKE_HEADER.size
+        body = struct.unpack_from(f"<{length}I", data, offset)
+        offset += 4 * length
+        # Ohne Körper (tot) wird die Schlange nicht gezeichnet, die Position zählt nicht
+        x, y = engine.position(body[0]) if body else (0, 0)
+        snake = Snake(x, y, engine.cols, engine.snake_bit(player), code)
+        snake.body = array(code, body)
+        for cell in body:
+            board.add(cell, snake.bit)
+        snake.score = score
+        set_glow(engine, snake, glow)
+        snake.velocity_x = velocity_x
+        snake.velocity_y = velocity_y
+        engine.snakes.append(snake)
+    (count,) = U32.unpack_from(data, offset)
+    offset += 4
+    engine.obstacles = array(code)
+    for cell in struct.unpack_from(f"<{count}I", data, offset):
+        engine.add_obstacle(cell)
+    offset += 4 * count
+    (count,) = U16.unpack_from(data, offset)
+    offset += 2
+    engine.item_cells = array(code)
+    for _ in range(count):
+        cell, item_type = ITEM.unpack_from(data, offset)
+        offset += ITEM.size
+        engine.add_item(cell, ItemType(item_type))
+
+
+class DeltaEncoder:
+    """
+    Merkt sich den zuletzt verschickten Zustand eines Matches und kodiert
+    die Änderungen eines Takts.
+
+    Pro Schlange: Kopf (falls bewegt), Anzahl entfernter Schwanzzellen,
+    Punkte und Glow (falls die Punkte sich geändert haben; sonst zählt der
+    Client den Glow selbst herunter); danach entfernte und neue Items sowie
+    neue Hindernisse.
+    """
+    def __init__(self, engine):
+        self.engine = engine
+        self.sync()
+
+    def sync(self):
+        """Übernimmt den aktuellen Zustand als Basis (nach einem Snapshot)."""
+        engine = self.engine
+        self.heads = [snake.body[0] if snake.body else NO_HEAD for snake in engine.snakes]
+        self.lengths = [len(snake.body) for snake in engine.snakes]
+        self.scores = [snake.score for snake in engine.snakes]
+        self.items = engine.items
+        self.obstacles = set(engine.obstacles)
+
+    def encode(self):
+        """Delta seit dem letzten Aufruf (bzw. `sync`)."""
+        engine = self.engine
+        parts = [U32.pack(engine.tick)]
+        for i, snake in enumerate(engine.snakes):
+            body = snake.body
+            # Ohne Körper kein neuer Kopf; der Client räumt nur den Schwanz
+            head = body[0] if body else NO_HEAD
+            moved = head != NO_HEAD and head != self.heads[i]
+            dropped = self.lengths[i] + moved - len(body)
+            flags = ((HEAD_MOVED if moved else 0) | (TAIL_DROPPED if dropped else 0)
+                     | (SCORE_CHANGED if snake.score != self.scores[i] else 0))
+            parts.append(U8.pack(flags))
+            if moved:
+                parts.append(U32.pack(head))
+            if dropped:
+                parts.append(U16.pack(dropped))
+            if flags & SCORE_CHANGED:
+                parts.append(struct.pack("<IH", snake.score, engine.effect_ticks(snake, "gold_glow")))
+            self.heads[i] = head
+            self.lengths[i] = len(body)
+            self.scores[i] = snake.score
+
+        items = engine.items
+        removed = [cell for cell in self.items if cell not in items]
+        added = [(cell, item_type) for cell, item_type in items.items()
+                 if self.items.get(cell) is not item_type]
+        parts.append(U8.pack(len(removed)))
+        parts.append(struct.pack(f"<{len(removed)}I", *removed))
+        parts.append(U8.pack(len(added)))
+        for cell, item_type in added:
+            parts.append(ITEM.pack(cell, item_type.value))
+            self.items[cell] = item_type
+        for cell in removed:
+            del self.items[cell]
+
+        new_obstacles = ()
+        if len(engine.obstacles) != len(self.obstacles):
+            new_obstacles = [cell for cell in engine.obstacles if cell not in self.obstacles]
+            self.obstacles.update(new_obstacles)
+        parts.append(U16.pack(len(new_obstacles)))
+        parts.append(struct.pack(f"<{len(new_obstacles)}I", *new_obstacles))
+        return b"".join(parts)
+
+
+def apply_delta(engine, data):
+    """Wendet ein Delta auf die Anzeige-Engine eines Clients an."""
+    (engine.tick,) = U32.unpack_from(data)
+    offset = 4
+    board = engine.board
+    for snake in engine.snakes:
+        flags = data[offset]
+        offset += 1
+        if flags & HEAD_MOVED:
+            (head,) = U32.unpack_from(data, offset)
+            offset += 4
+            snake.body.insert(0, head)
+            board.add(head, snake.bit)
+            snake.x, snake.y = engine.position(head)
+        if flags & TAIL_DROPPED:
+            (dropped,) = U16.unpack_from(data, offset)
+            offset += 2
+            for _ in range(dropped):
+                board.remove(snake.body.pop(), snake.bit)
+            # Der Kopf kann auf die gerade frei gewordene Schwanzzelle gerückt sein
+            if snake.body:
+                board.add(snake.body[0], snake.bit)
+        if flags & SCORE_CHANGED:
+            snake.score, glow = struct.unpack_from("<IH", data, offset)
+            offset += 6
+            set_glow(engine, snake, glow)
+        elif engine.effect_ticks(snake, "gold_glow") <= 0:
+            snake.effects.pop("gold_glow", None)
+
+    count = data[offset]
+    offset += 1
+    for cell in struct.unpack_from(f"<{count}I", data, offset):
+        engine.remove_item(cell)
+    offset += 4 * count
+    count = data[offset]
+    offset += 1
+    for _ in range(count):
+        cell, item_type = ITEM.unpack_from(data, offset)
+        offset += ITEM.size
+        # Ein geändertes Item ersetzt das alte auf derselben Zelle
+        engine.remove_item(cell)
+        engine.add_item(cell, ItemType(item_type))
+    (count,) = U16.unpack_from(data, offset)
+    offset += 2
+    for cell in struct.unpack_from(f"<{count}I", data, offset):
+        engine.add_obstacle(cell)
+
+
+# -----------------------------------------------------------------------------
+# SERVER
+# -----------------------------------------------------------------------------
+class ClientConnection:
+    """Ein verbundener Spieler auf Serverseite."""
+    def __init__(self, reader, writer):
+        self.reader = reader
+        self.writer = writer
+        self.match = None
+        self.player = 0
+        self.needs_resync = True
+
+    @property
+    def backlog(self):
+        """Noch nicht gesendete Bytes."""
+        return self.writer.transport.get_write_buffer_size()
+
+    def send(self, data):
+        if not self.writer.is_closing():
+            self.writer.write(data)
+
+
+class Match:
+    """Ein Spiel auf dem Server mit eigener Engine und eigenem Takt."""
+    def __init__(self, name, players, difficulty, rows, cols):
+        self.name = name
+        self.players = players
+        self.difficulty = difficulty
+        mode = "Multiplayer" if players == 2 else "Singleplayer"
+        self.engine = SnakeEngine(mode, rows, cols)
+        # Eingaben der Clients, pro Takt eine Richtung je Spieler
+        self.inputs = InputQueue()
+        self.clients = []
+        self.encoder = None
+        self.task = None
+
+    @property
+    def full(self):
+        return len(self.clients) >= self.players
+
+    def add(self, client):
+        client.match = self
+        client.player = len(self.clients) + 1
+        self.clients.append(client)
+        engine = self.engine
+        client.send(frame(WELCOME, WELCOME_MSG.pack(client.player, self.players,
+                                                    engine.rows, engine.cols,
+                                                    self.difficulty.value)))
+        client.needs_resync = True
+
+    def broadcast(self, data):
+        """Schickt Deltas; wer zu weit zurückliegt, bekommt später einen Snapshot."""
+        snapshot = None
+        for client in self.clients:
+            if client.needs_resync:
+                if client.backlog == 0:
+                    if snapshot is None:
+                        snapshot = frame(SNAPSHOT, encode_snapshot(self.engine))
+                    client.send(snapshot)
+                    client.needs_resync = False
+            elif client.backlog > MAX_CLIENT_BUFFER:
+                client.needs_resync = True
+            else:
+                client.send(data)
+
+    async def run(self):
+        """Spielschleife des Matches mit festem Takt (Sollzeitpunkte, kein Drift)."""
+        engine = self.engine
+        engine.start()
+        self.encoder = DeltaEncoder(engine)
+        self.broadcast(b"")
+        loop = asyncio.get_running_loop()
+        next_tick = loop.time()
+        while not engine.game_over and self.clients:
+            next_tick += engine.tick_interval(self.difficulty) / 1000
+            await asyncio.sleep(max(0.0, next_tick - loop.time()))
+            self.inputs.apply(engine)
+            engine.step()
+            self.broadcast(frame(DELTA, self.encoder.encode()))
+        cause = DEATH_CAUSES.index(engine.death_cause) if engine.game_over else 0
+        for client in self.clients:
+            client.send(frame(END, END_MSG.pack(cause, engine.loser or 0)))
+            client.match = None
+
+
+class SnakeServer:
+    """
+    asyncio-Server für beliebig viele gleichzeitige Matches.
+
+    Clients treten per JOIN einem Match (Name) bei; sobald es voll ist,
+    startet es. Ein Match mit einem Spieler startet sofort.
+    """
+    def __init__(self, difficulty=Difficulty.MEDIUM, rows=25, cols=25):
+        self.difficulty = difficulty
+        self.rows = rows
+        self.cols = cols
+        self.matches = {}
+        self.server = None
+
+    async def start(self, host="127.0.0.1", port=DEFAULT_PORT):
+        self.server = await asyncio.start_server(self.handle_client, host, port)
+        return self.server
+
+    async def serve_forever(self, host="127.0.0.1", port=DEFAULT_PORT):
+        server = await self.start(host, port)
+        async with server:
+            await server.serve_forever()
+
+    def join(self, client, name, players):
+        """Fügt einen Client dem (ggf. neuen) Match hinzu und startet es, wenn es voll ist."""
+        match = self.matches.get(name)
+        if match is None or match.full or match.task is not None:
+            match = Match(name, players, self.difficulty, self.rows, self.cols)
+            self.matches[name] = match
+        match.add(client)
+        if match.full:
+            match.task = asyncio.create_task(self.run_match(match))
+
+    async def run_match(self, match):
+        try:
+            await match.run()
+        finally:
+            if self.matches.get(match.name) is match:
+                del self.matches[match.name]
+
+    async def handle_client(self, reader, writer):
+        client = ClientConnection(reader, writer)
+        try:
+            while True:
+                kind, payload = await read_frame(reader)
+                if kind in (JOIN, INPUT) and not payload:
+                    # Kaputte Nachricht: Verbindung trennen wie bei zu großen
+                    raise ConnectionError(f"Nachricht {kind} ohne Inhalt")
+                match = client.match
+                if kind == JOIN and match is None:
+                    players = min(max(payload[0], 1), 2)
+                    self.join(client, payload[1:].decode("utf-8", "replace"), players)
+                elif kind == INPUT and match is not None:
+                    match.inputs.push(match.engine, client.player, DIRECTIONS[payload[0] & 3])
+                elif kind == RESYNC and match is not None:
+                    client.needs_resync = True
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            match = client.match
+            if match is not None and client in match.clients:
+                match.clients.remove(client)
+            writer.close()
+
+
+# -----------------------------------------------------------------------------
+# CLIENT
+# -----------------------------------------------------------------------------
+class SnakeClient:
+    """
+    Client: schickt Richtungswechsel, spiegelt den Spielzustand in
+    `self.engine` (eine Engine nur zur Anzeige, z.B. für die Renderer).
+    """
+    def __init__(self):
+        self.reader = None
+        self.writer = None
+        self.engine = None
+        self.player = 0
+        self.difficulty = None
+        self.synced = False
+        self.result = None       # (Ursache, Verlierer) nach Spielende
+        self.bytes_received = 0
+
+    async def connect(self, host="127.0.0.1", port=DEFAULT_PORT):
+        self.reader, self.writer = await asyncio.open_connection(host, port)
+
+    async def join(self, match, players=2):
+        self.writer.write(frame(JOIN, U8.pack(players) + match.encode("utf-8")))
+        await self.writer.drain()
+
+    def send_direction(self, direction):
+        self.writer.write(frame(INPUT, U8.pack(DIRECTION_CODES[direction])))
+
+    def request_resync(self):
+        self.writer.write(frame(RESYNC))
+
+    def handle(self, kind, payload):
+        """Verarbeitet eine Nachricht des Servers."""
+        if kind == WELCOME:
+            self.player, players, rows, cols, tick_ms = WELCOME_MSG.unpack(payload)
+            mode = "Multiplayer" if players == 2 else "Singleplayer"
+            self.engine = SnakeEngine(mode, rows, cols, seed=0)
+            self.difficulty = Difficulty(tick_ms)
+        elif kind == SNAPSHOT:
+            apply_snapshot(self.engine, payload)
+            self.synced = True
+        elif kind == DELTA and self.synced:
+            (tick,) = U32.unpack_from(payload)
+            if tick != self.engine.tick + 1:
+                # Takt verpasst: neuen Snapshot anfordern
+                self.synced = False
+                self.request_resync()
+                return
+            apply_delta(self.engine, payload)
+        elif kind == END:
+            cause, loser = END_MSG.unpack(payload)
+            self.engine.game_over = True
+            self.engine.death_cause = DEATH_CAUSES[cause]
+            self.engine.loser = loser or None
+            self.result = (self.engine.death_cause, self.engine.loser)
+
+    async def run(self, on_update=None):
+        """Empfängt Nachrichten bis zum Spielende; `on_update(client)` nach jedem Takt."""
+        while self.result is None:
+            kind, payload = await read_frame(self.reader)
+            self.bytes_received += FRAME.size + len(payload)
+            self.handle(kind, payload)
+            if on_update is not None and kind in (SNAPSHOT, DELTA):
+                on_update(self)
+        return self.result
+
+    async def close(self):
+        self.writer.close()
+        await self.writer.wait_closed()
+
+
+# -----------------------------------------------------------------------------
+# KOMMANDOZEILE
+# -----------------------------------------------------------------------------
+def bot_direction(engine, player, rng):
+    """Zufällige Richtung, die nicht sofort in Wand, Körper oder Hindernis führt."""
+    snake = engine.snakes[player - 1]
+    if not snake.body:
+        return None
+    x, y = engine.position(snake.body[0])
+    safe = []
+    for direction in DIRECTIONS:
+        dx, dy = DIRECTION_VECTORS[direction]
+        nx, ny = x + dx, y + dy
+        cell = ny * engine.cols + nx
+        if (0 <= nx < engine.cols and 0 <= ny < engine.rows
+                and not engine.in_body(snake, cell) and not engine.is_obstacle(cell)):
+            safe.append(direction)
+    return rng.choice(safe) if safe else None
+
+
+async def run_bot(host, port, match, players):
+    client = SnakeClient()
+    await client.connect(host, port)
+    await client.join(match, players)
+    rng = random.Random()
+
+    def steer(client):
+        direction = bot_direction(client.engine, client.player, rng)
+        if direction is not None and rng.random() < 0.3:
+            client.send_direction(direction)
+
+    cause, loser = await client.run(steer)
+    scores = ", ".join(str(snake.score) for snake in client.engine.snakes)
+    print(f"Spieler {client.player}: Takt {client.engine.tick}, Punkte {scores}, "
+          f"Ende: {cause} (Spieler {loser}), {client.bytes_received} Bytes empfangen")
+    await client.close()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Snake über das Netzwerk.")
+    parser.add_argument("command", choices=("serve", "bot"))
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument("--difficulty", choices=[d.name.lower() for d in Difficulty], default="medium")
+    parser.add_argument("--match", default="default", help="Name des Matches (bot)")
+    parser.add_argument("--players", type=int, choices=(1, 2), default=2, help="Spieler im Match (bot)")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+    if args.command == "serve":
+        server = SnakeServer(Difficulty[args.difficulty.upper()])
+        logging.info(f"Server läuft auf {args.host}:{args.port}")
+        asyncio.run(server.serve_forever(args.host, args.port))
+    else:
+        asyncio.run(run_bot(args.host, args.port, args.match, args.players))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,123 @@
+"""
+Zeitmessung pro Phase eines Frames (Eingabe, Logik, Items, Spawnen,
+Zeichnen, Tk-Leerlauf) mit gleitenden Perzentilen.
+
+Gemessen wird, indem einzelne Methoden eines Objekts durch zeitmessende
+Wrapper ersetzt werden; verschachtelte Phasen werden exklusiv gezählt
+(die Zeit für Spawnen steckt also nicht zusätzlich in "items").
+"""
+import csv
+import json
+import time
+from collections import deque
+
+# Anzahl der Messwerte pro Phase für die Perzentile
+PROFILE_WINDOW = 1000
+
+PERCENTILES = (50, 95, 99)
+
+
+def percentile(sorted_values, q):
+    """q-Perzentil (0..100) einer bereits sortierten Liste (nächster Rang)."""
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, int(len(sorted_values) * q / 100))
+    return sorted_values[index]
+
+
+class PhaseProfiler:
+    """
+    Sammelt Laufzeiten pro Phase in einem gleitenden Fenster.
+
+    `instrument(obj, "methode", "phase")` misst jeden Aufruf einer Methode,
+    `instrument_idle(obj, "methode")` misst die Zeit *zwischen* zwei Aufrufen
+    (z.B. wie lange Tk zwischen zwei Frames untätig war).
+    """
+    def __init__(self, window=PROFILE_WINDOW, clock=time.perf_counter):
+        self.window = window
+        self.clock = clock
+        self.samples = {}
+        self._stack = []
+
+    def record(self, phase, seconds):
+        """Speichert einen Messwert (in Sekunden) für eine Phase."""
+        samples = self.samples.get(phase)
+        if samples is None:
+            samples = self.samples[phase] = deque(maxlen=self.window)
+        samples.append(seconds)
+
+    def instrument(self, obj, method_name, phase):
+        """Ersetzt `obj.method_name` durch eine zeitmessende Variante."""
+        func = getattr(obj, method_name)
+        clock = self.clock
+        stack = self._stack
+        record = self.record
+
+        def timed(*args, **kwargs):
+            stack.append(0.0)
+            start = clock()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                elapsed = clock() - start
+                children = stack.pop()
+                record(phase, elapsed - children)
+                if stack:
+                    stack[-1] += elapsed
+
+        setattr(obj, method_name, timed)
+
+    def instrument_idle(self, obj, method_name, phase="idle"):
+        """Misst die Lücke zwischen dem Ende eines Aufrufs und dem Beginn des nächsten."""
+        func = getattr(obj, method_name)
+        clock = self.clock
+        record = self.record
+        last_end = [None]
+
+        def timed(*args, **kwargs):
+            start = clock()
+            if last_end[0] is not None:
+                record(phase, start - last_end[0])
+            try:
+                return func(*args, **kwargs)
+            finally:
+                last_end[0] = clock()
+
+        setattr(obj, method_name, timed)
+
+    def reset(self):
+        """Verwirft alle Messwerte."""
+        self.samples.clear()
+
+    def summary(self):
+        """{phase: {"count", "p50", "p95", "p99", "max"}} mit Zeiten in ms."""
+        result = {}
+        for phase, samples in self.samples.items():
+            values = sorted(samples)
+            stats = {"count": len(values)}
+            for q in PERCENTILES:
+                stats[f"p{q}"] = percentile(values, q) * 1000
+            stats["max"] = values[-1] * 1000 if values else 0.0
+            result[phase] = stats
+        return result
+
+    def format_overlay(self):
+        """Mehrzeiliger Text für das Performance-Overlay."""
+        lines = ["phase    p50    p95    p99 ms"]
+        for phase, stats in self.summary().items():
+            lines.append(f"{phase:<6} {stats['p50']:6.2f} {stats['p95']:6.2f} {stats['p99']:6.2f}")
+        return "\n".join(lines)
+
+    def dump(self, path):
+        """Schreibt die Statistik als JSON (.json) oder CSV (sonst)."""
+        summary = self.summary()
+        if str(path).endswith(".json"):
+            with open(path, "w") as file:
+                json.dump(summary, file, indent=2)
+            return
+        columns = ["count"] + [f"p{q}" for q in PERCENTILES] + ["max"]
+        with open(path, "w", newline="") as file:
+            writer = csv.writer(file)
+            writer.writerow(["phase"] + columns)
+            for phase, stats in summary.items():
+                writer.writerow([phase] + [stats[c] for c in columns])
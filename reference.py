@@ -0,0 +1,265 @@
+"""
+Referenzregeln: die Spiellogik in ihrer einfachsten Form, als Orakel für
+`difftest.py`.
+
+Die Engine (`engine.py`) ist auf Tempo gebaut: ein Byte pro Zelle, Heaps,
+Sonderfälle für große Felder. Diese Datei beschreibt dieselben Regeln
+ohne jede Optimierung: Körper sind Listen, die Belegung wird bei jedem
+Spawn aus Schlangen, Items und Hindernissen neu bestimmt, Effekte sind
+eine Liste laufender Instanzen. Sie wird nicht optimiert und ändert sich
+nur, wenn sich die Regeln ändern; jede schnellere Implementierung muss
+Takt für Takt denselben Zustand liefern.
+
+Festgeschrieben ist auch, welche Zelle beim Spawnen gezogen wird (gleicher
+Seed, gleiche Zufallszahlen): SplitMix64, erst SAMPLE_TRIES blinde
+Versuche, dann die k-te freie Zelle (große Felder: ab einer Zufallszelle
+die nächste freie).
+
+Die Konstanten stehen hier bewusst noch einmal als Zahlen (Startpositionen,
+Effektdauern und Punkte wie im ursprünglichen Spiel): ein falscher Wert in
+der Engine soll als Abweichung auffallen, nicht in das Orakel wandern. Die
+Regeln selbst sind die der Engine, nicht die des ursprünglichen Spiels;
+gegen dieses prüft `difftest.py --candidate baseline`.
+"""
+from engine import Direction, ItemType
+
+START_POSITIONS = ((5, 5), (15, 15))
+SPARSE_CELLS = 256 * 256
+SAMPLE_TRIES = 64
+EFFECT_TICKS = {"gold_glow": 30, "speed_boost": 100, "slowdown": 100}
+MAX_SPAWNED_ITEMS = 3
+FOOD_POINTS = {ItemType.RED_FOOD: 1, ItemType.GOLD_FOOD: 3}
+DIRECTION_VECTORS = {
+    Direction.UP: (0, -1),
+    Direction.DOWN: (0, 1),
+    Direction.LEFT: (-1, 0),
+    Direction.RIGHT: (1, 0),
+}
+MASK64 = 2 ** 64 - 1
+
+
+class Random:
+    """SplitMix64 wie in der Engine."""
+    def __init__(self, seed):
+        self.state = seed & MASK64
+
+    def next64(self):
+        self.state = (self.state + 0x9E3779B97F4A7C15) & MASK64
+        z = self.state
+        z = ((z ^ (z >> 30)) * 0xBF58476D1CE4E5B9) & MASK64
+        z = ((z ^ (z >> 27)) * 0x94D049BB133111EB) & MASK64
+        return z ^ (z >> 31)
+
+    def randrange(self, n):
+        # Zahlen oberhalb des letzten vollen Vielfachen von n werden verworfen
+        limit = MASK64 - (MASK64 + 1) % n
+        z = self.next64()
+        while z > limit:
+            z = self.next64()
+        return z % n
+
+    def getstate(self):
+        return self.state
+
+
+def sample_free(rng, occupied, num_cells, sparse):
+    """Freie Zelle (nicht in `occupied`) wie beim Spawnen oder None, wenn keine frei ist."""
+    if len(occupied) >= num_cells:
+        return None
+    for _ in range(SAMPLE_TRIES):
+        cell = rng.randrange(num_cells)
+        if cell not in occupied:
+            return cell
+    if sparse:
+        cell = rng.randrange(num_cells)
+        while cell in occupied:
+            cell = (cell + 1) % num_cells
+        return cell
+    free = [cell for cell in range(num_cells) if cell not in occupied]
+    return free[rng.randrange(len(free))]
+
+
+class Snake:
+    def __init__(self, x, y, cols):
+        self.x = x
+        self.y = y
+        self.body = [y * cols + x]    # Kopf zuerst
+        self.growth = 0
+        self.velocity_x = 0
+        self.velocity_y = 0
+        self.score = 0
+        self.instances = []           # laufende Effekte als (Name, Ende)
+
+    @property
+    def cells(self):
+        return set(self.body)
+
+    @property
+    def effects(self):
+        """Name -> [Anzahl, Ende der letzten Instanz] wie `engine.Snake.effects`."""
+        effects = {}
+        for name, end in self.instances:
+            if name in effects:
+                effects[name][0] += 1
+                effects[name][1] = max(effects[name][1], end)
+            else:
+                effects[name] = [1, end]
+        return effects
+
+
+class ReferenceEngine:
+    """
+    Dieselbe Schnittstelle wie `SnakeEngine` (ohne Levels, Snapshots und
+    Eingabe-Protokoll): `reset`, `start`, `step`, `set_direction`,
+    `spawn_obstacle` und die Zustandsattribute.
+    """
+    def __init__(self, mode="Singleplayer", rows=25, cols=25, seed=0, sparse=None,
+                 item_rates=None):
+        self.mode = mode
+        self.rows = rows
+        self.cols = cols
+        self.sparse = rows * cols >= SPARSE_CELLS if sparse is None else sparse
+        self.item_rates = item_rates or {}
+        self.reset(seed)
+
+    def reset(self, seed):
+        self.seed = seed
+        self.rng = Random(seed)
+        players = 2 if self.mode == "Multiplayer" else 1
+        self.snakes = [Snake(min(x, self.cols - 1), min(y, self.rows - 1), self.cols)
+                       for x, y in START_POSITIONS[:players]]
+        self.items = {}               # Zelle -> ItemType
+        self.food_cells = ()
+        self.obstacles = set()
+        self.tick = 0
+        self.game_over = False
+        self.death_cause = None
+        self.loser = None
+        self.events = []
+
+    def start(self):
+        self.spawn_food_pair()
+
+    def set_direction(self, player, direction):
+        if player > len(self.snakes):
+            return False
+        snake = self.snakes[player - 1]
+        dx, dy = DIRECTION_VECTORS[direction]
+        if dx and snake.velocity_x == -dx or dy and snake.velocity_y == -dy:
+            return False
+        snake.velocity_x = dx
+        snake.velocity_y = dy
+        return True
+
+    def step(self, actions=None):
+        self.events = []
+        if self.game_over:
+            return self.events
+        for player, direction in enumerate(actions or (), 1):
+            if direction is not None:
+                self.set_direction(player, direction)
+        self.move()
+        return self.events
+
+    # -------------------------------------------------------------------------
+    # REGELN
+    # -------------------------------------------------------------------------
+    def move(self):
+        self.tick += 1
+        for snake in self.snakes:
+            snake.instances = [(name, end) for name, end in snake.instances if end > self.tick]
+
+        # Beide Schlangen ziehen nacheinander, auch wenn die erste das Spiel beendet
+        for player, snake in enumerate(self.snakes, 1):
+            snake.x += snake.velocity_x
+            snake.y += snake.velocity_y
+            self.move_snake(snake, player)
+
+        if not self.game_over:
+            for item_type in ItemType:
+                rate = self.item_rates.get(item_type, 0)
+                if rate > 0 and self.rng.next64() < min(int(rate * 2 ** 64), MASK64):
+                    if sum(1 for other in self.items.values() if other is item_type) < MAX_SPAWNED_ITEMS:
+                        self.spawn_item(item_type)
+
+    def end_game(self, cause, player):
+        self.game_over = True
+        self.death_cause = cause
+        self.loser = player
+        self.events.append((cause, player))
+
+    def move_snake(self, snake, player):
+        if not (0 <= snake.x < self.cols and 0 <= snake.y < self.rows):
+            self.end_game("wall_collision", player)
+            return
+        cell = snake.y * self.cols + snake.x
+        if snake.growth:
+            snake.growth -= 1
+        else:
+            snake.body.pop()
+        if cell in snake.body:
+            self.end_game("game_over", player)
+            return
+        if cell in self.obstacles:
+            self.end_game("obstacle_collision", player)
+            return
+        snake.body.insert(0, cell)
+
+        item_type = self.items.get(cell)
+        if item_type is None:
+            return
+        if item_type in FOOD_POINTS:
+            snake.growth += 1
+            if item_type is ItemType.GOLD_FOOD:
+                self.add_effect(snake, "gold_glow")
+            snake.score += FOOD_POINTS[item_type]
+            self.events.append(("item_eaten", player))
+            if cell in self.food_cells:
+                for food in self.food_cells:
+                    self.items.pop(food, None)
+                self.food_cells = ()
+                self.spawn_food_pair()
+            else:
+                del self.items[cell]
+        elif item_type is ItemType.POISON:
+            self.end_game("game_over", player)
+        else:
+            self.add_effect(snake, "speed_boost" if item_type is ItemType.SPEED_BOOST
+                            else "slowdown")
+            self.events.append(("item_eaten", player))
+            del self.items[cell]
+
+    def add_effect(self, snake, name):
+        snake.instances.append((name, self.tick + EFFECT_TICKS[name]))
+
+    # -------------------------------------------------------------------------
+    # SPAWNEN
+    # -------------------------------------------------------------------------
+    def occupied(self):
+        cells = set(self.items) | self.obstacles
+        for snake in self.snakes:
+            cells.update(snake.body)
+        return cells
+
+    def sample_free(self):
+        return sample_free(self.rng, self.occupied(), self.rows * self.cols, self.sparse)
+
+    def spawn_item(self, item_type):
+        cell = self.sample_free()
+        if cell is not None:
+            self.items[cell] = item_type
+        return cell
+
+    def spawn_food_pair(self):
+        red = self.spawn_item(ItemType.RED_FOOD)
+        if red is None:
+            self.end_game("board_full", None)
+            return
+        gold = self.spawn_item(ItemType.GOLD_FOOD)
+        self.food_cells = tuple(cell for cell in (red, gold) if cell is not None)
+
+    def spawn_obstacle(self):
+        cell = self.sample_free()
+        if cell is not None:
+            self.obstacles.add(cell)
+        return cell
@@ -0,0 +1,438 @@
+"""
+Retained-Mode-Renderer für das Tk-Canvas.
+
+Statt jedes Frame alles zu löschen und neu zu zeichnen, behält der Renderer
+die Canvas-IDs und aktualisiert nur, was sich seit dem letzten Frame geändert
+hat: Kopf und Schwanz der Schlangen werden per `coords` verschoben, Farben
+nur beim Wechsel des Gold-Glows gesetzt, Gitter und Texte einmal angelegt.
+Das Modul importiert kein tkinter; das Canvas wird von außen übergeben.
+"""
+import time
+from collections import deque
+
+from engine import ItemType
+
+# Farben (gemeinsam für alle Frontends)
+ITEM_COLORS = {
+    ItemType.RED_FOOD: "red",
+    ItemType.GOLD_FOOD: "gold",
+    ItemType.POISON: "purple",
+    ItemType.SPEED_BOOST: "blue",
+    ItemType.SLOWDOWN: "orange",
+}
+SNAKE_COLORS = {1: "lime green", 2: "yellow"}
+GLOW_COLOR = "orange"
+OBSTACLE_COLOR = "gray"
+GRID_COLOR = "dimgray"
+
+# So viele Takte darf der Kopf voraus sein, bevor komplett neu gezeichnet wird
+MAX_INCREMENTAL_STEPS = 8
+
+# Das Performance-Overlay wird höchstens so oft (in Sekunden) neu berechnet
+PERF_OVERLAY_INTERVAL = 0.5
+
+
+def snake_color(snake, player_number):
+    """Farbe einer Schlange. Leuchtet gold, solange der Effekt gold_glow läuft."""
+    if "gold_glow" in snake.effects:
+        return GLOW_COLOR
+    return SNAKE_COLORS[player_number]
+
+
+def cell_color(engine, cell):
+    """Farbe einer Zelle (Schlangen über Items über Hindernissen, None = leer)."""
+    snakes = engine.snakes
+    for player_number in range(len(snakes), 0, -1):
+        snake = snakes[player_number - 1]
+        if engine.in_body(snake, cell):
+            return snake_color(snake, player_number)
+    item_type = engine.item_at(cell)
+    if item_type is not None:
+        return ITEM_COLORS[item_type]
+    if engine.is_obstacle(cell):
+        return OBSTACLE_COLOR
+    return None
+
+
+class CanvasRenderer:
+    """
+    Zeichnet den Zustand eines `SnakeGame` inkrementell auf ein Canvas.
+
+    Nach `canvas.delete("all")` (z.B. in den Menüs) muss `invalidate()`
+    aufgerufen werden, damit beim nächsten `render()` neu aufgebaut wird.
+    """
+    def __init__(self, canvas, tile_size, width, height):
+        self.canvas = canvas
+        self.tile_size = tile_size
+        self.width = width
+        self.height = height
+        self.invalidate()
+
+    def invalidate(self):
+        """Vergisst alle Canvas-IDs; der nächste Frame baut alles neu auf."""
+        self.built = False
+        self.segments = {}       # player -> deque[(cell, canvas_id)], Kopf vorne
+        self.snake_colors = {}   # player -> aktuelle Füllfarbe
+        self.item_ids = {}       # cell -> (ItemType, canvas_id)
+        self.obstacle_count = 0
+        self.texts = {}          # Name -> (canvas_id, Text)
+        self.grid_shown = False
+        self.paused_shown = False
+        self.perf_shown = False
+        self.perf_updated = -PERF_OVERLAY_INTERVAL
+        self.game_over_shown = False
+
+    def rect_coords(self, cell, cols):
+        """Pixel-Koordinaten der Kachel einer Zelle."""
+        y, x = divmod(cell, cols)
+        ts = self.tile_size
+        return x * ts, y * ts, (x + 1) * ts, (y + 1) * ts
+
+    # -------------------------------------------------------------------------
+    # FRAME
+    # -------------------------------------------------------------------------
+    def render(self, game):
+        """Bringt das Canvas auf den aktuellen Stand des Spiels."""
+        if not self.built:
+            self.build(game)
+
+        # Gitternetz ein-/ausblenden
+        if game.grid_enabled != self.grid_shown:
+            self.grid_shown = game.grid_enabled
+            self.canvas.itemconfigure("grid", state="normal" if self.grid_shown else "hidden")
+
+        self.draw_world(game)
+        self.draw_scoreboard(game)
+        self.draw_perf_overlay(game)
+
+        if game.engine.game_over and not self.game_over_shown:
+            self.draw_game_over_text(game)
+
+    def draw_world(self, game):
+        """Hindernisse, Items und Schlangen."""
+        engine = game.engine
+
+        # Hindernisse kommen nur hinzu (oder alles wird zurückgesetzt)
+        if len(engine.obstacles) != self.obstacle_count:
+            self.draw_obstacles(engine)
+
+        self.draw_items(engine)
+
+        self.draw_snake(engine, 1)
+        if game.mode == "Multiplayer":
+            self.draw_snake(engine, 2)
+
+    def build(self, game):
+        """Legt den statischen Hintergrund (Gitter, Texte) einmalig an."""
+        self.canvas.delete("all")
+        self.invalidate()
+        self.built = True
+        self.draw_grid()
+
+        self.create_text("highscore", 100, 20, "Arial 10", "white")
+        self.create_text("p1", 30, 40, "Arial 10", SNAKE_COLORS[1])
+        if game.mode == "Multiplayer":
+            self.create_text("p2", 100, 40, "Arial 10", SNAKE_COLORS[2])
+        self.canvas.create_text(
+            self.width / 2, 20,
+            font="Arial 15 bold",
+            text="PAUSED",
+            fill="white",
+            state="hidden",
+            tags=("hud", "paused")
+        )
+        perf_id = self.canvas.create_text(
+            self.width - 5, 5,
+            anchor="ne",
+            font="Courier 9",
+            text="",
+            fill="white",
+            state="hidden",
+            tags=("hud", "perf")
+        )
+        self.texts["perf"] = (perf_id, "")
+
+    def create_text(self, name, x, y, font, color):
+        """Legt ein Text-Element an, dessen Inhalt später per `set_text` wechselt."""
+        text_id = self.canvas.create_text(x, y, font=font, text="", fill=color, tags=("hud",))
+        self.texts[name] = (text_id, "")
+
+    def set_text(self, name, text):
+        """Ändert einen Text nur, wenn er sich wirklich geändert hat."""
+        text_id, current = self.texts[name]
+        if text != current:
+            self.canvas.itemconfigure(text_id, text=text)
+            self.texts[name] = (text_id, text)
+
+    # -------------------------------------------------------------------------
+    # ELEMENTE
+    # -------------------------------------------------------------------------
+    def draw_grid(self):
+        """Einfaches Gitternetz über das Canvas (zunächst ausgeblendet)."""
+        ts = self.tile_size
+        for i in range(self.height // ts):
+            self.canvas.create_line(0, i * ts, self.width, i * ts,
+                                    fill=GRID_COLOR, state="hidden", tags=("grid",))
+        for j in range(self.width // ts):
+            self.canvas.create_line(j * ts, 0, j * ts, self.height,
+                                    fill=GRID_COLOR, state="hidden", tags=("grid",))
+
+    def draw_obstacles(self, engine):
+        """Zeichnet alle Hindernisse neu (nur wenn sich ihre Anzahl ändert)."""
+        self.canvas.delete("obstacle")
+        for cell in engine.obstacles:
+            self.canvas.create_rectangle(
+                *self.rect_coords(cell, engine.cols),
+                fill=OBSTACLE_COLOR,
+                tags=("obstacle",)
+            )
+        self.canvas.tag_raise("obstacle", "grid")
+        self.obstacle_count = len(engine.obstacles)
+
+    def draw_items(self, engine):
+        """Entfernt verschwundene und legt neue Items an; der Rest bleibt stehen."""
+        items = engine.items
+        drawn = self.item_ids
+        for cell in [c for c, (item_type, _) in drawn.items() if items.get(c) is not item_type]:
+            self.canvas.delete(drawn.pop(cell)[1])
+        for cell, item_type in items.items():
+            if cell not in drawn:
+                drawn[cell] = (item_type, self.draw_item(item_type, cell, engine.cols))
+
+    def draw_item(self, item_type, cell, cols):
+        """Zeichnet ein Item je nach Typ unterschiedlich (unterhalb der Schlangen)."""
+        item_id = self.canvas.create_rectangle(
+            *self.rect_coords(cell, cols),
+            fill=ITEM_COLORS[item_type],
+            tags=("item",)
+        )
+        if self.segments:
+            self.canvas.tag_lower(item_id, "snake")
+        else:
+            self.canvas.tag_lower(item_id, "hud")
+        return item_id
+
+    def draw_snake(self, engine, player_number):
+        """
+        Aktualisiert eine Schlange. Rückt der Kopf um k Zellen vor, werden die
+        k Schwanz-Rechtecke per `coords` an den Kopf verschoben; nur bei
+        Wachstum entstehen neue Rechtecke.
+        """
+        snake = engine.snakes[player_number - 1]
+        body = snake.body
+        segs = self.segments.get(player_number)
+        color = snake_color(snake, player_number)
+        tag = f"snake{player_number}"
+
+        if segs is None or not self.advance_snake(segs, body, engine.cols, color, tag):
+            self.rebuild_snake(player_number, body, engine.cols, color, tag)
+        elif color != self.snake_colors[player_number]:
+            # Farbwechsel nur bei Glow-Übergängen
+            self.canvas.itemconfigure(tag, fill=color)
+            self.snake_colors[player_number] = color
+
+    def advance_snake(self, segs, body, cols, color, tag):
+        """
+        Versucht, die gezeichnete Schlange inkrementell nachzuziehen.
+        Gibt False zurück, wenn ein kompletter Neuaufbau nötig ist.
+        """
+        n = len(body)
+        if not segs or not n:
+            return False
+        drawn_head = segs[0][0]
+        if body[0] == drawn_head:
+            return n == len(segs)
+
+        # Um wie viele Zellen ist der Kopf vorgerückt?
+        steps = 0
+        for k in range(1, min(n, MAX_INCREMENTAL_STEPS + 1)):
+            if body[k] == drawn_head:
+                steps = k
+                break
+        if not steps:
+            return n == len(segs) == 1 and self.move_single(segs, body[0], cols)
+        dropped = len(segs) + steps - n
+        if dropped < 0:
+            return False
+
+        # Schwanz-Rechtecke wiederverwenden, fehlende neu anlegen
+        canvas = self.canvas
+        for k in range(steps - 1, -1, -1):
+            cell = body[k]
+            if dropped:
+                _, seg_id = segs.pop()
+                dropped -= 1
+                canvas.coords(seg_id, *self.rect_coords(cell, cols))
+            else:
+                seg_id = canvas.create_rectangle(
+                    *self.rect_coords(cell, cols),
+                    fill=color,
+                    tags=("snake", tag)
+                )
+                canvas.tag_lower(seg_id, "hud")
+            segs.appendleft((cell, seg_id))
+        while dropped:
+            canvas.delete(segs.pop()[1])
+            dropped -= 1
+        return True
+
+    def move_single(self, segs, cell, cols):
+        """Schlange der Länge 1: das einzige Rechteck springt zum Kopf."""
+        _, seg_id = segs.pop()
+        self.canvas.coords(seg_id, *self.rect_coords(cell, cols))
+        segs.append((cell, seg_id))
+        return True
+
+    def rebuild_snake(self, player_number, body, cols, color, tag):
+        """Zeichnet eine Schlange komplett neu."""
+        self.canvas.delete(tag)
+        segs = deque()
+        for cell in body:
+            seg_id = self.canvas.create_rectangle(
+                *self.rect_coords(cell, cols),
+                fill=color,
+                tags=("snake", tag)
+            )
+            segs.append((cell, seg_id))
+        self.canvas.tag_lower(tag, "hud")
+        self.segments[player_number] = segs
+        self.snake_colors[player_number] = color
+
+    def draw_scoreboard(self, game):
+        """Zeigt Score und Highscore an; geändert wird nur, was anders ist."""
+        engine = game.engine
+        self.set_text("highscore", f"Highscore: {game.highscore}")
+        self.set_text("p1", f"P1: {engine.snakes[0].score}")
+        if "p2" in self.texts:
+            self.set_text("p2", f"P2: {engine.snakes[1].score}")
+        if game.is_paused != self.paused_shown:
+            self.paused_shown = game.is_paused
+            self.canvas.itemconfigure("paused", state="normal" if self.paused_shown else "hidden")
+
+    def draw_perf_overlay(self, game):
+        """Performance-Overlay (Taste H); der Text wird nur alle 0,5 s erneuert."""
+        if game.perf_overlay != self.perf_shown:
+            self.perf_shown = game.perf_overlay
+            self.canvas.itemconfigure("perf", state="normal" if self.perf_shown else "hidden")
+        if self.perf_shown:
+            now = time.perf_counter()
+            if now - self.perf_updated >= PERF_OVERLAY_INTERVAL:
+                self.perf_updated = now
+                self.set_text("perf", game.perf_overlay_text())
+
+    def draw_game_over_text(self, game):
+        """Game-Over-Anzeige."""
+        self.game_over_shown = True
+        engine = game.engine
+        w, h = self.width, self.height
+        self.canvas.create_text(
+            w / 2, h / 2 - 40,
+            font="Arial 20",
+            text="Game Over!",
+            fill="white",
+            tags=("hud",)
+        )
+        self.canvas.create_text(
+            w / 2, h / 2,
+            font="Arial 15",
+            text=f"Player 1 Score: {engine.snakes[0].score}",
+            fill=SNAKE_COLORS[1],
+            tags=("hud",)
+        )
+        if game.mode == "Multiplayer":
+            self.canvas.create_text(
+                w / 2, h / 2 + 20,
+                font="Arial 15",
+                text=f"Player 2 Score: {engine.snakes[1].score}",
+                fill=SNAKE_COLORS[2],
+                tags=("hud",)
+            )
+        self.canvas.create_text(
+            w / 2, h / 2 + 60,
+            font="Arial 15",
+            text="Press R to Restart",
+            fill="white",
+            tags=("hud",)
+        )
+
+
+class Viewport:
+    """Ein sichtbarer Ausschnitt: Pool aus Rechtecken und deren aktuelle Farben."""
+    def __init__(self, player_number, x_offset, cols, rows):
+        self.player_number = player_number
+        self.x_offset = x_offset
+        self.cols = cols
+        self.rows = rows
+        self.tile_ids = []
+        self.colors = [None] * (cols * rows)
+
+
+class ViewportRenderer(CanvasRenderer):
+    """
+    Renderer für große Spielfelder: zeigt nur einen Ausschnitt, der dem Kopf
+    von Player 1 folgt (im Multiplayer geteilt: links P1, rechts P2).
+
+    Jede sichtbare Kachel hat genau ein Rechteck aus einem festen Pool. Pro
+    Frame wird für jede Kachel die Farbe ermittelt und nur bei einer Änderung
+    per `itemconfigure` gesetzt. Aufwand und Speicher hängen damit von der
+    Größe des Ausschnitts ab, nicht von der des Spielfelds.
+    """
+    def invalidate(self):
+        super().invalidate()
+        self.viewports = []
+
+    def build(self, game):
+        super().build(game)
+        ts = self.tile_size
+        cols = self.width // ts
+        rows = self.height // ts
+        if game.mode == "Multiplayer":
+            half = cols // 2
+            self.viewports = [Viewport(1, 0, half, rows), Viewport(2, half * ts, half, rows)]
+            self.canvas.create_line(half * ts, 0, half * ts, self.height,
+                                    fill="white", width=2, tags=("hud",))
+        else:
+            self.viewports = [Viewport(1, 0, cols, rows)]
+
+        for view in self.viewports:
+            for vy in range(view.rows):
+                for vx in range(view.cols):
+                    x = view.x_offset + vx * ts
+                    view.tile_ids.append(self.canvas.create_rectangle(
+                        x, vy * ts, x + ts, (vy + 1) * ts,
+                        state="hidden",
+                        tags=("tile",)
+                    ))
+        self.canvas.tag_lower("tile", "hud")
+
+    def draw_world(self, game):
+        for view in self.viewports:
+            self.draw_viewport(game.engine, view)
+
+    def draw_viewport(self, engine, view):
+        """Setzt die Farben aller Kacheln eines Ausschnitts, die sich geändert haben."""
+        snake = engine.snakes[view.player_number - 1]
+        # Kamera auf den Kopf zentrieren, am Spielfeldrand anhalten
+        cam_x = min(max(snake.x - view.cols // 2, 0), max(engine.cols - view.cols, 0))
+        cam_y = min(max(snake.y - view.rows // 2, 0), max(engine.rows - view.rows, 0))
+
+        canvas = self.canvas
+        colors = view.colors
+        tile_ids = view.tile_ids
+        is_free = engine.board.is_free
+        visible_cols = min(view.cols, engine.cols)
+        i = 0
+        for vy in range(view.rows):
+            y = cam_y + vy
+            row = y * engine.cols + cam_x
+            for vx in range(view.cols):
+                color = None
+                if vx < visible_cols and y < engine.rows and not is_free(row + vx):
+                    color = cell_color(engine, row + vx)
+                if color != colors[i]:
+                    colors[i] = color
+                    if color is None:
+                        canvas.itemconfigure(tile_ids[i], state="hidden")
+                    else:
+                        canvas.itemconfigure(tile_ids[i], fill=color, state="normal")
+                i += 1
@@ -0,0 +1,385 @@
+"""
+Aufzeichnen und Abspielen von Spielen.
+
+Ein Spiel ist durch seinen Anfangszustand (inkl. Seed) und die Folge der
+Richtungswechsel eindeutig bestimmt. `ReplayWriter` hängt sich als
+`engine.input_log` an die Engine und schreibt diese Eingaben während des
+Spiels in ein kompaktes Binärformat:
+
+    Header   magic "SNKR", Version, Spieler, Flags, Takt (ms), rows, cols, seed
+    Records  INPUT     Tag, Takt-Differenz (varint), player << 2 | Richtung
+             KEYFRAME  Tag, Takt (u32), Länge (u32), Engine-Zustand (`snapshot()`)
+             END       Tag, Takt (u32), Ursache, Verlierer, Punkte pro Spieler (u32)
+    Index    pro Keyframe Takt (u32) und Dateiposition (u64)
+    Trailer  Position des Index (u64), Anzahl (u32), magic "SNKI"
+
+Alle KEYFRAME_INTERVAL Takte wird ein Keyframe geschrieben; über den Index
+springt `Replay.seek(tick)` direkt zum letzten Keyframe davor. Fehlt der
+Index (Spiel abgestürzt), werden die Records einmal durchsucht.
+
+    python replay.py spiel.snkr            # mit maximaler Geschwindigkeit abspielen
+    python replay.py spiel.snkr --verify   # Keyframes und Endstand nachprüfen
+    python replay.py spiel.snkr --window   # in Echtzeit im Fenster
+"""
+import argparse
+import mmap
+import os
+import struct
+import sys
+
+from engine import SnakeEngine, DIRECTIONS, DEATH_CAUSES
+
+MAGIC = b"SNKR"
+INDEX_MAGIC = b"SNKI"
+VERSION = 5
+
+HEADER = struct.Struct("<4sBBBxHHHQ")
+TRAILER = struct.Struct("<QI4s")
+INDEX_ENTRY = struct.Struct("<IQ")
+U32 = struct.Struct("<I")
+END_RECORD = struct.Struct("<IBB")
+
+# Record-Typen
+INPUT, KEYFRAME, END_OF_GAME = 1, 2, 3
+
+# Flags im Header
+FLAG_SPARSE = 1
+
+# Alle so viele Takte wird der komplette Zustand mitgeschrieben
+KEYFRAME_INTERVAL = 1000
+
+# Größe des Schreibpuffers; erst wenn er voll ist, wird in die Datei geschrieben
+BUFFER_SIZE = 64 * 1024
+
+DIRECTION_CODES = {direction: code for code, direction in enumerate(DIRECTIONS)}
+
+
+class ReplayError(Exception):
+    """Die Datei ist keine (gültige) Replay-Datei."""
+
+
+class ReplayWriter:
+    """
+    Schreibt die Eingaben eines laufenden Spiels in eine Replay-Datei.
+
+    Eingaben landen in einem vorab angelegten Puffer (pro Takt wird nichts
+    neu angelegt); nur Keyframes erzeugen neue Bytes. `close()` schreibt den
+    Index und hängt den Writer von der Engine ab.
+    """
+    def __init__(self, path, engine, tick_ms=0):
+        self.engine = engine
+        self.file = open(path, "wb", buffering=0)
+        self.buffer = bytearray(BUFFER_SIZE)
+        self.pos = 0
+        self.flushed = 0         # bereits in die Datei geschriebene Bytes
+        self.last_tick = engine.tick
+        self.keyframes = []
+        self.closed = False
+
+        flags = FLAG_SPARSE if engine.sparse else 0
+        self.file.write(HEADER.pack(MAGIC, VERSION, engine.num_players, flags, tick_ms,
+                                    engine.rows, engine.cols, engine.seed & (2 ** 64 - 1)))
+        self.flushed = HEADER.size
+        self.keyframe()
+        engine.input_log = self
+
+    def flush(self):
+        """Schreibt den Puffer in die Datei."""
+        if self.pos:
+            self.file.write(memoryview(self.buffer)[:self.pos])
+            self.flushed += self.pos
+            self.pos = 0
+
+    def record(self, tick, player, direction):
+        """Merkt sich einen Richtungswechsel vor dem Takt `tick + 1`."""
+        if self.pos > BUFFER_SIZE - 16:
+            self.flush()
+        buffer = self.buffer
+        pos = self.pos
+        buffer[pos] = INPUT
+        pos += 1
+        delta = tick - self.last_tick
+        while delta >= 0x80:
+            buffer[pos] = delta & 0x7F | 0x80
+            delta >>= 7
+            pos += 1
+        buffer[pos] = delta
+        buffer[pos + 1] = player << 2 | DIRECTION_CODES[direction]
+        self.pos = pos + 2
+        self.last_tick = tick
+
+    def on_tick(self, engine):
+        """Wird nach jedem Takt aufgerufen: Keyframes und Spielende."""
+        if engine.game_over:
+            self.close()
+        elif engine.tick % KEYFRAME_INTERVAL == 0:
+            self.keyframe()
+
+    def keyframe(self):
+        """Schreibt den aktuellen Zustand der Engine als Keyframe."""
+        self.flush()
+        tick = self.engine.tick
+        state = self.engine.snapshot()
+        self.keyframes.append((tick, self.flushed))
+        self.file.write(bytes([KEYFRAME]) + U32.pack(tick) + U32.pack(len(state)))
+        self.file.write(state)
+        self.flushed += 1 + 2 * U32.size + len(state)
+        self.last_tick = tick
+
+    def close(self):
+        """Schreibt Endstand, Index und Trailer und schließt die Datei."""
+        if self.closed:
+            return
+        self.closed = True
+        engine = self.engine
+        if engine.input_log is self:
+            engine.input_log = None
+        self.flush()
+
+        cause = DEATH_CAUSES.index(engine.death_cause) if engine.game_over else 0
+        end = bytearray([END_OF_GAME])
+        end += END_RECORD.pack(engine.tick, cause, engine.loser or 0)
+        for snake in engine.snakes:
+            end += U32.pack(snake.score)
+        self.file.write(end)
+        index_pos = self.flushed + len(end)
+
+        for tick, offset in self.keyframes:
+            self.file.write(INDEX_ENTRY.pack(tick, offset))
+        self.file.write(TRAILER.pack(index_pos, len(self.keyframes), INDEX_MAGIC))
+        self.file.close()
+
+
+class Replay:
+    """
+    Liest eine Replay-Datei (per mmap) und spielt sie in einer Engine ab.
+
+    `run()` spielt ohne Fenster mit maximaler Geschwindigkeit, `seek(tick)`
+    liefert eine Engine im Zustand nach `tick` Takten und `cursor()` einen
+    `ReplayCursor`, mit dem die Tk-Oberfläche in Echtzeit abspielen kann.
+    """
+    def __init__(self, path):
+        self.file = open(path, "rb")
+        try:
+            self.data = mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            self.file.close()
+            raise ReplayError(f"{path}: leere Datei")
+        data = self.data
+        if len(data) < HEADER.size or data[:4] != MAGIC:
+            self.close()
+            raise ReplayError(f"{path}: keine Replay-Datei")
+        (_magic, version, self.players, flags, self.tick_ms,
+         self.rows, self.cols, self.seed) = HEADER.unpack_from(data)
+        if version != VERSION:
+            self.close()
+            raise ReplayError(f"{path}: unbekannte Version {version}")
+        self.sparse = bool(flags & FLAG_SPARSE)
+
+        # Index lesen; fehlt er, die Records einmal durchgehen
+        self.end = None
+        index_pos, count, magic = (None, 0, None)
+        if len(data) >= HEADER.size + TRAILER.size:
+            index_pos, count, magic = TRAILER.unpack_from(data, len(data) - TRAILER.size)
+        if magic == INDEX_MAGIC:
+            self.records_end = index_pos
+            self.keyframes = [INDEX_ENTRY.unpack_from(data, index_pos + i * INDEX_ENTRY.size)
+                              for i in range(count)]
+        else:
+            self.records_end = len(data)
+            self.keyframes = []
+            for tag, tick, _value, offset in self.records():
+                if tag == KEYFRAME:
+                    self.keyframes.append((tick, offset))
+        if not self.keyframes:
+            self.close()
+            raise ReplayError(f"{path}: kein Keyframe")
+        self.last_tick = self.keyframes[-1][0]
+        for tag, tick, value, _offset in self.records(self.keyframes[-1][1]):
+            self.last_tick = tick
+            if tag == END_OF_GAME:
+                self.end = value
+
+    def close(self):
+        self.data.close()
+        self.file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    @property
+    def mode(self):
+        return "Multiplayer" if self.players == 2 else "Singleplayer"
+
+    def records(self, offset=HEADER.size):
+        """
+        Liefert ab `offset` alle Records als (tag, tick, value, offset).
+        value ist (player, Direction) für INPUT, die Position des gespeicherten
+        Zustands für KEYFRAME und (Ursache, Verlierer, Punkte) für END.
+        """
+        data = self.data
+        end = self.records_end
+        tick = 0
+        while offset < end:
+            start = offset
+            tag = data[offset]
+            offset += 1
+            if tag == INPUT:
+                if offset + 2 > end:
+                    return
+                delta = shift = 0
+                while True:
+                    byte = data[offset]
+                    offset += 1
+                    delta |= (byte & 0x7F) << shift
+                    shift += 7
+                    if byte < 0x80:
+                        break
+                    if offset + 1 >= end:
+                        return
+                code = data[offset]
+                offset += 1
+                tick += delta
+                yield INPUT, tick, (code >> 2, DIRECTIONS[code & 3]), start
+            elif tag == KEYFRAME:
+                if offset + 2 * U32.size > end:
+                    return
+                tick, length = struct.unpack_from("<II", data, offset)
+                offset += 2 * U32.size
+                if offset + length > end:
+                    return
+                yield KEYFRAME, tick, (offset, length), start
+                offset += length
+            elif tag == END_OF_GAME:
+                if offset + END_RECORD.size + self.players * U32.size > end:
+                    return
+                tick, cause, loser = END_RECORD.unpack_from(data, offset)
+                offset += END_RECORD.size
+                scores = struct.unpack_from(f"<{self.players}I", data, offset)
+                offset += self.players * U32.size
+                yield END_OF_GAME, tick, (DEATH_CAUSES[cause], loser or None, scores), start
+            else:
+                raise ReplayError(f"unbekannter Record-Typ {tag} an Position {start}")
+
+    def load_state(self, position):
+        """Zustand eines Keyframes (Bytes für `SnakeEngine.restore`)."""
+        offset, length = position
+        return self.data[offset:offset + length]
+
+    def cursor(self, tick=0):
+        """`ReplayCursor`, der beim letzten Keyframe vor `tick` beginnt."""
+        keyframe_tick, offset = self.keyframes[0]
+        for entry in self.keyframes:
+            if entry[0] > tick:
+                break
+            keyframe_tick, offset = entry
+        records = self.records(offset)
+        _tag, _tick, position, _offset = next(records)
+        engine = SnakeEngine(self.mode, self.rows, self.cols, seed=self.seed, sparse=self.sparse)
+        engine.restore(self.load_state(position))
+        return ReplayCursor(engine, records, self.last_tick)
+
+    def seek(self, tick):
+        """Engine im Zustand nach `tick` Takten (bzw. am Spielende)."""
+        cursor = self.cursor(tick)
+        while cursor.engine.tick < tick and not cursor.finished:
+            cursor.step()
+        return cursor.engine
+
+    def run(self):
+        """Spielt das ganze Replay mit maximaler Geschwindigkeit ab."""
+        return self.seek(self.last_tick)
+
+    def verify(self):
+        """
+        Spielt das Replay ab und vergleicht jeden Keyframe und den Endstand
+        mit der Aufzeichnung. Gibt eine Liste der Abweichungen zurück
+        (leer = Spiel ist reproduzierbar).
+        """
+        errors = []
+        cursor = self.cursor(0)
+        engine = cursor.engine
+        for tag, tick, value, _offset in self.records(self.keyframes[0][1]):
+            while engine.tick < tick and not engine.game_over:
+                cursor.step()
+            if tag == KEYFRAME and engine.snapshot() != self.load_state(value):
+                errors.append(f"Takt {tick}: Zustand weicht vom Keyframe ab")
+            elif tag == END_OF_GAME:
+                cause, loser, scores = value
+                if engine.tick != tick:
+                    errors.append(f"Spielende bei Takt {engine.tick}, aufgezeichnet {tick}")
+                if engine.game_over and (engine.death_cause, engine.loser) != (cause, loser):
+                    errors.append(f"Ursache {engine.death_cause!r}, aufgezeichnet {cause!r}")
+                actual = tuple(snake.score for snake in engine.snakes)
+                if actual != scores:
+                    errors.append(f"Punkte {actual}, aufgezeichnet {scores}")
+        return errors
+
+
+class ReplayCursor:
+    """
+    Spielt ein Replay Takt für Takt ab: `step()` wendet die Eingaben vor dem
+    nächsten Takt an und berechnet ihn wie `SnakeEngine.step`.
+    """
+    def __init__(self, engine, records, last_tick):
+        self.engine = engine
+        self.records = records
+        self.last_tick = last_tick
+        self.pending = next(records, None)
+
+    @property
+    def finished(self):
+        return self.engine.game_over or self.engine.tick >= self.last_tick
+
+    def step(self):
+        engine = self.engine
+        record = self.pending
+        while record is not None and record[1] <= engine.tick:
+            if record[0] == INPUT:
+                player, direction = record[2]
+                engine.set_direction(player, direction)
+            record = next(self.records, None)
+        self.pending = record
+        return engine.step()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Snake-Replays abspielen.")
+    parser.add_argument("path", help="Replay-Datei")
+    parser.add_argument("--verify", action="store_true", help="Keyframes und Endstand nachprüfen")
+    parser.add_argument("--seek", type=int, metavar="TICK", help="nur bis zu diesem Takt abspielen")
+    parser.add_argument("--window", action="store_true", help="in Echtzeit im Spielfenster abspielen")
+    args = parser.parse_args(argv)
+
+    if args.window:
+        from Snake import SnakeGame
+        with Replay(args.path) as replay:
+            rows, cols = replay.rows, replay.cols
+        game = SnakeGame(rows=rows, cols=cols)
+        game.play_replay(args.path)
+        game.window.mainloop()
+        return 0
+
+    try:
+        replay = Replay(args.path)
+    except (OSError, ReplayError) as error:
+        print(error, file=sys.stderr)
+        return 2
+    with replay:
+        if args.verify:
+            errors = replay.verify()
+            for error in errors:
+                print(error)
+            print(f"{os.path.basename(args.path)}: {'OK' if not errors else 'FEHLER'}")
+            return 1 if errors else 0
+        engine = replay.seek(args.seek) if args.seek is not None else replay.run()
+        scores = ", ".join(str(snake.score) for snake in engine.snakes)
+        print(f"Takt {engine.tick}, Punkte {scores}, Ende: {engine.death_cause}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
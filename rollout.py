@@ -0,0 +1,337 @@
+"""
+Rollout-Puffer im Shared Memory für Self-Play mit mehreren Prozessen.
+
+Worker-Prozesse spielen mit der Engine und schreiben pro Takt Beobachtung
+(Spielfeld vor dem Zug), Aktionen, Belohnungen (Punkteänderung pro
+Spieler) und das Spielende direkt in vorab angelegte Ringpuffer in einem
+`multiprocessing.shared_memory`-Block. Der Lernprozess liest dieselben
+Bytes als NumPy-Views: es wird nichts gepickelt, kopiert oder pro
+Beobachtung neu angelegt. Zwischen den Prozessen wandern nur der Name des
+Blocks und seine Abmessungen.
+
+Jeder Worker hat seinen eigenen Ring und einen eigenen Schreibzähler, der
+Lernprozess einen Lesezähler pro Ring; jeder Zähler hat genau einen
+Schreiber, daher ohne Lock. Ein Worker wartet, wenn sein Ring voll ist
+(der Lernprozess gibt gelesene Einträge mit `release` frei).
+
+Benötigt NumPy (`pip install numpy`).
+
+    python rollout.py --workers 4 --steps 50000
+"""
+import argparse
+import multiprocessing
+import random
+import sys
+import time
+from multiprocessing import shared_memory
+
+import numpy as np
+
+from autopilot import Autopilot
+from batch import (NOOP, UP, DOWN, LEFT, RIGHT, EMPTY_CELL, BODY_CELL, HEAD_CELL,
+                   OBSTACLE_CELL, RED_CELL, GOLD_CELL)
+from engine import SnakeEngine, Direction, DIRECTIONS, ItemType, ROWS, COLS
+from tournament import BOT_BUDGET_NODES, MAX_TICKS
+
+# Weitere Zellcodes (die ersten sechs wie in `batch.observe()`)
+POISON_CELL, SPEED_BOOST_CELL, SLOWDOWN_CELL, BODY2_CELL, HEAD2_CELL = range(6, 11)
+
+ITEM_CELLS = {
+    ItemType.RED_FOOD: RED_CELL,
+    ItemType.GOLD_FOOD: GOLD_CELL,
+    ItemType.POISON: POISON_CELL,
+    ItemType.SPEED_BOOST: SPEED_BOOST_CELL,
+    ItemType.SLOWDOWN: SLOWDOWN_CELL,
+}
+SNAKE_CELLS = ((BODY_CELL, HEAD_CELL), (BODY2_CELL, HEAD2_CELL))
+
+# Aktionscodes wie in `batch.py` (None = Richtung beibehalten)
+ACTION_CODES = {None: NOOP, Direction.UP: UP, Direction.DOWN: DOWN,
+                Direction.LEFT: LEFT, Direction.RIGHT: RIGHT}
+
+# Einträge pro Worker-Ring
+CAPACITY = 4096
+
+# So oft (s) schaut ein Worker nach, ob in seinem vollen Ring Platz ist
+FULL_POLL = 0.001
+
+# Anteil zufälliger Züge der Bots (Exploration)
+EPSILON = 0.05
+
+# Abstand der Seeds zwischen den Workern
+SEED_STRIDE = 1_000_000
+
+# Die Arrays im Block beginnen auf Vielfachen davon (Bytes)
+ALIGN = 64
+
+
+class RolloutBuffer:
+    """
+    Ringpuffer für `workers` Worker mit je `capacity` Einträgen.
+
+    Arrays (alles Views in den Shared-Memory-Block):
+
+        obs      int8  (workers, capacity, rows, cols)  Zellcodes vor dem Zug
+        actions  int8  (workers, capacity, players)     NOOP/UP/DOWN/LEFT/RIGHT
+        rewards  int32 (workers, capacity, players)     Punkteänderung im Takt
+        dones    bool  (workers, capacity)              Spiel nach dem Zug vorbei
+        written  int64 (workers,)                       geschriebene Einträge
+        consumed int64 (workers,)                       freigegebene Einträge
+
+    Ohne `name` wird ein neuer Block angelegt (und von `close()` gelöscht),
+    mit `name` ein bestehender geöffnet (`attach(spec)` in den Workern).
+    """
+    def __init__(self, workers, capacity=CAPACITY, rows=ROWS, cols=COLS, players=1, name=None):
+        self.workers = workers
+        self.capacity = capacity
+        self.rows = rows
+        self.cols = cols
+        self.players = players
+        self.owner = name is None
+
+        layout = self.layout()
+        size = sum(-(-np.dtype(dtype).itemsize * int(np.prod(shape)) // ALIGN) * ALIGN
+                   for _field, dtype, shape in layout)
+        self.shm = shared_memory.SharedMemory(name=name, create=self.owner, size=size)
+        offset = 0
+        for field, dtype, shape in layout:
+            array = np.ndarray(shape, dtype=dtype, buffer=self.shm.buf, offset=offset)
+            setattr(self, field, array)
+            offset += -(-array.nbytes // ALIGN) * ALIGN
+        if self.owner:
+            self.written[:] = 0
+            self.consumed[:] = 0
+
+    def layout(self):
+        w, c = self.workers, self.capacity
+        return (
+            ("obs", np.int8, (w, c, self.rows, self.cols)),
+            ("actions", np.int8, (w, c, self.players)),
+            ("rewards", np.int32, (w, c, self.players)),
+            ("dones", np.bool_, (w, c)),
+            ("written", np.int64, (w,)),
+            ("consumed", np.int64, (w,)),
+        )
+
+    @property
+    def spec(self):
+        """Alles, was ein anderer Prozess zum Öffnen braucht (klein, picklebar)."""
+        return (self.workers, self.capacity, self.rows, self.cols, self.players, self.shm.name)
+
+    @classmethod
+    def attach(cls, spec):
+        """Öffnet einen bestehenden Puffer anhand von `spec`."""
+        workers, capacity, rows, cols, players, name = spec
+        return cls(workers, capacity, rows, cols, players, name=name)
+
+    # -------------------------------------------------------------------------
+    # SCHREIBEN (Worker)
+    # -------------------------------------------------------------------------
+    def reserve(self, worker):
+        """Wartet auf einen freien Platz im Ring und liefert dessen Index."""
+        written = int(self.written[worker])
+        while written - int(self.consumed[worker]) >= self.capacity:
+            time.sleep(FULL_POLL)
+        return written % self.capacity
+
+    def commit(self, worker):
+        """Macht den zuletzt reservierten Eintrag für den Lernprozess sichtbar."""
+        self.written[worker] += 1
+
+    # -------------------------------------------------------------------------
+    # LESEN (Lernprozess)
+    # -------------------------------------------------------------------------
+    def pending(self, worker):
+        """Anzahl geschriebener, noch nicht freigegebener Einträge."""
+        return int(self.written[worker]) - int(self.consumed[worker])
+
+    def read(self, worker, limit=None):
+        """
+        Liefert die ältesten ungelesenen Einträge eines Workers als Views
+        (obs, actions, rewards, dones), höchstens bis zum Ende des Rings;
+        None, wenn nichts wartet. Die Views bleiben gültig, bis die Einträge
+        mit `release` freigegeben sind, danach überschreibt sie der Worker.
+        """
+        start = int(self.consumed[worker])
+        count = int(self.written[worker]) - start
+        if count <= 0:
+            return None
+        begin = start % self.capacity
+        count = min(count, self.capacity - begin)
+        if limit is not None:
+            count = min(count, limit)
+        end = begin + count
+        return (self.obs[worker, begin:end], self.actions[worker, begin:end],
+                self.rewards[worker, begin:end], self.dones[worker, begin:end])
+
+    def release(self, worker, count):
+        """Gibt `count` gelesene Einträge zum Überschreiben frei."""
+        self.consumed[worker] += count
+
+    def close(self):
+        """Löst die Views; der anlegende Prozess löscht den Block auch."""
+        for field, _dtype, _shape in self.layout():
+            setattr(self, field, None)
+        self.shm.close()
+        if self.owner:
+            self.shm.unlink()
+
+
+class ObservationEncoder:
+    """
+    Schreibt das Spielfeld einer Engine als Zellcodes in ein int8-Array.
+    Die Hindernis-Indizes werden nur neu erzeugt, wenn sich die Hindernisse
+    ändern (neues Set nach `reset()` oder neue Anzahl).
+    """
+    def __init__(self):
+        self.obstacles = None
+        self.obstacle_count = 0
+        self.obstacle_cells = np.empty(0, dtype=np.int64)
+
+    def encode(self, engine, out):
+        """Füllt `out` (flach, rows * cols Einträge) mit dem aktuellen Spielfeld."""
+        obstacles = engine.obstacles
+        if obstacles is not self.obstacles or len(obstacles) != self.obstacle_count:
+            self.obstacles = obstacles
+            self.obstacle_count = len(obstacles)
+            self.obstacle_cells = np.fromiter(obstacles, dtype=np.int64, count=len(obstacles))
+        out[:] = EMPTY_CELL
+        out[self.obstacle_cells] = OBSTACLE_CELL
+        for cell, item_type in engine.items.items():
+            out[cell] = ITEM_CELLS[item_type]
+        for snake, (body_code, head_code) in zip(engine.snakes, SNAKE_CELLS):
+            body = snake.body
+            out[np.fromiter(body, dtype=np.int64, count=len(body))] = body_code
+            out[body[0]] = head_code
+        return out
+
+
+# -----------------------------------------------------------------------------
+# WORKER
+# -----------------------------------------------------------------------------
+def run_worker(spec, worker, seed, steps, mode="Singleplayer", epsilon=EPSILON,
+               max_ticks=MAX_TICKS):
+    """
+    Spielt Bot-Partien und schreibt `steps` Takte in den Ring `worker`.
+    Nach jedem Spielende geht es mit dem nächsten Seed weiter.
+    """
+    buffer = RolloutBuffer.attach(spec)
+    try:
+        fill(buffer, worker, seed, steps, mode, epsilon, max_ticks)
+    finally:
+        buffer.close()
+
+
+def fill(buffer, worker, seed, steps, mode="Singleplayer", epsilon=EPSILON, max_ticks=MAX_TICKS):
+    """Schreibt `steps` Takte in den Ring `worker` (im eigenen Prozess, siehe `run_worker`)."""
+    rng = random.Random(seed)
+    engine = SnakeEngine(mode, rows=buffer.rows, cols=buffer.cols, seed=seed)
+    engine.start()
+    bots = [Autopilot(engine, player, budget_nodes=BOT_BUDGET_NODES)
+            for player in range(1, engine.num_players + 1)]
+    encoder = ObservationEncoder()
+    obs = buffer.obs[worker].reshape(buffer.capacity, -1)
+    actions = buffer.actions[worker]
+    rewards = buffer.rewards[worker]
+    dones = buffer.dones[worker]
+    game_seed = seed
+    for _ in range(steps):
+        moves = []
+        for bot in bots:
+            direction = bot.decide()
+            if rng.random() < epsilon:
+                direction = rng.choice(DIRECTIONS)
+            moves.append(direction)
+        scores = [snake.score for snake in engine.snakes]
+
+        slot = buffer.reserve(worker)
+        encoder.encode(engine, obs[slot])
+        engine.step(moves)
+        done = engine.game_over or engine.tick >= max_ticks
+        for player, snake in enumerate(engine.snakes):
+            actions[slot, player] = ACTION_CODES[moves[player]]
+            rewards[slot, player] = snake.score - scores[player]
+        dones[slot] = done
+        buffer.commit(worker)
+
+        if done:
+            game_seed += 1
+            engine.reset(game_seed)
+            engine.start()
+
+
+def collect(workers, steps, mode="Singleplayer", capacity=CAPACITY, seed=0,
+            epsilon=EPSILON, on_batch=None):
+    """
+    Startet `workers` Prozesse mit je `steps` Takten und liest ihre Ringe
+    aus, bis alle fertig sind. `on_batch(worker, obs, actions, rewards,
+    dones)` bekommt die Views jedes gelesenen Abschnitts (nur während des
+    Aufrufs gültig). Gibt die Anzahl gelesener Einträge zurück.
+    """
+    players = 2 if mode == "Multiplayer" else 1
+    buffer = RolloutBuffer(workers, capacity, players=players)
+    processes = [multiprocessing.Process(
+                     target=run_worker,
+                     args=(buffer.spec, worker, seed + worker * SEED_STRIDE, steps, mode, epsilon),
+                     daemon=True)
+                 for worker in range(workers)]
+    try:
+        for process in processes:
+            process.start()
+        total = 0
+        while True:
+            running = any(process.is_alive() for process in processes)
+            idle = True
+            for worker in range(workers):
+                batch = buffer.read(worker)
+                if batch is None:
+                    continue
+                idle = False
+                if on_batch is not None:
+                    on_batch(worker, *batch)
+                count = len(batch[3])
+                del batch
+                buffer.release(worker, count)
+                total += count
+            if idle:
+                if not running:
+                    break
+                time.sleep(FULL_POLL)
+        for process in processes:
+            process.join()
+        return total
+    finally:
+        for process in processes:
+            if process.is_alive():
+                process.terminate()
+        buffer.close()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Self-Play-Rollouts über Shared Memory sammeln.")
+    parser.add_argument("--workers", type=int, default=multiprocessing.cpu_count())
+    parser.add_argument("--steps", type=int, default=20_000, help="Takte pro Worker")
+    parser.add_argument("--players", type=int, choices=(1, 2), default=1)
+    parser.add_argument("--capacity", type=int, default=CAPACITY, help="Einträge pro Worker-Ring")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--epsilon", type=float, default=EPSILON)
+    args = parser.parse_args(argv)
+
+    stats = {"reward": 0, "episodes": 0}
+
+    def on_batch(worker, obs, actions, rewards, dones):
+        stats["reward"] += int(rewards.sum())
+        stats["episodes"] += int(dones.sum())
+
+    mode = "Multiplayer" if args.players == 2 else "Singleplayer"
+    start = time.perf_counter()
+    total = collect(args.workers, args.steps, mode, args.capacity, args.seed, args.epsilon, on_batch)
+    seconds = time.perf_counter() - start
+    print(f"{total} Takte von {args.workers} Workern in {seconds:.2f} s "
+          f"({total / seconds:,.0f}/s), {stats['episodes']} Spiele, "
+          f"Belohnung gesamt {stats['reward']}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
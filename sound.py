@@ -0,0 +1,303 @@
+"""
+Soundeffekte, gemischt in einem eigenen Thread.
+
+`SoundEngine.play(name)` legt nur den Namen in eine begrenzte
+Warteschlange und kehrt nach wenigen Mikrosekunden zurück (ist sie voll,
+wird der Sound verworfen). Ein Mixer-Thread mischt die laufenden Sounds
+in kurze Blöcke und gibt sie an ein Backend weiter:
+
+    PipeBackend      rohes PCM an einen Player (pacat/aplay unter Linux)
+    WaveFileBackend  in eine WAV-Datei (zum Testen ohne Soundkarte)
+    NullBackend      verwirft alles (Standard, wenn kein Player gefunden wird)
+
+Die Samples werden beim Start einmal dekodiert (WAV-Dateien aus
+`sample_dir`, sonst erzeugte Töne) und liegen fertig skaliert im Cache.
+
+    python sound.py --out sounds.wav   # alle Sounds nacheinander in eine Datei
+"""
+import argparse
+import math
+import os
+import shutil
+import subprocess
+import sys
+import threading
+import time
+import wave
+from array import array
+from collections import deque
+from itertools import zip_longest
+
+SAMPLE_RATE = 22050
+
+# Frames pro Mix-Block (bei 22050 Hz etwa 23 ms)
+BLOCK_FRAMES = 512
+
+# So viele Sounds warten höchstens; weitere werden verworfen
+QUEUE_SIZE = 32
+
+# So oft (s) schaut der Mixer im Leerlauf nach neuen Sounds
+IDLE_POLL = 0.005
+
+# So viele Sounds klingen höchstens gleichzeitig (der älteste weicht)
+MAX_VOICES = 8
+
+# Dateien in `sample_dir` und erzeugte Ersatztöne (Frequenz in Hz, Dauer in ms)
+SAMPLE_FILES = {
+    "item_eaten": "item_eaten.wav",
+    "wall_collision": "wall_collision.wav",
+    "obstacle_collision": "obstacle_collision.wav",
+    "game_over": "game_over.wav",
+}
+DEFAULT_TONES = {
+    "item_eaten": (1000, 100),
+    "wall_collision": (200, 250),
+    "obstacle_collision": (250, 250),
+    "game_over": (300, 300),
+}
+
+# Ein- und Ausblenden der erzeugten Töne (ms), verhindert Knacksen
+FADE_MS = 5
+
+
+def pcm_bytes(samples):
+    """16-Bit-Samples als little-endian Bytes (wie in WAV-Dateien)."""
+    if sys.byteorder == "big":
+        samples = array("h", samples)
+        samples.byteswap()
+    return samples.tobytes()
+
+
+def tone(frequency, duration_ms, rate=SAMPLE_RATE):
+    """Sinuston mit kurzem Ein- und Ausblenden als Samples (-1.0 .. 1.0)."""
+    frames = rate * duration_ms // 1000
+    fade = max(1, rate * FADE_MS // 1000)
+    step = 2 * math.pi * frequency / rate
+    return [math.sin(i * step) * min(1.0, i / fade, (frames - i) / fade) for i in range(frames)]
+
+
+def read_wave(path, rate=SAMPLE_RATE):
+    """
+    Dekodiert eine WAV-Datei (8/16 Bit, mono/stereo) zu Samples (-1.0 .. 1.0)
+    mit der Abtastrate `rate` (einfaches Umrechnen per nächstem Sample).
+    """
+    with wave.open(path, "rb") as file:
+        channels = file.getnchannels()
+        width = file.getsampwidth()
+        source_rate = file.getframerate()
+        raw = file.readframes(file.getnframes())
+    if width == 1:
+        values = [(byte - 128) / 128 for byte in raw]
+    elif width == 2:
+        data = array("h", raw)
+        if sys.byteorder == "big":
+            data.byteswap()
+        values = [value / 32768 for value in data]
+    else:
+        raise ValueError(f"{path}: nur 8- und 16-Bit-WAV-Dateien werden unterstützt")
+    if channels > 1:
+        values = [sum(values[i:i + channels]) / channels for i in range(0, len(values), channels)]
+    if source_rate != rate:
+        count = len(values) * rate // source_rate
+        values = [values[i * source_rate // rate] for i in range(count)]
+    return values
+
+
+class SampleCache:
+    """
+    Alle Sounds einmal dekodiert, mit der Lautstärke skaliert und als
+    16-Bit-Array abgelegt; beim Abspielen wird nichts mehr berechnet.
+    """
+    def __init__(self, rate=SAMPLE_RATE, volume=0.5, sample_dir=None):
+        self.rate = rate
+        self.samples = {}
+        for name, (frequency, duration_ms) in DEFAULT_TONES.items():
+            values = None
+            if sample_dir:
+                path = os.path.join(sample_dir, SAMPLE_FILES[name])
+                if os.path.exists(path):
+                    values = read_wave(path, rate)
+            if values is None:
+                values = tone(frequency, duration_ms, rate)
+            self.samples[name] = array("h", (int(32767 * max(-1.0, min(1.0, value * volume)))
+                                             for value in values))
+
+    def get(self, name):
+        return self.samples.get(name)
+
+
+class NullBackend:
+    """Verwirft alle Blöcke; zählt nur die Frames (Headless-Betrieb, Tests)."""
+    blocking = False
+
+    def __init__(self, rate=SAMPLE_RATE):
+        self.rate = rate
+        self.frames = 0
+
+    def write(self, samples):
+        self.frames += len(samples)
+
+    def close(self):
+        pass
+
+
+class WaveFileBackend:
+    """Schreibt alle gemischten Blöcke in eine WAV-Datei (mono, 16 Bit)."""
+    blocking = False
+
+    def __init__(self, path, rate=SAMPLE_RATE):
+        self.file = wave.open(path, "wb")
+        self.file.setnchannels(1)
+        self.file.setsampwidth(2)
+        self.file.setframerate(rate)
+        self.frames = 0
+
+    def write(self, samples):
+        self.file.writeframes(pcm_bytes(samples))
+        self.frames += len(samples)
+
+    def close(self):
+        self.file.close()
+
+
+class PipeBackend:
+    """
+    Schickt rohes PCM an einen Player-Prozess. Der Player liest im Takt der
+    Soundkarte, `write` blockiert also den Mixer-Thread und gibt das Tempo vor.
+    """
+    blocking = True
+
+    def __init__(self, command):
+        self.process = subprocess.Popen(command, stdin=subprocess.PIPE,
+                                        stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+
+    def write(self, samples):
+        try:
+            self.process.stdin.write(pcm_bytes(samples))
+            self.process.stdin.flush()
+        except (BrokenPipeError, OSError):
+            pass
+
+    def close(self):
+        try:
+            self.process.stdin.close()
+        except OSError:
+            pass
+        self.process.wait()
+
+
+def default_backend(rate=SAMPLE_RATE):
+    """PipeBackend mit pacat oder aplay, falls vorhanden, sonst NullBackend."""
+    if shutil.which("pacat"):
+        return PipeBackend(["pacat", "--format=s16le", f"--rate={rate}", "--channels=1",
+                            "--latency-msec=50"])
+    if shutil.which("aplay"):
+        return PipeBackend(["aplay", "-q", "-t", "raw", "-f", "S16_LE", "-r", str(rate), "-c", "1"])
+    return NullBackend(rate)
+
+
+class SoundEngine:
+    """
+    Nimmt Sound-Ereignisse entgegen und mischt sie im Hintergrund.
+
+    `play(name)` hängt den Namen nur an eine deque (atomar, ohne Lock und
+    ohne den Mixer zu wecken); der Mixer schaut alle IDLE_POLL Sekunden
+    nach. `close()` spielt Ausstehendes zu Ende und beendet den Thread.
+    `dropped` zählt wegen voller Warteschlange verworfene Sounds.
+    """
+    def __init__(self, backend=None, sample_dir=None, rate=SAMPLE_RATE, volume=0.5,
+                 queue_size=QUEUE_SIZE):
+        self.cache = SampleCache(rate, volume, sample_dir)
+        self.backend = backend if backend is not None else default_backend(rate)
+        self.rate = rate
+        self.queue_size = queue_size
+        self.pending = deque()
+        self.dropped = 0
+        self.voices = []     # [samples, Position]
+        self.stopping = False
+        self.thread = threading.Thread(target=self._mixer, name="sound", daemon=True)
+        self.thread.start()
+
+    def play(self, name):
+        """Spielt einen Sound ab (kehrt sofort zurück)."""
+        if len(self.pending) < self.queue_size:
+            self.pending.append(name)
+        else:
+            self.dropped += 1
+
+    def _start(self, name):
+        samples = self.cache.get(name)
+        if samples is not None:
+            if len(self.voices) >= MAX_VOICES:
+                self.voices.pop(0)
+            self.voices.append([samples, 0])
+
+    def mix(self, frames=BLOCK_FRAMES):
+        """Mischt die nächsten `frames` Frames aller laufenden Sounds."""
+        parts = []
+        for voice in self.voices:
+            samples, position = voice
+            parts.append(samples[position:position + frames])
+            voice[1] = position + frames
+        self.voices = [voice for voice in self.voices if voice[1] < len(voice[0])]
+        if len(parts) == 1:
+            block = parts[0]
+        else:
+            mixed = list(map(sum, zip_longest(*parts, fillvalue=0)))
+            if mixed and (max(mixed) > 32767 or min(mixed) < -32768):
+                mixed = [max(-32768, min(32767, value)) for value in mixed]
+            block = array("h", mixed)
+        if len(block) < frames:
+            block = block + array("h", bytes(2 * (frames - len(block))))
+        return block
+
+    def _mixer(self):
+        """Hintergrund-Thread: wartet auf Sounds und mischt, solange welche klingen."""
+        backend = self.backend
+        pending = self.pending
+        block_seconds = BLOCK_FRAMES / self.rate
+        deadline = 0.0
+        while True:
+            while pending:
+                self._start(pending.popleft())
+            if not self.voices:
+                if self.stopping:
+                    break
+                time.sleep(IDLE_POLL)
+                deadline = time.perf_counter()
+                continue
+            backend.write(self.mix())
+            if not backend.blocking:
+                # Ohne Soundkarte im Echtzeit-Tempo weitermischen
+                deadline += block_seconds
+                delay = deadline - time.perf_counter()
+                if delay > 0:
+                    time.sleep(delay)
+
+    def close(self):
+        """Spielt laufende Sounds zu Ende und beendet den Thread."""
+        self.stopping = True
+        self.thread.join()
+        self.backend.close()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Sounds testen.")
+    parser.add_argument("--out", help="in diese WAV-Datei schreiben statt abzuspielen")
+    parser.add_argument("--samples", help="Verzeichnis mit eigenen WAV-Dateien")
+    parser.add_argument("--volume", type=float, default=0.5)
+    args = parser.parse_args(argv)
+
+    backend = WaveFileBackend(args.out) if args.out else None
+    sound = SoundEngine(backend, args.samples, volume=args.volume)
+    for name in SAMPLE_FILES:
+        start = time.perf_counter_ns()
+        sound.play(name)
+        print(f"{name:<20} play() {(time.perf_counter_ns() - start) / 1000:.1f} µs")
+        time.sleep(0.4)
+    sound.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,317 @@
+"""
+Strukturierter Ereignis-Strom für die Offline-Auswertung.
+
+`Telemetry.emit(...)` hängt pro Ereignis nur ein Tupel (Zeit, Takt, Typ,
+Spieler, x, y, Punkte) an eine Liste; volle Listen gehen als Ganzes an
+einen Hintergrund-Thread, der sie kodiert und in die Datei schreibt. Im
+Spieltakt wird also weder formatiert noch geschrieben.
+
+Pro Ereignistyp lässt sich ausdünnen (`sample={"tick": 0.01}` behält jedes
+hundertste) und begrenzen (`rate_limits={"item_eaten": 50}` höchstens 50
+pro Sekunde); wie viele Ereignisse dabei wegfallen, steht beim Schließen
+in Records "dropped:<Typ>" (Anzahl im Feld score).
+
+Formate (nach Dateiendung):
+
+    .jsonl  eine JSON-Zeile pro Ereignis, Sitzungen beginnen mit {"event": "session", ...}
+    .snkt   binär: pro Sitzung magic "SNKT", Version, Länge + JSON der Metadaten;
+            dann Records: DEFINE (Code u16, Länge u16, Name) oder EVENT (Code u16,
+            Zeit f64, Takt u32, Spieler u8, x i32, y i32, Punkte u32)
+
+    python telemetry.py telemetry.snkt            # als JSON Lines ausgeben
+    python telemetry.py telemetry.jsonl --summary # Anzahl pro Ereignistyp
+"""
+import argparse
+import json
+import logging
+import queue
+import struct
+import sys
+import threading
+import time
+
+DEFAULT_PATH = "telemetry.jsonl"
+
+# So viele Ereignisse sammelt `emit`, bevor der Schreib-Thread sie bekommt
+BATCH_SIZE = 512
+
+# So viele volle Listen warten höchstens; weitere werden verworfen
+MAX_PENDING_BATCHES = 64
+
+MAGIC = b"SNKT"
+VERSION = 2
+SESSION_HEADER = struct.Struct("<4sBI")
+EVENT_RECORD = struct.Struct("<BHdIBiiI")
+DEFINE_RECORD = struct.Struct("<BHH")
+
+# Höchstzahl verschiedener Ereignistypen pro Sitzung (Code u16)
+MAX_EVENT_TYPES = 0x10000
+
+# Record-Typen im Binärformat
+DEFINE, EVENT = 1, 2
+
+# Markiert das Ende der Queue
+_STOP = object()
+
+
+class _Policy:
+    """Ausdünnen (jedes n-te behalten) und Begrenzen (Token-Bucket) für einen Ereignistyp."""
+    __slots__ = ("every", "count", "rate", "tokens", "last", "dropped")
+
+    def __init__(self, sample=1.0, rate=None):
+        self.every = max(1, round(1 / sample)) if sample > 0 else 0
+        self.count = 0
+        self.rate = rate
+        self.tokens = rate
+        self.last = time.monotonic()
+        self.dropped = 0
+
+    def allow(self):
+        if not self.every:
+            self.dropped += 1
+            return False
+        self.count += 1
+        if self.count < self.every:
+            self.dropped += 1
+            return False
+        self.count = 0
+        if self.rate is not None:
+            now = time.monotonic()
+            self.tokens = min(self.rate, self.tokens + (now - self.last) * self.rate)
+            self.last = now
+            if self.tokens < 1:
+                self.dropped += 1
+                return False
+            self.tokens -= 1
+        return True
+
+
+class JsonLinesEncoder:
+    """Kodiert Sitzungen und Ereignisse als JSON Lines."""
+    binary = False
+
+    def session(self, meta):
+        return json.dumps({"event": "session", **meta}) + "\n"
+
+    def events(self, batch):
+        return "".join(
+            f'{{"time":{timestamp:.6f},"tick":{tick},"event":{json.dumps(event)},'
+            f'"player":{player},"x":{x},"y":{y},"score":{score}}}\n'
+            for timestamp, tick, event, player, x, y, score in batch
+        )
+
+
+class BinaryEncoder:
+    """Kodiert Sitzungen und Ereignisse im Binärformat (`.snkt`)."""
+    binary = True
+
+    def __init__(self):
+        self.codes = {}
+
+    def session(self, meta):
+        self.codes = {}
+        data = json.dumps(meta).encode("utf-8")
+        return SESSION_HEADER.pack(MAGIC, VERSION, len(data)) + data
+
+    def events(self, batch):
+        out = bytearray()
+        codes = self.codes
+        pack = EVENT_RECORD.pack
+        for timestamp, tick, event, player, x, y, score in batch:
+            code = codes.get(event)
+            if code is None:
+                if len(codes) >= MAX_EVENT_TYPES:
+                    raise ValueError(f"mehr als {MAX_EVENT_TYPES} Ereignistypen in einer Sitzung")
+                code = codes[event] = len(codes)
+                name = event.encode("utf-8")
+                out += DEFINE_RECORD.pack(DEFINE, code, len(name)) + name
+            out += pack(EVENT, code, timestamp, tick, player, x, y, score)
+        return bytes(out)
+
+
+class Telemetry:
+    """
+    Gepufferter Ereignis-Strom mit Schreib-Thread.
+
+    `emit(...)` kostet nur ein Tupel und ein append; `session(**meta)`
+    beginnt eine neue Sitzung (z.B. pro Spiel), `flush()` schickt die
+    angefangene Liste los und wartet, bis alles geschrieben ist, `close()`
+    beendet den Thread.
+    """
+    def __init__(self, path=DEFAULT_PATH, sample=None, rate_limits=None,
+                 batch_size=BATCH_SIZE):
+        self.path = path
+        self.encoder = BinaryEncoder() if path.endswith(".snkt") else JsonLinesEncoder()
+        self.batch_size = batch_size
+        self.batch = []
+        self.lost_batches = 0
+        sample = sample or {}
+        rate_limits = rate_limits or {}
+        self.policies = {event: _Policy(sample.get(event, 1.0), rate_limits.get(event))
+                         for event in set(sample) | set(rate_limits)}
+        self.queue = queue.Queue(MAX_PENDING_BATCHES)
+        if self.encoder.binary:
+            self.file = open(path, "ab")
+        else:
+            self.file = open(path, "a", encoding="utf-8")
+        self.thread = threading.Thread(target=self._writer, name="telemetry", daemon=True)
+        self.thread.start()
+
+    def emit(self, tick, event, player=0, x=-1, y=-1, score=0):
+        """Merkt ein Ereignis vor (blockiert nie)."""
+        policy = self.policies.get(event)
+        if policy is not None and not policy.allow():
+            return
+        batch = self.batch
+        batch.append((time.time(), tick, event, player or 0, x, y, score))
+        if len(batch) >= self.batch_size:
+            self._submit()
+
+    def emit_snake(self, tick, event, player, snake):
+        """Ereignis eines Spielers mit Kopfposition und Punkten seiner Schlange."""
+        if snake is None:
+            self.emit(tick, event)
+        else:
+            self.emit(tick, event, player, snake.x, snake.y, snake.score)
+
+    def session(self, **meta):
+        """Beginnt eine neue Sitzung; `meta` (Modus, Seed, ...) steht in deren Kopf."""
+        self._submit()
+        self._put(("session", meta))
+
+    def _submit(self):
+        if self.batch:
+            batch = self.batch
+            self.batch = []
+            self._put(("events", batch))
+
+    def _put(self, item):
+        try:
+            self.queue.put_nowait(item)
+        except queue.Full:
+            self.lost_batches += 1
+
+    def dropped(self):
+        """Durch Ausdünnen oder Begrenzen weggelassene Ereignisse pro Typ."""
+        return {event: policy.dropped for event, policy in self.policies.items()
+                if policy.dropped}
+
+    def _writer(self):
+        """Hintergrund-Thread: kodiert die Listen und schreibt sie."""
+        encoder = self.encoder
+        while True:
+            item = self.queue.get()
+            try:
+                if item is _STOP:
+                    return
+                kind, payload = item
+                data = encoder.session(payload) if kind == "session" else encoder.events(payload)
+                self.file.write(data)
+                self.file.flush()
+            except (OSError, ValueError, struct.error) as error:
+                logging.error(f"Telemetrie: Schreiben fehlgeschlagen ({error})")
+            finally:
+                self.queue.task_done()
+
+    def flush(self):
+        """Schreibt alle vorgemerkten Ereignisse."""
+        self._submit()
+        self.queue.join()
+
+    def close(self):
+        """Schreibt die Abschluss-Records und alles Ausstehende, beendet den Thread."""
+        if not self.thread.is_alive():
+            return
+        for event, count in self.dropped().items():
+            self.batch.append((time.time(), 0, f"dropped:{event}", 0, -1, -1, count))
+        if self.lost_batches:
+            self.batch.append((time.time(), 0, "dropped:batches", 0, -1, -1, self.lost_batches))
+        self._submit()
+        self.queue.put(_STOP)
+        self.thread.join()
+        self.file.close()
+
+
+class NullTelemetry:
+    """Schreibt nichts (Telemetrie ausgeschaltet); gleiche Methoden wie `Telemetry`."""
+    def emit(self, tick, event, player=0, x=-1, y=-1, score=0):
+        pass
+
+    def emit_snake(self, tick, event, player, snake):
+        pass
+
+    def session(self, **meta):
+        pass
+
+    def flush(self):
+        pass
+
+    def close(self):
+        pass
+
+
+# -----------------------------------------------------------------------------
+# LESEN
+# -----------------------------------------------------------------------------
+def read(path):
+    """Liefert alle Records einer Telemetrie-Datei (beide Formate) als Dicts."""
+    if not path.endswith(".snkt"):
+        with open(path, encoding="utf-8") as file:
+            for line in file:
+                if line.strip():
+                    yield json.loads(line)
+        return
+    with open(path, "rb") as file:
+        data = file.read()
+    offset = 0
+    names = {}
+    while offset < len(data):
+        if data[offset:offset + 4] == MAGIC:
+            _magic, version, length = SESSION_HEADER.unpack_from(data, offset)
+            if version != VERSION:
+                raise ValueError(f"{path}: unbekannte Version {version}")
+            offset += SESSION_HEADER.size
+            names = {}
+            yield {"event": "session", **json.loads(data[offset:offset + length])}
+            offset += length
+        elif data[offset] == DEFINE:
+            _tag, code, length = DEFINE_RECORD.unpack_from(data, offset)
+            offset += DEFINE_RECORD.size
+            names[code] = data[offset:offset + length].decode("utf-8")
+            offset += length
+        elif data[offset] == EVENT:
+            if offset + EVENT_RECORD.size > len(data):
+                return
+            _tag, code, timestamp, tick, player, x, y, score = EVENT_RECORD.unpack_from(data, offset)
+            offset += EVENT_RECORD.size
+            yield {"time": timestamp, "tick": tick, "event": names[code],
+                   "player": player, "x": x, "y": y, "score": score}
+        else:
+            raise ValueError(f"{path}: unbekannter Record-Typ an Position {offset}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Telemetrie-Dateien lesen.")
+    parser.add_argument("path", help=".jsonl- oder .snkt-Datei")
+    parser.add_argument("--summary", action="store_true", help="nur Anzahl pro Ereignistyp")
+    args = parser.parse_args(argv)
+
+    counts = {}
+    try:
+        for record in read(args.path):
+            if args.summary:
+                counts[record["event"]] = counts.get(record["event"], 0) + 1
+            else:
+                print(json.dumps(record))
+    except BrokenPipeError:
+        return 0
+    except (OSError, ValueError) as error:
+        print(error, file=sys.stderr)
+        return 2
+    for event, count in sorted(counts.items()):
+        print(f"{event:<24} {count}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
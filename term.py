@@ -0,0 +1,474 @@
+"""
+Terminal-Frontend: das Spielfeld als ANSI-Farbblöcke, z.B. per SSH ohne X-Server.
+
+Wie `render.CanvasRenderer` zeichnet `TerminalRenderer` inkrementell: er
+merkt sich die Farbe jeder Zelle auf dem Bildschirm und schickt pro Frame
+nur Escape-Sequenzen für Zellen, die sich geändert haben (neuer Kopf,
+freigewordener Schwanz, erschienene oder gefressene Items) sowie für
+geänderte Texte. Alles geht in einem einzigen `write` hinaus; bei einem
+normalen Takt sind das wenige Dutzend Bytes statt eines kompletten Bilds.
+Die Farben stammen aus `render.py` (gleiche Zuordnung wie im Tk-Fenster).
+
+    python term.py                         # Singleplayer, HARD
+    python term.py --mode multi --autopilot 2 --level levels/box.snkl
+
+Tasten: Pfeile (Player 1), WASD (Player 2), P Pause, R Neustart, Q Ende.
+"""
+import argparse
+import os
+import select
+import shutil
+import sys
+import time
+from collections import deque
+
+from autopilot import Autopilot
+from engine import Difficulty, Direction, SnakeEngine
+from inputs import InputQueue
+from leaderboard import DEFAULT_PATH, Leaderboard
+from render import MAX_INCREMENTAL_STEPS, OBSTACLE_COLOR, SNAKE_COLORS, cell_color, snake_color
+
+# Tk-Farbnamen -> Index der 256-Farben-Palette
+ANSI_COLORS = {
+    "red": 196,
+    "gold": 220,
+    "purple": 93,
+    "blue": 27,
+    "orange": 208,
+    "lime green": 118,
+    "yellow": 226,
+    "gray": 245,
+    "white": 231,
+}
+
+RESET = "\x1b[0m"
+CLEAR_SCREEN = "\x1b[2J"
+HIDE_CURSOR = "\x1b[?25l"
+SHOW_CURSOR = "\x1b[?25h"
+CLEAR_LINE = "\x1b[K"
+
+# Hintergrundfarbe einer Zelle (None = leer)
+CELL_SGR = {name: f"\x1b[48;5;{code}m" for name, code in ANSI_COLORS.items()}
+CELL_SGR[None] = "\x1b[49m"
+
+# Eine Zelle ist zwei Zeichen breit, damit sie ungefähr quadratisch aussieht
+CELL = "  "
+
+# Bildschirmzeilen (ab 1): Punkte, Rahmen oben, Spielfeld ab BOARD_TOP
+HUD_LINE = 1
+BOARD_TOP = 3
+
+# Escape-Sequenzen der Pfeiltasten (normaler und Application-Modus)
+ARROW_SEQUENCES = {
+    "\x1b[A": "Up", "\x1b[B": "Down", "\x1b[C": "Right", "\x1b[D": "Left",
+    "\x1bOA": "Up", "\x1bOB": "Down", "\x1bOC": "Right", "\x1bOD": "Left",
+}
+WASD_KEYS = {
+    "w": Direction.UP,
+    "s": Direction.DOWN,
+    "a": Direction.LEFT,
+    "d": Direction.RIGHT,
+}
+
+
+def fg(color):
+    """Escape-Sequenz für eine Textfarbe."""
+    return f"\x1b[38;5;{ANSI_COLORS[color]}m"
+
+
+def move_to(line, column):
+    """Escape-Sequenz, die den Cursor setzt (Zeile und Spalte ab 1)."""
+    return f"\x1b[{line};{column}H"
+
+
+class TerminalRenderer:
+    """
+    Zeichnet den Zustand eines Spiels inkrementell in ein Terminal.
+
+    `render(game)` erwartet dieselben Attribute wie `CanvasRenderer`
+    (`engine`, `mode`, `highscore`, `is_paused`); Gitter und
+    Performance-Overlay gibt es im Terminal nicht. Nach einem Reset der
+    Engine (Takt läuft zurück, anderes Spielfeld) wird neu aufgebaut,
+    ebenso nach `invalidate()`.
+    """
+    def __init__(self, stream):
+        self.stream = stream
+        self.frames = 0
+        self.bytes_written = 0
+        self.invalidate()
+
+    def invalidate(self):
+        """Vergisst den Bildschirminhalt; der nächste Frame baut alles neu auf."""
+        self.built = False
+        self.board = None        # (Engine, rows, cols) des aufgebauten Bilds
+        self.tick = 0
+        self.shown = []          # Farbe pro Zelle, wie sie gerade im Terminal steht
+        self.drawn = {}          # player -> deque der gezeichneten Zellen, Kopf vorne
+        self.snake_colors = {}   # player -> aktuelle Farbe
+        self.items = {}          # cell -> ItemType
+        self.obstacle_count = 0
+        self.texts = {}          # Zeile -> Text
+
+    # -------------------------------------------------------------------------
+    # FRAME
+    # -------------------------------------------------------------------------
+    def render(self, game):
+        """Bringt das Terminal auf den aktuellen Stand des Spiels."""
+        engine = game.engine
+        out = []
+        board = (engine, engine.rows, engine.cols)
+        if not self.built or board != self.board or engine.tick < self.tick:
+            self.build(engine, out)
+        self.tick = engine.tick
+
+        dirty = set()
+        # Hindernisse kommen nur hinzu (oder alles wird zurückgesetzt)
+        if len(engine.obstacles) != self.obstacle_count:
+            dirty.update(engine.obstacles)
+            self.obstacle_count = len(engine.obstacles)
+        self.diff_items(engine, dirty)
+        for player_number, snake in enumerate(engine.snakes, 1):
+            self.diff_snake(snake, player_number, dirty)
+
+        self.draw_cells(engine, dirty, out)
+        self.draw_texts(game, out)
+        if out:
+            data = "".join(out)
+            self.stream.write(data)
+            self.stream.flush()
+            self.frames += 1
+            self.bytes_written += len(data)
+
+    def build(self, engine, out):
+        """Löscht den Bildschirm und zeichnet den Rahmen um das Spielfeld."""
+        self.invalidate()
+        self.built = True
+        self.board = (engine, engine.rows, engine.cols)
+        self.shown = [None] * (engine.rows * engine.cols)
+
+        rows, cols = engine.rows, engine.cols
+        right = 2 * cols + 2
+        out.append(RESET + HIDE_CURSOR + CLEAR_SCREEN + fg(OBSTACLE_COLOR))
+        out.append(move_to(BOARD_TOP - 1, 1) + "┌" + "─" * (2 * cols) + "┐")
+        for y in range(rows):
+            line = BOARD_TOP + y
+            out.append(move_to(line, 1) + "│" + move_to(line, right) + "│")
+        out.append(move_to(BOARD_TOP + rows, 1) + "└" + "─" * (2 * cols) + "┘" + RESET)
+
+    def close(self):
+        """Setzt Farben und Cursor zurück und stellt den Cursor unter das Spielfeld."""
+        line = BOARD_TOP + (self.board[1] if self.board else 0) + 2
+        self.stream.write(RESET + SHOW_CURSOR + move_to(line, 1) + "\n")
+        self.stream.flush()
+
+    # -------------------------------------------------------------------------
+    # ÄNDERUNGEN SAMMELN
+    # -------------------------------------------------------------------------
+    def diff_items(self, engine, dirty):
+        """Merkt verschwundene und neue Items vor; der Rest bleibt stehen."""
+        items = engine.items
+        drawn = self.items
+        for cell in [c for c, item_type in drawn.items() if items.get(c) is not item_type]:
+            del drawn[cell]
+            dirty.add(cell)
+        for cell, item_type in items.items():
+            if cell not in drawn:
+                drawn[cell] = item_type
+                dirty.add(cell)
+
+    def diff_snake(self, snake, player_number, dirty):
+        """
+        Merkt die geänderten Zellen einer Schlange vor: beim Vorrücken nur
+        die neuen Kopfzellen und die frei gewordenen Schwanzzellen, beim
+        Farbwechsel (Glow) oder einem Sprung die ganze Schlange.
+        """
+        body = snake.body
+        drawn = self.drawn.get(player_number)
+        color = snake_color(snake, player_number)
+        if (drawn is not None and color == self.snake_colors[player_number]
+                and self.advance_snake(drawn, body, dirty)):
+            return
+        if drawn:
+            dirty.update(drawn)
+        dirty.update(body)
+        self.drawn[player_number] = deque(body)
+        self.snake_colors[player_number] = color
+
+    def advance_snake(self, drawn, body, dirty):
+        """
+        Zieht die gezeichnete Schlange inkrementell nach.
+        Gibt False zurück (ohne etwas zu ändern), wenn alles neu muss.
+        """
+        n = len(body)
+        if not drawn or not n:
+            return False
+        drawn_head = drawn[0]
+        if body[0] == drawn_head:
+            return n == len(drawn)
+
+        # Um wie viele Zellen ist der Kopf vorgerückt?
+        steps = 0
+        for k in range(1, min(n, MAX_INCREMENTAL_STEPS + 1)):
+            if body[k] == drawn_head:
+                steps = k
+                break
+        if not steps or len(drawn) + steps < n:
+            return False
+
+        for k in range(steps - 1, -1, -1):
+            drawn.appendleft(body[k])
+            dirty.add(body[k])
+        while len(drawn) > n:
+            dirty.add(drawn.pop())
+        return True
+
+    # -------------------------------------------------------------------------
+    # AUSGABE
+    # -------------------------------------------------------------------------
+    def draw_cells(self, engine, dirty, out):
+        """
+        Schreibt die vorgemerkten Zellen, deren Farbe sich wirklich geändert
+        hat. Direkt benachbarte Zellen einer Zeile brauchen keine neue
+        Cursor-Position, gleiche Farben hintereinander keine neue Farbe.
+        """
+        shown = self.shown
+        cols = engine.cols
+        last = -2
+        current = None
+        for cell in sorted(dirty):
+            if not 0 <= cell < len(shown):
+                continue
+            color = cell_color(engine, cell)
+            if color == shown[cell]:
+                continue
+            shown[cell] = color
+            if cell != last + 1 or cell % cols == 0:
+                y, x = divmod(cell, cols)
+                out.append(move_to(BOARD_TOP + y, 2 * x + 2))
+            sgr = CELL_SGR[color]
+            if sgr != current:
+                out.append(sgr)
+                current = sgr
+            out.append(CELL)
+            last = cell
+        if current is not None:
+            out.append(RESET)
+
+    def set_text(self, line, text, out):
+        """Schreibt eine Textzeile nur, wenn sie sich geändert hat."""
+        if self.texts.get(line) != text:
+            self.texts[line] = text
+            out.append(move_to(line, 1) + text + RESET + CLEAR_LINE)
+
+    def draw_texts(self, game, out):
+        """Punkte und Highscore über, Pause und Game Over unter dem Spielfeld."""
+        engine = game.engine
+        snakes = engine.snakes
+        hud = f"{fg('white')}Highscore: {game.highscore}  {fg(SNAKE_COLORS[1])}P1: {snakes[0].score}"
+        if game.mode == "Multiplayer":
+            hud += f"  {fg(SNAKE_COLORS[2])}P2: {snakes[1].score}"
+        self.set_text(HUD_LINE, hud, out)
+
+        if engine.game_over:
+            status = f"{fg('white')}Game Over!  "
+            status += "  ".join(f"{fg(SNAKE_COLORS[player])}Player {player} Score: {snake.score}"
+                                for player, snake in enumerate(snakes, 1))
+            status += f"  {fg('white')}Press R to Restart"
+        elif game.is_paused:
+            status = f"{fg('white')}PAUSED"
+        else:
+            status = ""
+        self.set_text(BOARD_TOP + engine.rows + 1, status, out)
+
+
+# -----------------------------------------------------------------------------
+# EINGABE
+# -----------------------------------------------------------------------------
+def parse_keys(text):
+    """
+    Zerlegt gelesene Zeichen in Tasten: "Up"/"Down"/"Left"/"Right" für die
+    Pfeile, sonst das Zeichen in Kleinbuchstaben. Andere Escape-Sequenzen
+    (z.B. Funktionstasten) werden übersprungen.
+    """
+    keys = []
+    i = 0
+    while i < len(text):
+        if text[i] != "\x1b":
+            keys.append(text[i].lower())
+            i += 1
+            continue
+        sequence = text[i:i + 3]
+        if sequence in ARROW_SEQUENCES:
+            keys.append(ARROW_SEQUENCES[sequence])
+            i += 3
+            continue
+        # Unbekannte CSI-Sequenz bis zu ihrem Endzeichen überspringen
+        i += 1
+        if text[i:i + 1] in ("[", "O"):
+            i += 1
+            while i < len(text) and not "@" <= text[i] <= "~":
+                i += 1
+            i += 1
+    return keys
+
+
+# -----------------------------------------------------------------------------
+# SPIEL IM TERMINAL
+# -----------------------------------------------------------------------------
+class TerminalGame:
+    """
+    Spielt eine Engine im Terminal: liest Tasten ohne Enter (cbreak),
+    rechnet im Takt der Schwierigkeit und zeichnet mit `TerminalRenderer`.
+    Eingaben laufen wie im Tk-Fenster über eine `InputQueue`.
+    """
+    def __init__(self, mode="Singleplayer", difficulty=Difficulty.HARD, level=None, seed=None,
+                 autopilot_players=(), stdin=None, stdout=None, leaderboard_path=DEFAULT_PATH):
+        self.mode = mode
+        self.difficulty = difficulty
+        self.engine = SnakeEngine(mode, seed=seed, level=level)
+        self.stdin = stdin if stdin is not None else sys.stdin
+        self.renderer = TerminalRenderer(stdout if stdout is not None else sys.stdout)
+        self.inputs = InputQueue()
+        self.autopilot_players = tuple(autopilot_players)
+        self.leaderboard = Leaderboard(leaderboard_path) if leaderboard_path else None
+        self.highscore = self.leaderboard.best() if self.leaderboard else 0
+        self.is_paused = False
+        self.quit = False
+        self.start_round()
+
+    def start_round(self):
+        """Legt das erste Futter aus und setzt Eingaben und Autopiloten zurück."""
+        self.engine.start()
+        self.inputs.clear()
+        self.score_saved = False
+        self.autopilots = [Autopilot(self.engine, player) for player in self.autopilot_players
+                           if player <= self.engine.num_players]
+
+    def save_highscore(self):
+        """Trägt die Punkte der Runde einmal in die Bestenliste ein."""
+        if self.score_saved or self.engine.tick == 0:
+            return
+        self.score_saved = True
+        if self.leaderboard:
+            for player, snake in enumerate(self.engine.snakes, 1):
+                self.leaderboard.record(self.mode, self.difficulty, player, snake.score,
+                                        ticks=self.engine.tick, seed=self.engine.seed)
+        self.highscore = max(self.highscore, self.engine.max_score)
+
+    def on_key(self, key):
+        """Verarbeitet eine Taste (siehe `parse_keys`)."""
+        if key == "q":
+            self.quit = True
+        elif key == "r":
+            self.save_highscore()
+            self.is_paused = False
+            self.engine.reset()
+            self.start_round()
+        elif key == "p":
+            self.is_paused = not self.is_paused
+        elif self.engine.game_over or self.is_paused:
+            return
+        elif key in ARROW_SEQUENCES.values() and 1 not in self.autopilot_players:
+            self.inputs.push(self.engine, 1, Direction(key))
+        elif key in WASD_KEYS and 2 not in self.autopilot_players:
+            self.inputs.push(self.engine, 2, WASD_KEYS[key])
+
+    def step(self):
+        """Ein Spieltakt (nicht bei Pause oder Game Over)."""
+        engine = self.engine
+        if engine.game_over or self.is_paused:
+            return
+        self.inputs.apply(engine)
+        for pilot in self.autopilots:
+            direction = pilot.decide()
+            if direction is not None:
+                engine.set_direction(pilot.player, direction)
+        engine.step()
+        if engine.game_over:
+            self.save_highscore()
+
+    def tick_seconds(self):
+        """Dauer des nächsten Takts in Sekunden."""
+        return self.engine.tick_interval(self.difficulty) / 1000
+
+    def run(self):
+        """Spielt, bis Q gedrückt oder die Eingabe geschlossen wird."""
+        import termios
+        import tty
+
+        fd = self.stdin.fileno()
+        saved = termios.tcgetattr(fd)
+        tty.setcbreak(fd)
+        try:
+            self.renderer.render(self)
+            deadline = time.perf_counter() + self.tick_seconds()
+            while not self.quit:
+                timeout = max(0.0, deadline - time.perf_counter())
+                ready, _, _ = select.select([fd], [], [], timeout)
+                if ready:
+                    data = os.read(fd, 64)
+                    if not data:
+                        break
+                    for key in parse_keys(data.decode("utf-8", "replace")):
+                        self.on_key(key)
+                else:
+                    self.step()
+                    # Fester Takt; liegt er zu weit zurück, ab jetzt neu zählen
+                    deadline = max(deadline + self.tick_seconds(), time.perf_counter())
+                self.renderer.render(self)
+        finally:
+            termios.tcsetattr(fd, termios.TCSADRAIN, saved)
+            self.renderer.close()
+            self.save_highscore()
+            if self.leaderboard:
+                self.leaderboard.close()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Snake im Terminal (ANSI-Farben, ohne X-Server).")
+    parser.add_argument("--mode", choices=("single", "multi"), default="single")
+    parser.add_argument("--difficulty", choices=[d.name.lower() for d in Difficulty], default="hard")
+    parser.add_argument("--level", help="kompiliertes Level (.snkl)")
+    parser.add_argument("--seed", type=int)
+    parser.add_argument("--autopilot", type=int, action="append", default=[], choices=(1, 2),
+                        help="Spieler, den der Autopilot steuert (mehrfach möglich)")
+    args = parser.parse_args(argv)
+
+    if not sys.stdin.isatty():
+        print("term.py braucht ein Terminal als Eingabe", file=sys.stderr)
+        return 2
+
+    level = None
+    if args.level:
+        from levels import LevelError, load_level
+        try:
+            level = load_level(args.level)
+        except (OSError, LevelError) as error:
+            print(error, file=sys.stderr)
+            return 2
+
+    mode = "Multiplayer" if args.mode == "multi" else "Singleplayer"
+    game = TerminalGame(mode, Difficulty[args.difficulty.upper()], level, args.seed, args.autopilot)
+    engine = game.engine
+    size = shutil.get_terminal_size()
+    if size.columns < 2 * engine.cols + 2 or size.lines < engine.rows + BOARD_TOP + 1:
+        print(f"Terminal zu klein: {2 * engine.cols + 2}x{engine.rows + BOARD_TOP + 1} Zeichen nötig",
+              file=sys.stderr)
+        game.leaderboard.close()
+        return 2
+    try:
+        game.run()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        if level is not None:
+            level.close()
+    renderer = game.renderer
+    if renderer.frames:
+        print(f"{renderer.frames} Frames, im Mittel {renderer.bytes_written / renderer.frames:.0f} "
+              f"Bytes pro Frame")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
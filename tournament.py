@@ -0,0 +1,230 @@
+"""
+Turniere: viele Bot-Partien ohne Fenster, verteilt auf alle CPU-Kerne.
+
+Jede Aufgabe ist ein zusammenhängender Seed-Bereich eines Modus; die
+Worker eines Prozess-Pools spielen ihre Bereiche und liefern die Ergebnisse
+zurück, sobald sie fertig sind. Die Auswertung (Punkteverteilung,
+Spiellänge, Todesursachen) läuft im Hauptprozess mit. Bots suchen mit einem
+Knoten- statt Zeitbudget, daher ergibt derselbe Seed immer dieselbe Partie.
+
+Die Regeln hängen nicht von der Schwierigkeit ab, nur das Tempo: Jeder Seed
+wird daher einmal pro Modus gespielt, die Spielzeit für jede Schwierigkeit
+wird Takt für Takt aus `tick_interval` mitgerechnet.
+
+    python tournament.py --games 1000 --out results.jsonl
+    python tournament.py --bot autopilot:Autopilot --bot2 mybot:Bot --modes Multiplayer
+"""
+import argparse
+import importlib
+import inspect
+import json
+import os
+import sys
+import time
+from multiprocessing import Pool
+
+from engine import SnakeEngine, Difficulty
+from profiling import percentile
+
+MODES = ("Singleplayer", "Multiplayer")
+
+# Standard-Bot und sein Knotenbudget pro Suche
+DEFAULT_BOT = "autopilot:Autopilot"
+BOT_BUDGET_NODES = 2000
+
+# So viele Spiele umfasst eine Aufgabe (ein Seed-Bereich) höchstens
+CHUNK_SIZE = 25
+
+# Abbruch endloser Partien (z.B. Bots, die nur im Kreis fahren)
+MAX_TICKS = 100_000
+
+SCORE_PERCENTILES = (10, 50, 90, 99)
+
+
+def load_bot(spec):
+    """Lädt eine Bot-Klasse aus "modul:Klasse"; sie wird mit (engine, player) erzeugt."""
+    module_name, _, attr = spec.partition(":")
+    return getattr(importlib.import_module(module_name), attr or "Autopilot")
+
+
+def takes_budget(bot_class):
+    """Nimmt der Konstruktor `budget_nodes` (benannt oder über **kwargs)?"""
+    try:
+        parameters = inspect.signature(bot_class).parameters.values()
+    except (TypeError, ValueError):
+        return False
+    return any(parameter.name == "budget_nodes" or parameter.kind is parameter.VAR_KEYWORD
+               for parameter in parameters)
+
+
+def make_bot(bot_class, engine, player):
+    """Erzeugt einen Bot; Bots mit `budget_nodes` bekommen ein reproduzierbares Knotenbudget."""
+    if takes_budget(bot_class):
+        return bot_class(engine, player, budget_nodes=BOT_BUDGET_NODES)
+    return bot_class(engine, player)
+
+
+def play_game(engine, bot_classes, difficulties, seed, max_ticks=MAX_TICKS):
+    """
+    Spielt eine Partie und gibt das Ergebnis als Dict zurück; `game_ms`
+    enthält die Spielzeit für jede der `difficulties`.
+    """
+    engine.reset(seed)
+    engine.start()
+    bots = [make_bot(bot_class, engine, player)
+            for player, bot_class in enumerate(bot_classes[:engine.num_players], 1)]
+    game_ms = [0] * len(difficulties)
+    while not engine.game_over and engine.tick < max_ticks:
+        for i, difficulty in enumerate(difficulties):
+            game_ms[i] += engine.tick_interval(difficulty)
+        engine.step([bot.decide() for bot in bots])
+    return {
+        "mode": engine.mode,
+        "seed": seed,
+        "ticks": engine.tick,
+        "game_ms": {difficulty.name: ms for difficulty, ms in zip(difficulties, game_ms)},
+        "scores": [snake.score for snake in engine.snakes],
+        "cause": engine.death_cause if engine.game_over else "max_ticks",
+        "loser": engine.loser,
+    }
+
+
+def run_chunk(task):
+    """Worker: spielt einen Seed-Bereich (mode, difficulties, first_seed, count, bots)."""
+    mode, difficulties, first_seed, count, bot_specs, max_ticks = task
+    bot_classes = [load_bot(spec) for spec in bot_specs]
+    engine = SnakeEngine(mode, seed=first_seed)
+    difficulties = [Difficulty[name] for name in difficulties]
+    return [play_game(engine, bot_classes, difficulties, seed, max_ticks)
+            for seed in range(first_seed, first_seed + count)]
+
+
+def tasks(games, modes, difficulties, bot_specs, seed=0, chunk=CHUNK_SIZE, max_ticks=MAX_TICKS):
+    """
+    Teilt die Spiele in Seed-Bereiche auf. Jeder Modus spielt die Seeds
+    seed .. seed + games - 1 einmal; die Schwierigkeiten gehen nur in die
+    Spielzeit ein.
+    """
+    names = tuple(difficulty.name for difficulty in difficulties)
+    result = []
+    for mode in modes:
+        for first in range(seed, seed + games, chunk):
+            count = min(chunk, seed + games - first)
+            result.append((mode, names, first, count, tuple(bot_specs), max_ticks))
+    return result
+
+
+class Aggregate:
+    """Sammelt Ergebnisse pro Modus und fasst sie zusammen."""
+    def __init__(self):
+        self.groups = {}
+
+    def add(self, result):
+        group = self.groups.get(result["mode"])
+        if group is None:
+            group = self.groups[result["mode"]] = {"scores": [], "ticks": [], "game_ms": {},
+                                                   "causes": {}}
+        group["scores"].extend(result["scores"])
+        group["ticks"].append(result["ticks"])
+        for difficulty, ms in result["game_ms"].items():
+            group["game_ms"][difficulty] = group["game_ms"].get(difficulty, 0) + ms
+        cause = result["cause"]
+        group["causes"][cause] = group["causes"].get(cause, 0) + 1
+
+    def summary(self):
+        """{"Modus": {games, score_mean, score_pNN, ticks_mean, game_seconds_mean, ...}}"""
+        summary = {}
+        for mode, group in sorted(self.groups.items()):
+            scores = sorted(group["scores"])
+            ticks = sorted(group["ticks"])
+            stats = {
+                "games": len(ticks),
+                "score_mean": sum(scores) / len(scores),
+                "score_max": scores[-1],
+                "ticks_mean": sum(ticks) / len(ticks),
+                "ticks_p50": percentile(ticks, 50),
+                "game_seconds_mean": {difficulty: ms / 1000 / len(ticks)
+                                      for difficulty, ms in group["game_ms"].items()},
+                "causes": dict(sorted(group["causes"].items(), key=lambda item: str(item[0]))),
+            }
+            for q in SCORE_PERCENTILES:
+                stats[f"score_p{q}"] = percentile(scores, q)
+            summary[mode] = stats
+        return summary
+
+
+def run_tournament(task_list, workers=None, on_result=None):
+    """
+    Spielt alle Aufgaben im Prozess-Pool und wertet laufend aus.
+    `on_result(result)` wird für jedes Spiel aufgerufen, sobald sein
+    Seed-Bereich fertig ist. Gibt das `Aggregate` zurück.
+    """
+    aggregate = Aggregate()
+    with Pool(workers) as pool:
+        for results in pool.imap_unordered(run_chunk, task_list):
+            for result in results:
+                aggregate.add(result)
+                if on_result is not None:
+                    on_result(result)
+    return aggregate
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Bot-Turnier auf allen CPU-Kernen.")
+    parser.add_argument("--games", type=int, default=200, help="Spiele pro Modus")
+    parser.add_argument("--modes", nargs="+", choices=MODES, default=list(MODES))
+    parser.add_argument("--difficulties", nargs="+", choices=[d.name.lower() for d in Difficulty],
+                        default=[d.name.lower() for d in Difficulty],
+                        help="Schwierigkeiten, für die die Spielzeit ausgewiesen wird")
+    parser.add_argument("--bot", default=DEFAULT_BOT, help="Bot für Spieler 1 (modul:Klasse)")
+    parser.add_argument("--bot2", help="Bot für Spieler 2 (Standard: wie --bot)")
+    parser.add_argument("--seed", type=int, default=0, help="erster Seed")
+    parser.add_argument("--workers", type=int, default=os.cpu_count())
+    parser.add_argument("--chunk", type=int, default=CHUNK_SIZE, help="Spiele pro Aufgabe")
+    parser.add_argument("--max-ticks", type=int, default=MAX_TICKS)
+    parser.add_argument("--out", help="Einzelergebnisse als JSON Lines hierhin schreiben")
+    parser.add_argument("--summary", help="Zusammenfassung als JSON hierhin schreiben")
+    args = parser.parse_args(argv)
+
+    difficulties = [Difficulty[name.upper()] for name in args.difficulties]
+    bot_specs = (args.bot, args.bot2 or args.bot)
+    task_list = tasks(args.games, args.modes, difficulties, bot_specs,
+                      args.seed, args.chunk, args.max_ticks)
+    total = args.games * len(args.modes)
+
+    out = open(args.out, "w") if args.out else None
+    done = [0]
+    start = time.perf_counter()
+
+    def on_result(result):
+        done[0] += 1
+        if out is not None:
+            out.write(json.dumps(result) + "\n")
+        if done[0] % 100 == 0 or done[0] == total:
+            print(f"\r{done[0]}/{total} Spiele, {time.perf_counter() - start:.1f} s",
+                  end="", file=sys.stderr, flush=True)
+
+    try:
+        aggregate = run_tournament(task_list, args.workers, on_result)
+    finally:
+        if out is not None:
+            out.close()
+    print(file=sys.stderr)
+
+    summary = aggregate.summary()
+    for name, stats in summary.items():
+        scores = " ".join(f"p{q} {stats[f'score_p{q}']}" for q in SCORE_PERCENTILES)
+        print(f"{name:<14} {stats['games']:>6} Spiele  Punkte {scores}  max {stats['score_max']}  "
+              f"Takte Ø {stats['ticks_mean']:.0f}")
+        seconds = "  ".join(f"{difficulty.lower()} {value:.1f} s"
+                            for difficulty, value in stats["game_seconds_mean"].items())
+        print(f"{'':<14} Spielzeit Ø {seconds}")
+        print(f"{'':<14} Spielende: {stats['causes']}")
+    if args.summary:
+        with open(args.summary, "w") as file:
+            json.dump(summary, file, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())